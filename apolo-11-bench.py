@@ -0,0 +1,49 @@
+# apolo-11-bench.py
+
+import argparse
+import sys
+from modules.BenchmarkSuite import BENCHMARKS, BenchmarkSuite, compare_results
+
+if __name__ == '__main__':
+    """
+        Punto de entrada de la suite de rendimiento de la simulación de Apollo 11.
+        Mide la generación de datos, el análisis, el respaldo y el tablero de control sobre directorios temporales,
+        guarda los resultados en JSON y, si se indica una línea base, marca las regresiones de rendimiento.
+
+        Ejemplo: python apolo-11-bench.py --sizes 1000,10000,100000,1000000 --output bench.json --compare base.json
+        """
+
+    parser = argparse.ArgumentParser(description="Suite de rendimiento de Apolo-11.")
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help="tamaños de entrada en eventos, separados por comas")
+    parser.add_argument('--repeats', type=int, default=5, help="repeticiones de cada caso")
+    parser.add_argument('--formats', default='json,segment',
+                        help="formatos de log: json (un archivo por evento), segment, binary")
+    parser.add_argument('--benchmarks', default=','.join(BENCHMARKS), help="bancos de prueba a ejecutar")
+    parser.add_argument('--seed', type=int, default=1969, help="semilla de los datos generados")
+    parser.add_argument('--output', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--compare', help="archivo JSON de una ejecución anterior para detectar regresiones")
+    parser.add_argument('--threshold', type=float, default=0.1, help="caída de rendimiento tolerada (fracción)")
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(sizes=[int(size) for size in args.sizes.split(',')], repeats=args.repeats,
+                           formats=args.formats.split(','), seed=args.seed, benchmarks=args.benchmarks.split(','))
+
+    # Muestra cada caso a medida que termina
+    print(f"{'banco':<12}{'formato':<10}{'eventos':>10}{'eventos/s':>14}{'p50 (s)':>10}{'p90 (s)':>10}"
+          f"{'p99 (s)':>10}{'memoria (KiB)':>15}")
+    results = suite.run(lambda result: print(
+        f"{result['benchmark']:<12}{result['format']:<10}{result['size']:>10}{result['throughput'] or 0:>14.0f}"
+        f"{result['p50']:>10.4f}{result['p90']:>10.4f}{result['p99']:>10.4f}{result['peak_memory'] / 1024:>15.0f}"))
+
+    if args.output:
+        BenchmarkSuite.save(results, args.output)
+
+    if args.compare:
+        regressions = compare_results(results, BenchmarkSuite.load(args.compare), args.threshold)
+        for regression in regressions:
+            print(f"REGRESIÓN {regression['benchmark']} {regression['format']} {regression['size']}: "
+                  f"{regression['baseline']:.0f} -> {regression['current']:.0f} eventos/s "
+                  f"({regression['change']:+.1%})")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,54 @@
+# apolo-11-query.py
+
+import argparse
+import os
+from modules.BackupIndex import BackupIndex
+
+if __name__ == '__main__':
+    """
+        Punto de entrada para consultar el histórico de eventos respaldados de la simulación de Apollo 11.
+        Las consultas se resuelven sobre el índice SQLite que FileManager mantiene al respaldar los archivos,
+        sin recorrer el directorio de backups. Con --rebuild, el índice se reconstruye a partir de backups.
+
+        Ejemplo:
+            python apolo-11-query.py --mission CLNM --device-type "Traje Espacial" --status faulty \
+                --since 2024-01-01
+        """
+
+    # Define el directorio raíz del proyecto y las rutas por defecto del índice y de los backups
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Consulta el índice de eventos respaldados de Apolo-11.")
+    parser.add_argument('--db', default=os.path.join(base_path, 'index', 'backups.sqlite'),
+                        help="ruta a la base de datos del índice")
+    parser.add_argument('--rebuild', action='store_true', help="reconstruye el índice a partir del directorio backups")
+    parser.add_argument('--backups', default=os.path.join(base_path, 'backups'), help="ruta al directorio backups")
+    parser.add_argument('--mission', help="código de misión (ORBONE, CLNM, TMRS, GALXONE, UNKN)")
+    parser.add_argument('--device-type', help="tipo de dispositivo")
+    parser.add_argument('--status', help="estado del dispositivo")
+    parser.add_argument('--hash', help="hash del evento")
+    parser.add_argument('--since', help="fecha inicial inclusiva (AAAA-MM-DD o 'AAAA-MM-DD HH:MM:SS')")
+    parser.add_argument('--until', help="fecha final exclusiva (AAAA-MM-DD o 'AAAA-MM-DD HH:MM:SS')")
+    parser.add_argument('--group-by',
+                        help="columnas de agrupación separadas por comas (mission,device_type,status,date)")
+    parser.add_argument('--list', type=int, metavar='N', help="muestra hasta N eventos en lugar de contarlos")
+    args = parser.parse_args()
+
+    backup_index = BackupIndex(args.db)
+
+    if args.rebuild:
+        print(f"Eventos indexados: {backup_index.index_backups(args.backups)}")
+
+    filters = {'mission': args.mission, 'device_type': args.device_type, 'status': args.status, 'hash': args.hash,
+               'since': args.since, 'until': args.until}
+
+    if args.list:
+        for row in backup_index.find(limit=args.list, **filters):
+            print("\t".join(str(value) for value in row))
+    elif args.group_by:
+        for row in backup_index.count_by(args.group_by.split(','), **filters):
+            print("\t".join(str(value) for value in row))
+    else:
+        print(backup_index.count(**filters))
+
+    backup_index.close()
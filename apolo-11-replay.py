@@ -0,0 +1,41 @@
+# apolo-11-replay.py
+
+import argparse
+import os
+import time
+from modules.ReplayTool import ReplayTool
+from modules.RollupStore import RollupStore
+
+if __name__ == '__main__':
+    """
+        Punto de entrada para regenerar los informes de la simulación de Apollo 11 a partir de los respaldos.
+        Lee el directorio backups en paralelo, reagrupa los eventos en sus ciclos originales y escribe los informes,
+        el informe acumulado y el tablero de control en un directorio de salida, sin tocar devices, backups ni reports.
+
+        Ejemplo: python apolo-11-replay.py --output replay --workers 4 --rollups
+        """
+
+    # Define el directorio raíz del proyecto y las rutas por defecto de los respaldos y de la salida
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Regenera los informes de Apolo-11 a partir de los respaldos.")
+    parser.add_argument('--backups', default=os.path.join(base_path, 'backups'), help="ruta al directorio backups")
+    parser.add_argument('--output', default=os.path.join(base_path, 'replay'), help="directorio de salida")
+    parser.add_argument('--workers', type=int, help="procesos de lectura (por defecto, uno por núcleo)")
+    parser.add_argument('--rollups', action='store_true',
+                        help="reconstruye también los agregados temporales en <salida>/rollups/rollups.sqlite")
+    args = parser.parse_args()
+
+    # Los agregados se reconstruyen desde cero para no sumar dos veces los ciclos de una reproducción anterior
+    rollups = None
+    if args.rollups:
+        rollups_path = os.path.join(args.output, 'rollups', 'rollups.sqlite')
+        if os.path.exists(rollups_path):
+            os.remove(rollups_path)
+        rollups = RollupStore(rollups_path)
+    replay_tool = ReplayTool(args.backups, args.output, args.workers, rollups)
+
+    start = time.perf_counter()
+    cycles = replay_tool.replay()
+    print(f"Ciclos regenerados: {cycles} en {time.perf_counter() - start:.2f}s "
+          f"({os.path.join(args.output, 'reports')})")
@@ -1,11 +1,23 @@
 # apolo-11.py
 
+import argparse
+import logging
 import os
 from modules.Apolo11Simulation import Apolo11Simulation
 from modules.DataGenerator import DataGenerator
 from modules.FileManager import FileManager
 from modules.ReportGenerator import ReportGenerator
 from modules.ControlDashboard import ControlDashboard
+from modules.IncrementalAggregator import IncrementalAggregator
+from modules.BackupIndex import BackupIndex
+from modules.Metrics import Metrics, PrometheusExporter
+from modules.IngestionWatcher import IngestionWatcher
+from modules.RollupStore import RollupStore
+from modules.DisconnectionDetector import DisconnectionDetector
+from modules.ReportArchive import ReportArchive
+from modules.DashboardServer import DashboardServer
+from modules.HashVerifier import HashVerifier
+from modules.DurableWriter import DurableWriter
 
 if __name__ == '__main__':
     """
@@ -13,9 +25,19 @@ if __name__ == '__main__':
         Primero, define las rutas para los directorios de devices, buckups y reports.
         Luego, crea instancias de los generadores de datos, administrador de archivos y generador de reportes.
         Después, crea una instancia de la simulación de Apollo 11 y la inicia en un hilo separado.
+        Cuando termina (tras --cycles ciclos, o con Ctrl+C si --cycles es 0), detiene los demás componentes.
         Finalmente, crea una instancia del panel de control y muestra el panel de control.
         """
 
+    parser = argparse.ArgumentParser(description="Simulación de la misión Apolo-11.")
+    parser.add_argument('--cycles', type=int, default=1, help="cantidad de ciclos a simular (0: hasta Ctrl+C)")
+    parser.add_argument('--interval', type=float, default=20, help="segundos entre el inicio de dos ciclos")
+    parser.add_argument('--dashboard-host', default=os.environ.get('APOLO11_DASHBOARD_HOST', '127.0.0.1'),
+                        help="dirección del tablero en vivo (por defecto, APOLO11_DASHBOARD_HOST o 127.0.0.1)")
+    parser.add_argument('--dashboard-port', type=int, default=int(os.environ.get('APOLO11_DASHBOARD_PORT', 8011)),
+                        help="puerto del tablero en vivo (APOLO11_DASHBOARD_PORT o 8011; 0 elige uno libre)")
+    args = parser.parse_args()
+
     # Define el directorio raíz del proyecto
     base_path = os.path.dirname(os.path.abspath(__file__))
 
@@ -23,23 +45,81 @@ if __name__ == '__main__':
     devices_path = os.path.join(base_path, 'devices')
     backup_path = os.path.join(base_path, 'backups')
     reports_path = os.path.join(base_path, 'reports')
+    checkpoint_path = os.path.join(base_path, 'checkpoints', 'aggregator.json')
+    index_path = os.path.join(base_path, 'index', 'backups.sqlite')
+    metrics_path = os.path.join(base_path, 'metrics', 'apolo11.prom')
+    rollups_path = os.path.join(base_path, 'rollups', 'rollups.sqlite')
+    alerts_path = os.path.join(base_path, 'alerts', 'disconnections.log')
+    archive_path = os.path.join(base_path, 'archive', 'reports.sqlite')
+    quarantine_path = os.path.join(base_path, 'quarantine')
+
+    # Crea el registro de métricas y lo exporta periódicamente en formato de texto de Prometheus
+    metrics = Metrics()
+    metrics_exporter = PrometheusExporter(metrics, metrics_path)
+    metrics_exporter.start()
 
     # Crea instancias de los generadores de datos, administrador de archivos y generador de reportes
-    data_generator = DataGenerator(devices_path)
-    file_manager = FileManager(base_path)
-    report_generator = ReportGenerator(devices_path, backup_path, reports_path)
+    # Los archivos de cada ciclo se escriben de forma atómica y se sincronizan con el disco en grupo
+    data_generator = DataGenerator(devices_path, writer=DurableWriter('group'))
+    # Los archivos respaldados se indexan en segundo plano, fuera del ciclo de la simulación
+    backup_index = BackupIndex(index_path)
+    backup_index.start()
+    file_manager = FileManager(base_path, backup_index=backup_index, metrics=metrics)
+    aggregator = IncrementalAggregator(checkpoint_path)
+
+    # Observa el directorio de dispositivos para verificar y contar los archivos a medida que se cierran
+    # El verificador comprueba el hash de cada evento y aparta a cuarentena los archivos alterados
+    verifier = HashVerifier(quarantine_path, metrics=metrics)
+    watcher = IngestionWatcher(devices_path, verifier=verifier)
+
+    # Detecta desconexiones en cuanto se ingieren los eventos, sin esperar al informe del ciclo
+    disconnection_detector = DisconnectionDetector(alerts_path=alerts_path)
+    watcher.add_listener(disconnection_detector.observe_counts)
+    disconnection_detector.start()
+    watcher.start()
+
+    rollups = RollupStore(rollups_path)
+    report_archive = ReportArchive(archive_path)
+    report_generator = ReportGenerator(devices_path, backup_path, reports_path, aggregator, metrics=metrics,
+                                       watcher=watcher, rollups=rollups, archive=report_archive, verifier=verifier,
+                                       writer=DurableWriter('group'))
+
+    # Sirve el tablero en vivo (por defecto, http://127.0.0.1:8011/) desde el último análisis en memoria
+    # Si no se puede abrir el puerto, la simulación sigue sin tablero en vivo
+    try:
+        dashboard_server = DashboardServer(args.dashboard_host, args.dashboard_port)
+    except OSError as e:
+        logging.error(f"No se pudo iniciar el tablero en vivo en {args.dashboard_host}:{args.dashboard_port}: {e}")
+        dashboard_server = None
+    if dashboard_server is not None:
+        report_generator.add_listener(dashboard_server.publish)
+        disconnection_detector.add_listener(dashboard_server.publish_alert)
+        dashboard_server.start()
 
     # Crea una instancia de la simulación de Apollo 11
-    simulation = Apolo11Simulation(data_generator, file_manager, report_generator)
+    simulation = Apolo11Simulation(data_generator, file_manager, report_generator, metrics=metrics,
+                                   max_cycles=args.cycles or None)
 
     # Inicia la simulación en un hilo separado
-    simulation.run()
+    simulation.run(args.interval)
+
+    # Espera a que la simulación termine sus ciclos o a que se interrumpa
+    try:
+        simulation.wait()
+    except KeyboardInterrupt:
+        pass
 
-    # En algún momento posterior, se podrá detener la simulación
+    # Detiene la simulación (esperando el informe y el respaldo del ciclo en curso) y después el resto
     simulation.stop_simulation()
+    metrics_exporter.stop()
+    watcher.stop()
+    disconnection_detector.stop()
+    if dashboard_server is not None:
+        dashboard_server.stop()
+    backup_index.stop()
 
     # Crea una instancia del panel de control
-    control_dashboard = ControlDashboard(reports_path)
+    control_dashboard = ControlDashboard(reports_path, rollups, report_archive)
 
     # Muestra el panel de control
     control_dashboard.display_dashboard()
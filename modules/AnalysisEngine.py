@@ -0,0 +1,271 @@
+# modules/AnalysisEngine.py
+import functools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from modules.BinaryLog import count_binary, is_binary, iter_binary_events
+from modules.EventBatch import EventBatch, count_log_files_columnar
+from modules.EventCounts import count_event, merge_counts
+from modules.SegmentLog import count_segment, is_segment, iter_segment_events
+
+
+def iter_log_events(path):
+    """
+    Recorre los eventos de un archivo de log, ya sea un archivo por evento, un segmento o un log binario.
+    """
+    if is_segment(path):
+        yield from iter_segment_events(path)
+        return
+    if is_binary(path):
+        yield from iter_binary_events(path)
+        return
+
+    with open(path, 'r') as file:
+        yield json.load(file)
+
+
+def count_log_files(sources, observe=None):
+    """
+    Construye el recuento de eventos de una lista de archivos de log (por evento, segmentos o logs binarios).
+    Es una función de módulo para que los procesos de trabajo puedan ejecutarla.
+    Si se indica observe, se llama con cada evento leído en la misma pasada; en ese caso los segmentos se leen
+    línea a línea en lugar de usar el índice de su pie. Los logs binarios no guardan identificadores de
+    dispositivo y se cuentan sin observar.
+    """
+    events_analysis_data = {}
+    for log_file in sources:
+        if is_segment(log_file) and observe is None:
+            merge_counts(events_analysis_data, count_segment(log_file))
+            continue
+        if is_segment(log_file):
+            for data in iter_segment_events(log_file):
+                count_event(events_analysis_data, data)
+                observe(data)
+            continue
+        if is_binary(log_file):
+            merge_counts(events_analysis_data, count_binary(log_file))
+            continue
+
+        with open(log_file, 'r') as file:
+            data = json.load(file)
+        count_event(events_analysis_data, data)
+        if observe is not None:
+            observe(data)
+
+    return events_analysis_data
+
+
+def split_chunks(sources, chunk_count):
+    """
+    Divide la lista de archivos en bloques contiguos, de modo que al combinarlos en orden se conserva el mismo
+    orden de aparición que en la lectura secuencial.
+    """
+    chunk_size = max(1, -(-len(sources) // chunk_count))
+    return [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+
+
+def derive_events_analysis(events_analysis_data):
+    """
+    Sección de análisis de eventos: es el propio recuento por misión, dispositivo y estado.
+    """
+    return events_analysis_data
+
+
+def derive_disconnections(events_analysis_data, disconnection_threshold=1):
+    """
+    Identifica los dispositivos con un número de estados "unknown" mayor al umbral indicado.
+    """
+    disconnection_management_data = {}
+
+    for mission, devices in events_analysis_data.items():
+        for device_type, state_counts in devices.items():
+            unknown_count = state_counts.get('unknown', 0)
+
+            if unknown_count > disconnection_threshold:
+                if mission not in disconnection_management_data:
+                    disconnection_management_data[mission] = []
+
+                disconnection_management_data[mission].append({
+                    'device_type': device_type,
+                    'unknown_count': unknown_count
+                })
+
+    return disconnection_management_data
+
+
+def derive_consolidation(events_analysis_data):
+    """
+    Cuenta el número de dispositivos inoperables (killed + unknown) por tipo de dispositivo en todas las misiones.
+    """
+    consolidation_data = {}
+
+    for mission, devices in events_analysis_data.items():
+        for device_type, state_counts in devices.items():
+            inoperable_count = state_counts.get('killed', 0) + state_counts.get('unknown', 0)
+            consolidation_data[device_type] = consolidation_data.get(device_type, 0) + inoperable_count
+
+    return consolidation_data
+
+
+def derive_percentages(events_analysis_data):
+    """
+    Calcula los porcentajes de eventos de cada dispositivo y estado respecto al total de la misión.
+    """
+    percentage_calculation_data = {}
+
+    for mission, devices in events_analysis_data.items():
+        total_events = sum(sum(device_states.values()) for device_states in devices.values())
+        mission_percentage_data = {}
+        for device_type, state_counts in devices.items():
+            device_percentage_data = {state: (count / total_events) * 100 for state, count in state_counts.items()}
+            mission_percentage_data[device_type] = device_percentage_data
+
+        percentage_calculation_data[mission] = mission_percentage_data
+
+    return percentage_calculation_data
+
+
+DEFAULT_SECTIONS = {
+    'events_analysis': derive_events_analysis,
+    'disconnection_management': derive_disconnections,
+    'consolidation': derive_consolidation,
+    'percentage_calculation': derive_percentages
+}
+
+
+class AnalysisEngine:
+    """
+    Esta clase representa el motor de análisis de la simulación de Apollo 11.
+    Recorre los archivos de log una sola vez, construye el recuento misión × tipo de dispositivo × estado
+    y deriva en memoria todas las secciones del informe a partir de ese recuento.
+    """
+
+    def __init__(self, devices_path, workers=1, executor='process', parallel_threshold=1000, columnar=False,
+                 observe=None):
+        """
+        Inicializa el motor con la ruta al directorio de dispositivos y registra las secciones por defecto.
+        Con workers > 1, los lotes de al menos parallel_threshold archivos se leen en paralelo con un conjunto de
+        procesos (executor='process') o de hilos (executor='thread').
+        Con columnar, los eventos se codifican en un lote columnar (EventBatch) y las secciones por defecto se
+        calculan con operaciones vectorizadas.
+        observe es una función que recibe cada evento en la misma pasada que lo cuenta (por ejemplo,
+        DeviceSketches.observe). Como vive en memoria de este proceso, con observe la lectura en paralelo usa
+        hilos aunque executor sea 'process'.
+        """
+        self.devices_path = devices_path
+        self.workers = workers
+        self.executor = executor
+        self.parallel_threshold = parallel_threshold
+        self.columnar = columnar
+        self.observe = observe
+        self.sections = {}
+        self.last_sources = []
+
+        for name, derive in DEFAULT_SECTIONS.items():
+            self.register_section(name, derive)
+
+    def register_section(self, name, derive):
+        """
+        Registra una sección derivada del informe. La función recibe el recuento de eventos y devuelve
+        los datos de la sección, sin volver a leer los archivos de log.
+        """
+        self.sections[name] = derive
+
+    def unregister_section(self, name):
+        """
+        Elimina una sección derivada previamente registrada.
+        """
+        self.sections.pop(name, None)
+
+    def list_sources(self):
+        """
+        Devuelve las rutas de los archivos de log pendientes en el directorio de dispositivos.
+        """
+        with os.scandir(self.devices_path) as entries:
+            return [entry.path for entry in entries
+                    if entry.name.endswith('.log') and not entry.name.startswith('.') and entry.is_file()]
+
+    def scan(self, sources=None):
+        """
+        Lee cada archivo de log una única vez y devuelve el recuento de eventos por misión, dispositivo y estado.
+        Si no se indican las rutas, se usan todos los archivos de log del directorio de dispositivos.
+        """
+        if sources is None:
+            sources = self.list_sources()
+
+        events_analysis_data = self.count_sources(sources)
+        self.last_sources = list(sources)
+        return events_analysis_data
+
+    def count_sources(self, sources):
+        """
+        Construye el recuento de eventos de las rutas indicadas sin modificar el estado del motor.
+        En modo paralelo, cada trabajador produce el recuento parcial de un bloque contiguo de archivos y los
+        recuentos parciales se combinan en orden, por lo que el resultado es idéntico al de la lectura secuencial.
+        """
+        if self.columnar:
+            return self.count_columnar(sources).to_events_analysis()
+
+        return self.count_chunks(self.bind_observer(count_log_files), list(sources))
+
+    def bind_observer(self, count_function):
+        """
+        Devuelve la función de recuento con el observador de eventos del motor, si lo hay.
+        """
+        if self.observe is None:
+            return count_function
+        return functools.partial(count_function, observe=self.observe)
+
+    def count_chunks(self, count_function, sources):
+        """
+        Aplica la función de recuento a las rutas indicadas, en paralelo si el lote es suficientemente grande.
+        """
+        if self.workers <= 1 or len(sources) < self.parallel_threshold:
+            return count_function(sources)
+
+        pool_class = ProcessPoolExecutor if self.executor == 'process' and self.observe is None else ThreadPoolExecutor
+        with pool_class(max_workers=self.workers) as pool:
+            partial_counts = pool.map(count_function, split_chunks(sources, self.workers * 4))
+
+            events_analysis_data = {}
+            for partial in partial_counts:
+                merge_counts(events_analysis_data, partial)
+
+        return events_analysis_data
+
+    def count_columnar(self, sources):
+        """
+        Carga las rutas indicadas en un lote columnar. En modo paralelo, cada trabajador usa su propio lote y
+        los recuentos parciales se combinan en un único lote.
+        """
+        sources = list(sources)
+        if self.workers <= 1 or len(sources) < self.parallel_threshold:
+            return EventBatch().load_sources(sources, self.observe)
+
+        return EventBatch.from_events_analysis(self.count_chunks(self.bind_observer(count_log_files_columnar),
+                                                                 sources))
+
+    def derive(self, events_analysis_data, precomputed=None):
+        """
+        Deriva todas las secciones registradas a partir de un recuento de eventos ya construido.
+        Las secciones por defecto ya calculadas (por ejemplo, de forma vectorizada) se toman de precomputed.
+        """
+        precomputed = precomputed or {}
+        return {name: precomputed[name] if name in precomputed and derive is DEFAULT_SECTIONS.get(name)
+                else derive(events_analysis_data)
+                for name, derive in self.sections.items()}
+
+    def analyze(self, sources=None):
+        """
+        Analiza los archivos de log en una sola pasada y devuelve todas las secciones del informe.
+        """
+        if not self.columnar:
+            return self.derive(self.scan(sources))
+
+        if sources is None:
+            sources = self.list_sources()
+
+        batch = self.count_columnar(sources)
+        self.last_sources = list(sources)
+        return self.derive(batch.to_events_analysis(), batch.derive_sections())
@@ -1,10 +1,13 @@
 # modules/Apolo11Simulation.py
-from random import choice
+import random
 import threading
-import time
 import os
 import glob
 
+from modules.Metrics import DISABLED_METRICS
+from modules.Scheduler import FixedRateScheduler
+from modules.SimulationPipeline import SimulationPipeline
+
 
 class Apolo11Simulation:
     """
@@ -13,48 +16,132 @@ class Apolo11Simulation:
     También mantiene un estado de ejecución que determina si la simulación está corriendo o no.
     """
 
-    def __init__(self, data_generator, file_manager, report_generator):
+    def __init__(self, data_generator, file_manager, report_generator, pipelined=False, queue_size=2,
+                 load_profile=None, seed=None, metrics=None, max_cycles=None):
         """
         Inicializa la simulación con un generador de datos, un administrador de archivos y un generador de reportes.
+        Con pipelined, la generación, el análisis y el respaldo se ejecutan como etapas solapadas de un pipeline
+        con colas de tamaño queue_size.
+        load_profile (ver modules/Scheduler.py) fija la cantidad de eventos de cada ciclo y seed hace reproducible
+        la elección de misiones y el contenido de los eventos.
+        metrics (ver modules/Metrics.py) registra la duración de cada etapa del ciclo.
+        max_cycles limita la cantidad de ciclos; por defecto, la simulación corre hasta que se detiene.
         """
         self.data_generator = data_generator
         self.file_manager = file_manager
         self.report_generator = report_generator
+        self.load_profile = load_profile
+        self.metrics = metrics if metrics is not None else DISABLED_METRICS
+        self.rng = random.Random(seed) if seed is not None else random.Random()
+        if seed is not None:
+            self.data_generator.rng = self.rng
+        self.max_cycles = max_cycles
         self.running = False
+        self.stop_event = threading.Event()
+        self.scheduler = None
+        self.thread = None
+        self.pipeline = SimulationPipeline(data_generator, file_manager, report_generator, queue_size,
+                                           self.plan_cycle, self.metrics, max_cycles) if pipelined else None
+
+    def plan_cycle(self, cycle_id):
+        """
+        Devuelve la misión y la cantidad de eventos del ciclo indicado según el perfil de carga.
+        Sin perfil de carga, la cantidad de eventos la decide el generador de datos.
+        """
+        mission_code = self.rng.choice(["ORBONE", "CLNM", "TMRS", "GALXONE", "UNKN"])
+        num_events = self.load_profile.events_for_cycle(cycle_id) if self.load_profile is not None else None
+        return mission_code, num_events
 
     def start_simulation(self, interval=20):
         """
         Inicia la simulación. Genera datos de log, reportes y mueve los archivos procesados a la copia de seguridad.
-        La simulación corre en un ciclo infinito hasta que se llama al método stop_simulation.
+        La simulación corre hasta que se llama al método stop_simulation o hasta completar max_cycles ciclos.
+        Los ciclos empiezan a un ritmo fijo de uno cada interval segundos, sin derivar por la duración del trabajo.
+        """
+        self.prepare_run(interval)
+        self.run_cycles(interval)
+
+    def prepare_run(self, interval=20):
+        """
+        Marca la simulación como en ejecución y rearma la señal de parada, de modo que la misma instancia puede
+        volver a iniciarse después de stop_simulation. En modo pipeline, arranca sus etapas.
         """
         self.running = True
+        self.stop_event.clear()
+        if self.pipeline is not None:
+            self.pipeline.start(interval)
+            self.scheduler = self.pipeline.scheduler
+
+    def run_cycles(self, interval=20):
+        """
+        Ejecuta los ciclos de la simulación hasta que se detiene.
+        """
+        if self.pipeline is not None:
+            self.pipeline.join()
+            return
+
+        self.scheduler = FixedRateScheduler(interval)
+        self.scheduler.start()
         cycle_id = 0
         while self.running:
             cycle_id += 1
-            mission_code = choice(["ORBONE", "CLNM", "TMRS", "GALXONE", "UNKN"])
-            self.data_generator.generate_data_log(mission_code, cycle_id)
-            self.report_generator.generate_reports(cycle_id)
-            self.move_processed_files_to_backup()
-            time.sleep(interval)
+            mission_code, num_events = self.plan_cycle(cycle_id)
+            with self.metrics.timer('cycle_seconds'):
+                with self.metrics.timer('generation_seconds'):
+                    filenames = self.data_generator.generate_data_log(mission_code, cycle_id, num_events)
+                # El informe se hace con los archivos del propio ciclo, aunque el observador de ingesta aún no
+                # los haya recibido
+                sources = [os.path.join(self.data_generator.storage_path, filename) for filename in filenames]
+                with self.metrics.timer('reporting_seconds'):
+                    self.report_generator.generate_reports(cycle_id, sources, move_files=False)
+                processed_files = [os.path.basename(path)
+                                   for path in self.report_generator.analysis_engine.last_sources]
+                self.move_processed_files_to_backup(cycle_id, processed_files)
+            self.metrics.increment('cycles_total')
+            self.metrics.set_gauge('scheduler_overruns', self.scheduler.overruns)
+            if self.max_cycles is not None and cycle_id >= self.max_cycles:
+                break
+            self.scheduler.wait(self.stop_event)
 
     def stop_simulation(self):
         """
         Detiene la simulación. Cambia el estado de ejecución a False.
+        Espera a que el ciclo en curso termine su informe y su respaldo (en modo pipeline, a que los ciclos ya
+        generados terminen de analizarse y respaldarse), de modo que al volver ya se pueden detener los
+        componentes que usa la simulación.
         """
         self.running = False
+        self.stop_event.set()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        self.wait()
 
-    def move_processed_files_to_backup(self):
+    def wait(self):
+        """
+        Espera a que termine el hilo de la simulación iniciado con run.
+        """
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def move_processed_files_to_backup(self, cycle_id=None, filenames=None):
         """
         Mueve los archivos procesados a la copia de seguridad.
+        Si no se indican los nombres de los archivos, se buscan todos los archivos de log del directorio de
+        dispositivos.
         """
-        files_to_move = glob.glob(os.path.join(self.data_generator.storage_path, '*.log'))
-        for file_path in files_to_move:
-            filename = os.path.basename(file_path)
-            self.file_manager.move_to_backup(filename)
+        if filenames is None:
+            files_to_move = glob.glob(os.path.join(self.data_generator.storage_path, '*.log'))
+            filenames = [os.path.basename(file_path) for file_path in files_to_move]
+
+        self.file_manager.archive_cycle(cycle_id, filenames)
 
-    def run(self):
+    def run(self, interval=20):
         """
-        Inicia la simulación en un hilo separado.
+        Inicia la simulación en un hilo separado y devuelve el hilo.
+        El estado de ejecución se prepara antes de arrancar el hilo, para que una llamada inmediata a
+        stop_simulation no quede anulada por el propio hilo.
         """
-        simulation_thread = threading.Thread(target=self.start_simulation)
-        simulation_thread.start()
+        self.prepare_run(interval)
+        self.thread = threading.Thread(target=self.run_cycles, args=(interval,), name='apolo11-simulation')
+        self.thread.start()
+        return self.thread
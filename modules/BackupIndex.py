@@ -0,0 +1,242 @@
+# modules/BackupIndex.py
+import datetime
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import zipfile
+
+from modules.AnalysisEngine import iter_log_events
+from modules.BinaryLog import is_binary, iter_binary_records
+from modules.FileManager import is_bundle, iter_bundle_members
+from modules.SegmentLog import FOOTER_KEY, is_segment
+
+FILTER_COLUMNS = ('mission', 'device_type', 'status', 'hash')
+
+
+def parse_event_date(date):
+    """
+    Convierte la fecha de un evento (ddmmyyHHMISS) al formato ordenable AAAA-MM-DD HH:MM:SS.
+    """
+    try:
+        return datetime.datetime.strptime(date, "%d%m%y%H%M%S").strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_query_date(value):
+    """
+    Normaliza una fecha de consulta (datetime, AAAA-MM-DD o AAAA-MM-DD HH:MM:SS) al formato del índice.
+    """
+    if value is None or isinstance(value, str) and len(value) > 10:
+        return value
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, datetime.date):
+        value = value.isoformat()
+    return f"{value} 00:00:00"
+
+
+def iter_content_events(filename, content):
+    """
+    Recorre los eventos del contenido de un archivo de log leído de un paquete de respaldo.
+    """
+    if is_binary(filename):
+        yield from iter_binary_records(content)
+        return
+    if not is_segment(filename):
+        yield json.loads(content)
+        return
+
+    for line in content.splitlines():
+        try:
+            data = json.loads(line)
+        except ValueError:
+            continue
+        if FOOTER_KEY not in data:
+            yield data
+
+
+class BackupIndex:
+    """
+    Esta clase representa el índice de los respaldos de la simulación de Apollo 11.
+    Guarda en una base SQLite embebida cada evento respaldado por fecha, misión, tipo de dispositivo, estado y hash,
+    de modo que las consultas históricas son búsquedas en el índice en lugar de recorrer el directorio backups.
+    Una vez iniciado, los archivos respaldados se indexan en un hilo en segundo plano, fuera del ciclo de la
+    simulación.
+    """
+
+    def __init__(self, db_path):
+        """
+        Inicializa el índice con la ruta a la base de datos y crea sus tablas si no existen.
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.thread = None
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS events (
+                    date TEXT,
+                    mission TEXT,
+                    device_type TEXT,
+                    status TEXT,
+                    hash TEXT,
+                    source TEXT,
+                    location TEXT
+                );
+                CREATE INDEX IF NOT EXISTS events_by_key ON events (mission, device_type, status, date);
+                CREATE INDEX IF NOT EXISTS events_by_date ON events (date);
+                CREATE INDEX IF NOT EXISTS events_by_hash ON events (hash);
+            """)
+
+    def add_events(self, events):
+        """
+        Añade al índice una secuencia de tuplas (evento, archivo de origen, ubicación en backups).
+        """
+        rows = [(parse_event_date(data.get('date')), data.get('mission'), data.get('device_type'),
+                 data.get('device_status'), data.get('hash'), source, location) for data, source, location in events]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def read_files(self, paths, location=None):
+        """
+        Lee los eventos de los archivos de log y paquetes de respaldo indicados para indexarlos. Si no se indica la
+        ubicación en backups, se usa el nombre de cada archivo o paquete.
+        """
+        events = []
+        for path in paths:
+            filename = os.path.basename(path)
+            try:
+                if is_bundle(filename):
+                    events.extend((data, member, location or filename)
+                                  for member, content in iter_bundle_members(path)
+                                  for data in iter_content_events(member, content))
+                    continue
+                events.extend((data, filename, location or filename) for data in iter_log_events(path))
+            except (OSError, ValueError, zipfile.BadZipFile) as e:
+                logging.error(f"No se pudo indexar el archivo {filename}: {e}")
+        return events
+
+    def index_backups(self, backup_path):
+        """
+        Reconstruye el índice a partir de todo el contenido del directorio backups (archivos y paquetes ZIP).
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM events")
+
+        total = 0
+        for entry in sorted(os.scandir(backup_path), key=lambda entry: entry.name):
+            if is_bundle(entry.name) or entry.name.endswith('.log'):
+                total += self.add_events(self.read_files([entry.path]))
+        return total
+
+    def submit(self, paths):
+        """
+        Indexa archivos ya respaldados (archivos de log o paquetes del directorio backups). Si el índice está
+        iniciado, se encolan para el hilo en segundo plano; si no, se indexan en el momento.
+        """
+        if self.thread is not None:
+            self.queue.put(list(paths))
+        else:
+            self.add_events(self.read_files(paths))
+
+    def start(self):
+        """
+        Empieza a indexar en un hilo en segundo plano los archivos que se envían con submit.
+        """
+        self.thread = threading.Thread(target=self.run, name='apolo11-backup-index', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Bucle del hilo indexador hasta que recibe la marca de fin.
+        """
+        while True:
+            paths = self.queue.get()
+            try:
+                if paths is None:
+                    return
+                self.add_events(self.read_files(paths))
+            except Exception as e:
+                # Un lote que falla no debe detener el hilo, o los siguientes quedarían encolados para siempre
+                logging.error(f"No se pudieron indexar los archivos respaldados: {e}")
+            finally:
+                self.queue.task_done()
+
+    def join(self):
+        """
+        Espera a que se indexen todos los archivos enviados.
+        """
+        self.queue.join()
+
+    def stop(self):
+        """
+        Indexa los archivos pendientes y detiene el hilo indexador.
+        """
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def where(self, mission=None, device_type=None, status=None, hash=None, since=None, until=None):
+        """
+        Construye la cláusula WHERE y sus parámetros a partir de los filtros de una consulta.
+        """
+        filters = {'mission': mission, 'device_type': device_type, 'status': status, 'hash': hash}
+        clauses = [f"{column} = ?" for column in FILTER_COLUMNS if filters[column] is not None]
+        params = [filters[column] for column in FILTER_COLUMNS if filters[column] is not None]
+        if since is not None:
+            clauses.append("date >= ?")
+            params.append(parse_query_date(since))
+        if until is not None:
+            clauses.append("date < ?")
+            params.append(parse_query_date(until))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, **filters):
+        """
+        Devuelve la cantidad de eventos respaldados que cumplen los filtros (misión, tipo de dispositivo, estado,
+        hash y rango de fechas since/until).
+        """
+        where, params = self.where(**filters)
+        with self.lock:
+            return self.connection.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+    def count_by(self, group_by=('mission', 'device_type', 'status'), **filters):
+        """
+        Devuelve la cantidad de eventos agrupada por las columnas indicadas, como lista de tuplas.
+        """
+        columns = [column for column in group_by if column in FILTER_COLUMNS + ('date',)]
+        if not columns:
+            raise ValueError(f"Columnas de agrupación no válidas: {group_by}")
+        where, params = self.where(**filters)
+        select = ", ".join(columns)
+        with self.lock:
+            return self.connection.execute(
+                f"SELECT {select}, COUNT(*) FROM events{where} GROUP BY {select} ORDER BY {select}", params).fetchall()
+
+    def find(self, limit=100, **filters):
+        """
+        Devuelve los eventos respaldados que cumplen los filtros, junto con su archivo de origen y su ubicación.
+        """
+        where, params = self.where(**filters)
+        with self.lock:
+            return self.connection.execute(f"SELECT * FROM events{where} ORDER BY date LIMIT ?",
+                                           params + [limit]).fetchall()
+
+    def close(self):
+        """
+        Cierra la conexión con la base de datos del índice.
+        """
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,192 @@
+# modules/BenchmarkSuite.py
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from modules.DataGenerator import DataGenerator
+from modules.FileManager import FileManager
+from modules.ReportGenerator import ReportGenerator
+
+BENCHMARKS = ('generation', 'analysis', 'backup', 'dashboard')
+
+
+def percentile(values, fraction):
+    """
+    Devuelve el percentil indicado (entre 0 y 1) de una lista de valores, por el método del rango más cercano.
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def compare_results(current, baseline, threshold=0.1):
+    """
+    Compara dos resultados de la suite y devuelve las regresiones: casos cuyo rendimiento cayó más que threshold
+    (fracción) respecto a la línea base.
+    """
+    baseline_cases = {(case['benchmark'], case['format'], case['size']): case for case in baseline['results']}
+    regressions = []
+    for case in current['results']:
+        reference = baseline_cases.get((case['benchmark'], case['format'], case['size']))
+        if reference is None or not reference['throughput']:
+            continue
+        change = case['throughput'] / reference['throughput'] - 1
+        if change < -threshold:
+            regressions.append({'benchmark': case['benchmark'], 'format': case['format'], 'size': case['size'],
+                                'baseline': reference['throughput'], 'current': case['throughput'], 'change': change})
+    return regressions
+
+
+class BenchmarkSuite:
+    """
+    Esta clase representa la suite de rendimiento de la simulación de Apollo 11.
+    Mide la generación de datos, el análisis, el respaldo y la generación del tablero de control con distintos
+    tamaños de entrada, siempre sobre directorios temporales, e informa del rendimiento, los percentiles de
+    latencia y el pico de memoria de cada caso.
+    """
+
+    def __init__(self, sizes=(1000, 10000, 100000), repeats=5, formats=('json', 'segment'), seed=1969,
+                 benchmarks=BENCHMARKS):
+        """
+        Inicializa la suite con los tamaños de entrada (eventos), las repeticiones de cada caso, los formatos de
+        archivo de log, la semilla de los datos y los bancos de prueba a ejecutar.
+        """
+        self.sizes = sizes
+        self.repeats = repeats
+        self.formats = formats
+        self.seed = seed
+        self.benchmarks = benchmarks
+
+    def workspace(self):
+        """
+        Crea un directorio temporal con la estructura devices, backups y reports.
+        """
+        base_path = tempfile.mkdtemp(prefix='apolo11-bench-')
+        for name in ('devices', 'backups', 'reports'):
+            os.makedirs(os.path.join(base_path, name))
+        return base_path
+
+    def generate(self, base_path, size, file_format):
+        """
+        Genera size eventos reproducibles en el directorio de dispositivos y devuelve los nombres de los archivos.
+        """
+        data_generator = DataGenerator(os.path.join(base_path, 'devices'), segment_mode=file_format == 'segment',
+                                       events_per_cycle=size, rng=random.Random(self.seed),
+                                       binary_mode=file_format == 'binary')
+        return data_generator.generate_data_log('ORBONE', 1)
+
+    def report_generator(self, base_path):
+        """
+        Crea un generador de reportes sobre el directorio temporal.
+        """
+        return ReportGenerator(os.path.join(base_path, 'devices'), os.path.join(base_path, 'backups'),
+                               os.path.join(base_path, 'reports'))
+
+    def prepare(self, benchmark, size, file_format):
+        """
+        Prepara un caso y devuelve la función que se mide y la función que limpia el directorio temporal.
+        La preparación (por ejemplo, generar los datos que se van a analizar) no forma parte de la medida.
+        """
+        base_path = self.workspace()
+        cleanup = lambda: shutil.rmtree(base_path, ignore_errors=True)
+
+        if benchmark == 'generation':
+            return lambda: self.generate(base_path, size, file_format), cleanup
+
+        filenames = self.generate(base_path, size, file_format)
+        report_generator = self.report_generator(base_path)
+
+        if benchmark == 'analysis':
+            return report_generator.analyze_and_manage, cleanup
+        if benchmark == 'backup':
+            archive_mode = 'bundle' if file_format != 'json' else 'move'
+            file_manager = FileManager(base_path, archive_mode)
+            return lambda: file_manager.archive_cycle(1, filenames), cleanup
+
+        analysis_data = report_generator.analyze_and_manage()
+        return lambda: report_generator.generate_dashboard(analysis_data, 1), cleanup
+
+    def measure(self, benchmark, size, file_format):
+        """
+        Ejecuta un caso repeats veces, más una pasada adicional con tracemalloc para medir el pico de memoria.
+        """
+        latencies = []
+        for _ in range(self.repeats):
+            run, cleanup = self.prepare(benchmark, size, file_format)
+            try:
+                start = time.perf_counter()
+                run()
+                latencies.append(time.perf_counter() - start)
+            finally:
+                cleanup()
+
+        run, cleanup = self.prepare(benchmark, size, file_format)
+        try:
+            tracemalloc.start()
+            run()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            cleanup()
+
+        median = percentile(latencies, 0.5)
+        return {
+            'benchmark': benchmark,
+            'format': file_format,
+            'size': size,
+            'repeats': self.repeats,
+            'latencies': latencies,
+            'p50': median,
+            'p90': percentile(latencies, 0.9),
+            'p99': percentile(latencies, 0.99),
+            'throughput': size / median if median > 0 else None,
+            'peak_memory': peak_memory
+        }
+
+    def run(self, progress=None):
+        """
+        Ejecuta todos los casos de la suite y devuelve los resultados con los metadatos de la ejecución.
+        """
+        results = []
+        for benchmark in self.benchmarks:
+            for file_format in self.formats:
+                for size in self.sizes:
+                    result = self.measure(benchmark, size, file_format)
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+
+        return {
+            'meta': {
+                'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'seed': self.seed,
+                'repeats': self.repeats
+            },
+            'results': results
+        }
+
+    @staticmethod
+    def save(results, path):
+        """
+        Guarda los resultados de la suite en un archivo JSON para compararlos con ejecuciones posteriores.
+        """
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    @staticmethod
+    def load(path):
+        """
+        Carga los resultados de una ejecución anterior de la suite.
+        """
+        with open(path, 'r') as file:
+            return json.load(file)
@@ -0,0 +1,238 @@
+# modules/BinaryLog.py
+import calendar
+import datetime
+import json
+import mmap
+import os
+import struct
+from collections import Counter
+
+from modules.EventCounts import new_state_counts
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BINARY_PREFIX = 'APLBIN-'
+BINARY_PART_SUFFIX = '.part'
+MAGIC = b'APLBIN1\n'
+HEADER_LENGTH = struct.Struct('<I')
+# Registro fijo: misión, tipo de dispositivo y estado (un byte cada uno), relleno, fecha en segundos y hash en bruto
+RECORD = struct.Struct('<BBBxI32s')
+MISSION_OFFSET, DEVICE_TYPE_OFFSET, STATUS_OFFSET, DATE_OFFSET, HASH_OFFSET = 0, 1, 2, 4, 8
+DATE_FORMAT = "%d%m%y%H%M%S"
+
+
+def is_binary(path):
+    """
+    Indica si una ruta corresponde a un archivo de log binario de registros fijos.
+    """
+    return os.path.basename(path).startswith(BINARY_PREFIX)
+
+
+def binary_filename(cycle_id, sequence):
+    """
+    Devuelve el nombre de un archivo binario siguiendo el estándar de los archivos de log:
+    APLBIN-<ciclo><secuencia>.log
+    """
+    return f'{BINARY_PREFIX}{cycle_id:04d}{sequence:03d}.log'
+
+
+def encode_date(date):
+    """
+    Convierte la fecha de un evento (ddmmyyHHMMSS) en segundos desde 1970.
+    """
+    return calendar.timegm(datetime.datetime.strptime(date, DATE_FORMAT).timetuple())
+
+
+def decode_date(seconds):
+    """
+    Convierte segundos desde 1970 en la fecha de un evento (ddmmyyHHMMSS).
+    """
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).strftime(DATE_FORMAT)
+
+
+def parse_header(buffer):
+    """
+    Lee la cabecera de un archivo binario (sus vocabularios) y devuelve la cabecera y el desplazamiento del
+    primer registro.
+    """
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("No es un archivo de log binario")
+    (length,) = HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+    start = len(MAGIC) + HEADER_LENGTH.size
+    header = json.loads(bytes(buffer[start:start + length]))
+    return header, start + length
+
+
+def record_count(buffer, offset):
+    """
+    Devuelve la cantidad de registros completos de un archivo binario.
+    """
+    return (len(buffer) - offset) // RECORD.size
+
+
+def iter_binary_records(buffer):
+    """
+    Recorre los eventos de un contenido binario como diccionarios con el formato de los archivos de log.
+    """
+    header, offset = parse_header(buffer)
+    missions, device_types, statuses = header['missions'], header['device_types'], header['statuses']
+    end = offset + record_count(buffer, offset) * RECORD.size
+    for mission_code, device_type_code, status_code, date, digest in RECORD.iter_unpack(buffer[offset:end]):
+        yield {
+            'date': decode_date(date),
+            'mission': missions[mission_code],
+            'device_type': device_types[device_type_code],
+            'device_status': statuses[status_code],
+            'hash': digest.hex()
+        }
+
+
+def count_binary_buffer(buffer):
+    """
+    Devuelve el recuento misión × tipo de dispositivo × estado de un contenido binario.
+    Las columnas de categorías se leen como vistas con paso fijo sobre el contenido, sin copiarlo ni decodificar
+    cada registro; con NumPy se usa una matriz de bytes sobre el mismo contenido y bincount.
+    """
+    header, offset = parse_header(buffer)
+    missions, device_types, statuses = header['missions'], header['device_types'], header['statuses']
+    records = record_count(buffer, offset)
+    end = offset + records * RECORD.size
+
+    if numpy is not None and records:
+        table = numpy.frombuffer(buffer, dtype=numpy.uint8, count=records * RECORD.size, offset=offset)
+        table = table.reshape(records, RECORD.size)
+        keys = ((table[:, MISSION_OFFSET].astype(numpy.int64) * len(device_types) + table[:, DEVICE_TYPE_OFFSET])
+                * len(statuses) + table[:, STATUS_OFFSET])
+        bins = numpy.bincount(keys)
+        cells = {}
+        for flat in numpy.flatnonzero(bins):
+            mission_code, rest = divmod(int(flat), len(device_types) * len(statuses))
+            cells[(mission_code,) + divmod(rest, len(statuses))] = int(bins[flat])
+        del table, keys
+    else:
+        with memoryview(buffer) as view:
+            cells = Counter(zip(view[offset + MISSION_OFFSET:end:RECORD.size],
+                                view[offset + DEVICE_TYPE_OFFSET:end:RECORD.size],
+                                view[offset + STATUS_OFFSET:end:RECORD.size]))
+
+    events_analysis_data = {}
+    for mission_code, device_type_code, status_code in cells:
+        devices = events_analysis_data.setdefault(missions[mission_code], {})
+        state_counts = devices.get(device_types[device_type_code])
+        if state_counts is None:
+            state_counts = devices[device_types[device_type_code]] = new_state_counts()
+        status = statuses[status_code]
+        state_counts[status] = state_counts.get(status, 0) + cells[(mission_code, device_type_code, status_code)]
+    return events_analysis_data
+
+
+def map_file(path):
+    """
+    Proyecta un archivo binario en memoria en modo de solo lectura.
+    """
+    with open(path, 'rb') as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def count_binary(path):
+    """
+    Devuelve el recuento misión × tipo de dispositivo × estado de un archivo binario proyectado en memoria.
+    """
+    mapped = map_file(path)
+    try:
+        return count_binary_buffer(mapped)
+    finally:
+        mapped.close()
+
+
+def iter_binary_events(path):
+    """
+    Recorre los eventos de un archivo binario proyectado en memoria.
+    """
+    mapped = map_file(path)
+    try:
+        yield from iter_binary_records(mapped)
+    finally:
+        mapped.close()
+
+
+class BinaryLogWriter:
+    """
+    Esta clase representa el escritor de logs binarios de la simulación de Apollo 11.
+    Cada evento ocupa un registro fijo de 40 bytes (frente a unos 200 en JSON): códigos de un byte para misión,
+    tipo de dispositivo y estado, la fecha en segundos y los 32 bytes del hash. Los vocabularios se guardan una
+    sola vez en la cabecera. Como los segmentos, el archivo se escribe con un nombre temporal, se rota al superar
+    un tamaño máximo y se publica con su nombre definitivo al cerrarse.
+    """
+
+    def __init__(self, storage_path, cycle_id, missions, device_types, statuses, max_bytes=4 * 1024 * 1024):
+        """
+        Inicializa el escritor con el directorio de almacenamiento, el ciclo, los vocabularios de cada categoría
+        y el tamaño máximo de cada archivo en bytes.
+        """
+        self.storage_path = storage_path
+        self.cycle_id = cycle_id
+        self.max_bytes = max_bytes
+        self.header = {'cycle': cycle_id, 'record_size': RECORD.size, 'missions': list(missions),
+                       'device_types': list(device_types), 'statuses': list(statuses)}
+        self.mission_index = {value: code for code, value in enumerate(missions)}
+        self.device_type_index = {value: code for code, value in enumerate(device_types)}
+        self.status_index = {value: code for code, value in enumerate(statuses)}
+        self.dates = {}
+        self.sequence = 0
+        self.filenames = []
+        self.file = None
+
+    def open_file(self):
+        """
+        Abre un nuevo archivo temporal para el ciclo y escribe su cabecera.
+        """
+        self.filename = binary_filename(self.cycle_id, self.sequence)
+        self.part_path = os.path.join(self.storage_path, self.filename + BINARY_PART_SUFFIX)
+        self.file = open(self.part_path, 'wb')
+        header = json.dumps(self.header).encode()
+        self.file.write(MAGIC + HEADER_LENGTH.pack(len(header)) + header)
+        self.bytes = self.file.tell()
+
+    def append(self, data):
+        """
+        Añade un evento al archivo actual y lo rota si supera el tamaño máximo.
+        """
+        if self.file is None:
+            self.open_file()
+
+        date = self.dates.get(data['date'])
+        if date is None:
+            date = self.dates[data['date']] = encode_date(data['date'])
+
+        try:
+            record = RECORD.pack(self.mission_index[data['mission']], self.device_type_index[data['device_type']],
+                                 self.status_index[data['device_status']], date, bytes.fromhex(data['hash']))
+        except KeyError as e:
+            raise ValueError(f"Categoría fuera del vocabulario del log binario: {e}")
+
+        self.file.write(record)
+        self.bytes += RECORD.size
+        if self.bytes >= self.max_bytes:
+            self.seal()
+
+    def seal(self):
+        """
+        Cierra el archivo actual y lo publica con su nombre definitivo.
+        """
+        self.file.close()
+        self.file = None
+        os.replace(self.part_path, os.path.join(self.storage_path, self.filename))
+        self.filenames.append(self.filename)
+        self.sequence += 1
+
+    def close(self):
+        """
+        Publica el archivo abierto, si lo hay, y devuelve los nombres de los archivos escritos.
+        """
+        if self.file is not None:
+            self.seal()
+        return self.filenames
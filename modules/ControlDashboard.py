@@ -2,58 +2,9 @@
 import json
 import os
 
-
-def generate_html_table(headers, rows):
-    """
-    Genera una tabla HTML a partir de los encabezados y filas proporcionados.
-    """
-    html = "<table style='border-collapse: collapse; border: 2px solid black; text-align: center;'>\n"
-    html += "<tr>" + "".join(
-        [f"<th style='border: 2px solid black;'>{header}</th>" for header in headers]) + "</tr>\n"
-    html += "".join([f"<tr>" + "".join(
-        [f"<td style='border: 2px solid black;'>{row[i]}</td>" for i in range(len(row))]) + "</tr>\n" for row in
-                     rows])
-    html += "</table>\n"
-    return html
-
-
-def generate_percentages_section(data):
-    """
-    Genera la sección de porcentajes del panel de control.
-    """
-    headers = ["Misión", "Tipo de Dispositivo", "Estado", "Porcentaje"]
-    rows = [[mission, device_type, state, percentage] for mission, devices in data.items() for
-            device_type, percentages in devices.items() for state, percentage in percentages.items()]
-    return generate_html_table(headers, rows)
-
-
-def generate_consolidation_section(data):
-    """
-    Genera la sección de consolidación de misiones del panel de control.
-    """
-    headers = ["Tipo de Dispositivo", "Cantidad de Dispositivos"]
-    rows = [[device_type, count] for device_type, count in data.items()]
-    return generate_html_table(headers, rows)
-
-
-def generate_disconnection_section(data):
-    """
-    Genera la sección de gestión de desconexiones del panel de control.
-    """
-    headers = ["Misión", "Tipo de Dispositivo", "Cantidad de Desconexiones"]
-    rows = [[mission, device_type, count] for mission, devices in data.items() for device in devices for
-            device_type, count in device.items()]
-    return generate_html_table(headers, rows)
-
-
-def generate_events_section(data):
-    """
-    Genera la sección de análisis de eventos del panel de control.
-    """
-    headers = ["Misión", "Tipo de Dispositivo", "Estado", "Cantidad"]
-    rows = [[mission, device_type, state, count] for mission, devices in data.items() for device_type, state_counts
-            in devices.items() for state, count in state_counts.items()]
-    return generate_html_table(headers, rows)
+from modules.AnalysisEngine import derive_consolidation, derive_percentages
+from modules.DashboardRenderer import DashboardRenderer, SECTIONS, html_table
+from modules.EventCounts import STATUS_CHOICES
 
 
 class ControlDashboard:
@@ -62,17 +13,26 @@ class ControlDashboard:
     Se encarga de leer los archivos de reporte y generar el panel de control correspondiente.
     """
 
-    def __init__(self, report_path):
+    def __init__(self, report_path, rollups=None, archive=None):
         """
         Inicializa el panel de control con la ruta al directorio de reportes.
+        Con un almacén de agregados temporales (RollupStore), puede mostrar el histórico de cualquier intervalo.
+        Con un archivo de informes (ReportArchive), el panel se genera consultándolo en lugar de leer cada reporte.
         """
         self.report_path = report_path
+        self.rollups = rollups
+        self.archive = archive
 
-    def display_dashboard(self):
+    def display_dashboard(self, last_n=10):
         """
-        Muestra el panel de control. Lee todos los archivos de reporte en el directorio de reportes
+        Muestra el panel de control. Con un archivo de informes, genera el panel de tendencias de los últimos
+        last_n informes. Si no, lee todos los archivos de reporte en el directorio de reportes
         y genera un panel de control para cada archivo de reporte.
         """
+        if self.archive is not None:
+            self.display_trends(last_n)
+            return
+
         report_files = [files for files in os.listdir(self.report_path) if files.endswith(".json")]
 
         for report_file in report_files:
@@ -82,6 +42,22 @@ class ControlDashboard:
 
             self.create_dashboard(report_data, report_file)
 
+    def display_trends(self, last_n=10):
+        """
+        Genera el panel de tendencias (Tendencias.md): para cada misión, el porcentaje de cada estado en los
+        últimos last_n informes, consultado en el archivo de informes.
+        """
+        trends_filepath = os.path.join(self.report_path, 'Tendencias.md')
+
+        with open(trends_filepath, 'w') as trends_file:
+            trends_file.write(f"\n# Tendencias de los últimos {last_n} informes\n")
+            for mission in self.archive.missions():
+                rows = [[entry['cycle_id'], entry['created'], entry['total']] +
+                        [f"{entry['percentages'][status]:.2f}%" for status in STATUS_CHOICES]
+                        for entry in self.archive.status_percentages(mission, last_n)]
+                trends_file.write(f"\n## {mission}\n")
+                trends_file.write(html_table(["Ciclo", "Fecha", "Eventos"] + STATUS_CHOICES, rows))
+
     def create_dashboard(self, data, filename):
         """
         Crea un panel de control para los datos del reporte dado.
@@ -94,26 +70,35 @@ class ControlDashboard:
             for key, value in data.items():
                 dashboard_file.write(f"{key}: {value}\n")
 
-    def generate_dashboard(self, analysis_data, cycle_id):
+    def generate_dashboard(self, analysis_data, cycle_id, dashboard=None):
         """
-        Genera un panel de control para el análisis de la simulación.
+        Genera un panel de control para el análisis de la simulación con el generador de tablero indicado (por
+        defecto, el tablero Markdown rotativo del directorio de reportes).
         """
-        dashboard_filename = 'Dashboard.md'
-        dashboard_filepath = os.path.join(self.report_path, dashboard_filename)
+        if dashboard is None:
+            dashboard = DashboardRenderer(self.report_path)
+        dashboard.render_cycle(analysis_data, cycle_id)
 
-        with open(dashboard_filepath, 'a') as dashboard_file:
-            dashboard_file.write(f"\n# Análisis para Ciclo {cycle_id}\n")
-
-            sections = [
-                ("Análisis de Eventos", generate_events_section, analysis_data['events_analysis']),
-                ("Gestión de Desconexiones", generate_disconnection_section, analysis_data['disconnection_management']),
-                ("Consolidación de Misiones", generate_consolidation_section, analysis_data['consolidation']),
-                ("Porcentajes", generate_percentages_section, analysis_data['percentage_calculation'])
-            ]
-
-            for title, generate_section, data in sections:
-                dashboard_file.write(f"\n## {title}\n")
-                if title == "Porcentajes":
-                    dashboard_file.write(generate_section(data, include_total=True)) # Modificación aquí
-                else:
-                    dashboard_file.write(generate_section(data))
\ No newline at end of file
+    def display_history(self, since, until=None, level='hour'):
+        """
+        Genera el panel histórico (Historico.md) del intervalo [since, until) a partir de los agregados temporales,
+        sin leer los archivos de reporte: el recuento total, los inoperables, los porcentajes y la evolución por
+        periodos del nivel indicado ('minute', 'hour' o 'day').
+        """
+        events_analysis_data = self.rollups.query(since, until)
+        history_filepath = os.path.join(self.report_path, 'Historico.md')
+
+        sections = {
+            'events_analysis': events_analysis_data,
+            'consolidation': derive_consolidation(events_analysis_data),
+            'percentage_calculation': derive_percentages(events_analysis_data)
+        }
+
+        with open(history_filepath, 'w') as history_file:
+            history_file.write(f"\n# Histórico desde {since} hasta {until or 'ahora'}\n")
+            for key, title, headers, rows in SECTIONS:
+                if key in sections:
+                    history_file.write(f"\n## {title}\n" + html_table(headers, rows(sections[key])))
+            history_file.write("\n## Evolución\n")
+            history_file.write(html_table(["Periodo", "Eventos", "Inoperables"],
+                                          self.rollups.series(level, since, until)))
@@ -0,0 +1,274 @@
+# modules/DashboardRenderer.py
+import csv
+import html
+import io
+import os
+import re
+
+from modules.DurableWriter import DurableWriter
+
+TABLE_OPEN = "<table style='border-collapse: collapse; border: 2px solid black; text-align: center;'>\n"
+CYCLE_HEADER = re.compile(r'^# Análisis para Ciclo (\S+)$', re.MULTILINE)
+EXTENSIONS = {'md': '.md', 'html': '.html', 'csv': '.csv'}
+
+
+def events_rows(data):
+    """
+    Filas de la sección de análisis de eventos: misión, tipo de dispositivo, estado y cantidad.
+    """
+    return ([mission, device_type, state, count] for mission, devices in data.items()
+            for device_type, state_counts in devices.items() for state, count in state_counts.items())
+
+
+def disconnection_rows(data):
+    """
+    Filas de la sección de gestión de desconexiones: misión, tipo de dispositivo y cantidad de desconexiones.
+    """
+    return ([mission, device['device_type'], device['unknown_count']] for mission, devices in data.items()
+            for device in devices)
+
+
+def consolidation_rows(data):
+    """
+    Filas de la sección de consolidación de misiones: tipo de dispositivo y cantidad de dispositivos inoperables.
+    """
+    return ([device_type, count] for device_type, count in data.items())
+
+
+def percentage_rows(data):
+    """
+    Filas de la sección de porcentajes: misión, tipo de dispositivo, estado y porcentaje.
+    """
+    return ([mission, device_type, state, f"{percentage:.2f}%"] for mission, devices in data.items()
+            for device_type, percentages in devices.items() for state, percentage in percentages.items())
+
+
+def hotspot_rows(data):
+    """
+    Filas de la sección de dispositivos con más fallos: misión, dispositivo, tipo de dispositivo y fallos estimados.
+    """
+    return ([mission, device['device_id'], device['device_type'], device['failures']]
+            for mission, devices in data.items() for device in devices)
+
+
+def distinct_rows(data):
+    """
+    Filas de la sección de dispositivos distintos: misión y cantidad estimada de dispositivos.
+    """
+    return ([mission, count] for mission, count in data.items())
+
+
+# Secciones del tablero: clave del análisis, título, encabezados y función que genera las filas
+SECTIONS = (
+    ('events_analysis', "Análisis de Eventos", ["Misión", "Tipo de Dispositivo", "Estado", "Cantidad"], events_rows),
+    ('disconnection_management', "Gestión de Desconexiones",
+     ["Misión", "Tipo de Dispositivo", "Cantidad de Desconexiones"], disconnection_rows),
+    ('consolidation', "Consolidación de Misiones", ["Tipo de Dispositivo", "Cantidad de Dispositivos"],
+     consolidation_rows),
+    ('percentage_calculation', "Porcentajes", ["Misión", "Tipo de Dispositivo", "Estado", "Porcentaje"],
+     percentage_rows),
+    ('device_hotspots', "Dispositivos con Más Fallos", ["Misión", "Dispositivo", "Tipo de Dispositivo",
+                                                        "Fallos (estimados)"], hotspot_rows),
+    ('distinct_devices', "Dispositivos Distintos", ["Misión", "Dispositivos (estimados)"], distinct_rows)
+)
+
+
+def html_table(headers, rows):
+    """
+    Genera una tabla HTML a partir de los encabezados y filas proporcionados, en una sola cadena.
+    Los valores se escapan, ya que misiones, tipos y dispositivos vienen de archivos de log que pueden escribir
+    productores externos.
+    """
+    return "".join([
+        TABLE_OPEN,
+        "<tr>", "".join(f"<th style='border: 2px solid black;'>{html.escape(str(header))}</th>" for header in headers),
+        "</tr>\n",
+        "".join("<tr>" + "".join(f"<td style='border: 2px solid black;'>{html.escape(str(cell))}</td>" for cell in row)
+                + "</tr>\n" for row in rows),
+        "</table>\n"
+    ])
+
+
+def render_markdown(analysis_data, cycle_id):
+    """
+    Devuelve el bloque Markdown de un ciclo: su encabezado y una tabla HTML por sección.
+    """
+    parts = [f"\n# Análisis para Ciclo {cycle_id}\n"]
+    for key, title, headers, rows in SECTIONS:
+        if key in analysis_data:
+            parts.append(f"\n## {title}\n")
+            parts.append(html_table(headers, rows(analysis_data[key])))
+    return "".join(parts)
+
+
+def render_html(analysis_data, cycle_id):
+    """
+    Devuelve el bloque HTML de un ciclo.
+    """
+    parts = [f"<h1>Análisis para Ciclo {cycle_id}</h1>\n"]
+    for key, title, headers, rows in SECTIONS:
+        if key in analysis_data:
+            parts.append(f"<h2>{title}</h2>\n")
+            parts.append(html_table(headers, rows(analysis_data[key])))
+    return "".join(parts)
+
+
+def render_csv(analysis_data, cycle_id):
+    """
+    Devuelve las filas CSV de un ciclo: ciclo, sección y las columnas de cada fila de la sección.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for key, _, _, rows in SECTIONS:
+        if key in analysis_data:
+            writer.writerows([cycle_id, key] + row for row in rows(analysis_data[key]))
+    return buffer.getvalue()
+
+
+RENDERERS = {'md': render_markdown, 'html': render_html, 'csv': render_csv}
+FILE_HEADERS = {
+    'md': "",
+    'html': "<!DOCTYPE html>\n<meta charset='utf-8'>\n<title>Tablero de Control</title>\n",
+    'csv': "ciclo,seccion,columna1,columna2,columna3,columna4\n"
+}
+
+
+class DashboardRenderer:
+    """
+    Esta clase representa el generador del tablero de control de la simulación de Apollo 11.
+    Escribe cada ciclo con una única escritura por formato (Markdown, HTML o CSV) a partir de los mismos datos del
+    análisis, y rota el tablero activo cuando supera un tamaño o una cantidad de ciclos: la parte llena se renombra
+    a <nombre>-<número>.<ext> y se anota en una página índice, de modo que ningún archivo crece sin límite.
+    """
+
+    def __init__(self, reports_path, formats=('md',), max_bytes=1024 * 1024, max_cycles=100, max_parts=None,
+                 basename='Dashboard', writer=None):
+        """
+        Inicializa el generador con el directorio de reportes, los formatos de salida y los límites de rotación.
+        Con max_parts se conservan solo las últimas partes rotadas de cada formato. writer es la capa de escritura
+        (DurableWriter) con la que se añade cada ciclo; por defecto, escritura atómica sin sincronizar.
+        """
+        self.reports_path = reports_path
+        self.formats = formats
+        self.max_bytes = max_bytes
+        self.max_cycles = max_cycles
+        self.max_parts = max_parts
+        self.basename = basename
+        self.writer = writer if writer is not None else DurableWriter()
+        # Ciclos escritos en el tablero activo de cada formato; se leen del archivo la primera vez
+        self.cycles = {}
+
+    def active_path(self, file_format='md'):
+        """
+        Devuelve la ruta del tablero activo de un formato.
+        """
+        return os.path.join(self.reports_path, self.basename + EXTENSIONS[file_format])
+
+    def index_path(self, file_format='md'):
+        """
+        Devuelve la ruta de la página índice de las partes rotadas de un formato.
+        """
+        return os.path.join(self.reports_path, f'{self.basename}-index{EXTENSIONS[file_format]}')
+
+    def part_names(self, file_format='md'):
+        """
+        Devuelve los nombres de las partes rotadas de un formato, de la más antigua a la más reciente.
+        """
+        pattern = re.compile(rf'^{re.escape(self.basename)}-(\d+){re.escape(EXTENSIONS[file_format])}$')
+        return sorted((name for name in os.listdir(self.reports_path) if pattern.match(name)),
+                      key=lambda name: int(pattern.match(name).group(1)))
+
+    def cycles_in(self, path, file_format):
+        """
+        Devuelve los ciclos escritos en un tablero activo leyéndolo (su tamaño está acotado por la rotación).
+        """
+        with open(path, 'r') as file:
+            content = file.read()
+        if file_format == 'md':
+            return CYCLE_HEADER.findall(content)
+        if file_format == 'html':
+            return re.findall(r'<h1>Análisis para Ciclo (\S+)</h1>', content)
+        return list(dict.fromkeys(line.split(',', 1)[0] for line in content.splitlines()[1:] if line))
+
+    def render_cycle(self, analysis_data, cycle_id):
+        """
+        Añade el análisis de un ciclo al tablero activo de cada formato, rotándolo antes si está lleno.
+        """
+        for file_format in self.formats:
+            path = self.active_path(file_format)
+            block = RENDERERS[file_format](analysis_data, cycle_id)
+            pending = self.writer.pending(path)
+            if os.path.exists(path) and not pending:
+                if file_format not in self.cycles:
+                    self.cycles[file_format] = self.cycles_in(path, file_format)
+                self.rotate_if_full(path, file_format, len(block.encode()))
+
+            is_new = not os.path.exists(path) and not pending
+            self.writer.append(path, FILE_HEADERS[file_format] + block if is_new else block)
+            self.cycles.setdefault(file_format, []).append(str(cycle_id))
+
+    def rotate_if_full(self, path, file_format, block_bytes=0):
+        """
+        Rota el tablero activo si ya tiene la cantidad máxima de ciclos o si el siguiente bloque le haría superar el
+        tamaño máximo (un tablero con un único ciclo más grande que el límite no se rota).
+        """
+        cycles = self.cycles[file_format]
+        if len(cycles) < self.max_cycles and (not cycles or os.path.getsize(path) + block_bytes <= self.max_bytes):
+            return
+
+        parts = self.part_names(file_format)
+        number = int(re.findall(r'\d+', parts[-1])[-1]) + 1 if parts else 1
+        part_name = f'{self.basename}-{number:04d}{EXTENSIONS[file_format]}'
+        os.replace(path, os.path.join(self.reports_path, part_name))
+
+        cycle_range = f"{cycles[0]} a {cycles[-1]}" if cycles else "-"
+        self.append_index(file_format, part_name, cycle_range, len(cycles))
+        self.cycles[file_format] = []
+
+        if self.max_parts is not None:
+            removed = (parts + [part_name])[:-self.max_parts]
+            for old_part in removed:
+                os.remove(os.path.join(self.reports_path, old_part))
+            if removed:
+                self.prune_index(file_format, removed)
+
+    def append_index(self, file_format, part_name, cycle_range, cycle_count):
+        """
+        Anota una parte rotada en la página índice del formato.
+        """
+        index_path = self.index_path(file_format)
+        is_new = not os.path.exists(index_path) and not self.writer.pending(index_path)
+        if file_format == 'csv':
+            line = f"{part_name},{cycle_range},{cycle_count}\n"
+            header = "parte,ciclos,cantidad\n"
+        elif file_format == 'html':
+            line = f"<li><a href='{part_name}'>{part_name}</a>: ciclos {cycle_range} ({cycle_count})</li>\n"
+            header = FILE_HEADERS['html'] + "<h1>Índice del Tablero de Control</h1>\n"
+        else:
+            line = f"- [{part_name}]({part_name}): ciclos {cycle_range} ({cycle_count})\n"
+            header = "# Índice del Tablero de Control\n\n"
+
+        self.writer.append(index_path, header + line if is_new else line)
+
+    def prune_index(self, file_format, removed):
+        """
+        Quita de la página índice las partes eliminadas por la retención.
+        El índice se lee a través de la capa de escritura para incluir lo que aún esté preparado sin publicar.
+        """
+        index_path = self.index_path(file_format)
+        lines = self.writer.read(index_path).splitlines(keepends=True)
+        removed = set(removed)
+        self.writer.write(index_path, "".join(line for line in lines if not removed.intersection(re.findall(
+            rf'{re.escape(self.basename)}-\d+{re.escape(EXTENSIONS[file_format])}', line))))
+
+    def reset(self):
+        """
+        Elimina el tablero activo, sus partes rotadas y su índice en todos los formatos.
+        """
+        for file_format in self.formats:
+            for name in self.part_names(file_format):
+                os.remove(os.path.join(self.reports_path, name))
+            for path in (self.active_path(file_format), self.index_path(file_format)):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.cycles = {}
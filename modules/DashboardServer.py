@@ -0,0 +1,207 @@
+# modules/DashboardServer.py
+import collections
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.DashboardRenderer import render_html
+
+# Vistas del análisis que se publican como JSON: ruta -> sección del análisis
+VIEWS = {
+    '/api/events': 'events_analysis',
+    '/api/disconnections': 'disconnection_management',
+    '/api/consolidation': 'consolidation',
+    '/api/percentages': 'percentage_calculation',
+    '/api/hotspots': 'device_hotspots',
+    '/api/distinct-devices': 'distinct_devices'
+}
+PAGE = """<!DOCTYPE html>
+<meta charset='utf-8'>
+<title>Tablero de Control</title>
+<div id='dashboard'>{body}</div>
+<script>
+new EventSource('/api/stream').addEventListener('cycle', function () {{
+    fetch('/fragment').then(function (response) {{ return response.text(); }}).then(function (html) {{
+        document.getElementById('dashboard').innerHTML = html;
+    }});
+}});
+</script>
+"""
+
+
+class DashboardRequestHandler(BaseHTTPRequestHandler):
+    """
+    Atiende las peticiones al tablero en vivo con las respuestas ya serializadas por DashboardServer.
+    """
+
+    def do_GET(self):
+        """
+        Devuelve la vista solicitada o abre el flujo de eventos del servidor.
+        """
+        dashboard_server = self.server.dashboard_server
+        path = self.path.split('?', 1)[0]
+        if path == '/api/stream':
+            dashboard_server.stream(self)
+            return
+
+        response = dashboard_server.response(path)
+        if response is None:
+            self.send_error(404)
+            return
+
+        content_type, body = response
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Registra las peticiones en el nivel de depuración en lugar de escribirlas en la salida de errores.
+        """
+        logging.debug(f"{self.address_string()} {format % args}")
+
+
+class DashboardServer:
+    """
+    Esta clase representa el tablero de control en vivo de la simulación de Apollo 11.
+    Sirve por HTTP local las vistas de eventos, desconexiones, consolidación y porcentajes a partir del último
+    análisis en memoria, que recibe como oyente de ReportGenerator, y avisa a los navegadores conectados con
+    eventos del servidor (SSE) cada vez que termina un ciclo. Cada ciclo se serializa una sola vez al publicarse,
+    así que los visitantes no leen archivos ni vuelven a serializar nada.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8011, keepalive=15):
+        """
+        Inicializa el servidor con la dirección y el puerto de escucha (0 elige un puerto libre) y el intervalo en
+        segundos de los comentarios que mantienen abiertos los flujos de eventos.
+        """
+        self.keepalive = keepalive
+        self.condition = threading.Condition()
+        self.sequence = 0
+        self.responses = {}
+        # Últimos eventos publicados como (secuencia, evento), para los flujos que se retrasan
+        self.events = collections.deque(maxlen=64)
+        self.alerts = []
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.publish_empty()
+
+        self.server = ThreadingHTTPServer((host, port), DashboardRequestHandler)
+        self.server.daemon_threads = True
+        self.server.dashboard_server = self
+
+    @property
+    def address(self):
+        """
+        Devuelve la dirección (host, puerto) en la que escucha el servidor.
+        """
+        return self.server.server_address[:2]
+
+    def publish_empty(self):
+        """
+        Prepara las respuestas antes del primer ciclo.
+        """
+        empty = json.dumps({'cycle_id': None, 'time': None, 'analysis': {}}).encode()
+        self.responses = {path: ('application/json', b'{}') for path in VIEWS}
+        self.responses.update({
+            '/': ('text/html; charset=utf-8', PAGE.format(body="<p>Esperando el primer ciclo...</p>").encode()),
+            '/fragment': ('text/html; charset=utf-8', b''),
+            '/api/latest': ('application/json', empty),
+            '/api/alerts': ('application/json', b'[]')
+        })
+
+    def publish(self, cycle_id, analysis_data):
+        """
+        Publica el análisis de un ciclo: serializa sus vistas una vez y avisa a los flujos abiertos.
+        Tiene la firma de los oyentes de ReportGenerator.
+        """
+        moment = time.time()
+        fragment = render_html(analysis_data, cycle_id).encode()
+        responses = {path: ('application/json', json.dumps(analysis_data.get(section, {})).encode())
+                     for path, section in VIEWS.items()}
+        responses.update({
+            '/': ('text/html; charset=utf-8', PAGE.format(body=fragment.decode()).encode()),
+            '/fragment': ('text/html; charset=utf-8', fragment),
+            '/api/latest': ('application/json', json.dumps({'cycle_id': cycle_id, 'time': moment,
+                                                            'analysis': analysis_data}).encode())
+        })
+        event = f"event: cycle\ndata: {json.dumps({'cycle_id': cycle_id, 'time': moment})}\n\n".encode()
+
+        with self.condition:
+            responses['/api/alerts'] = self.responses['/api/alerts']
+            self.responses = responses
+            self.sequence += 1
+            self.events.append((self.sequence, event))
+            self.condition.notify_all()
+
+    def publish_alert(self, transition, max_alerts=100):
+        """
+        Publica una transición de desconexión o reconexión y la envía a los flujos abiertos.
+        Tiene la firma de los oyentes de DisconnectionDetector.
+        """
+        with self.condition:
+            self.alerts = (self.alerts + [transition])[-max_alerts:]
+            self.responses = dict(self.responses)
+            self.responses['/api/alerts'] = ('application/json', json.dumps(self.alerts).encode())
+            self.sequence += 1
+            self.events.append((self.sequence, f"event: alert\ndata: {json.dumps(transition)}\n\n".encode()))
+            self.condition.notify_all()
+
+    def response(self, path):
+        """
+        Devuelve el tipo de contenido y el cuerpo ya serializado de una ruta, o None si no existe.
+        """
+        with self.condition:
+            return self.responses.get(path)
+
+    def stream(self, handler):
+        """
+        Mantiene abierto un flujo de eventos del servidor y envía un evento por cada publicación.
+        Si un cliente se retrasa más que los eventos guardados, recibe solo los más recientes.
+        """
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+
+        with self.condition:
+            seen = self.sequence
+        try:
+            handler.wfile.write(b": conectado\n\n")
+            handler.wfile.flush()
+            while not self.stop_event.is_set():
+                with self.condition:
+                    self.condition.wait_for(lambda: self.sequence != seen or self.stop_event.is_set(),
+                                            self.keepalive)
+                    pending = b"".join(event for sequence, event in self.events if sequence > seen)
+                    seen = self.sequence
+                if not self.stop_event.is_set():
+                    handler.wfile.write(pending or b": keepalive\n\n")
+                    handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def start(self):
+        """
+        Empieza a atender peticiones en un hilo en segundo plano.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, name='apolo11-dashboard', daemon=True)
+        self.thread.start()
+        logging.info(f"Tablero de control en vivo en http://{self.address[0]}:{self.address[1]}/")
+
+    def stop(self):
+        """
+        Cierra los flujos abiertos y detiene el servidor.
+        """
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
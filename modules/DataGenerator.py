@@ -6,6 +6,10 @@ import datetime
 import json
 import os
 
+from modules.BinaryLog import BinaryLogWriter
+from modules.DurableWriter import DurableWriter
+from modules.SegmentLog import SegmentWriter
+
 
 def generate_hash(*args):
     """
@@ -21,45 +25,124 @@ class DataGenerator:
     Se encarga de generar datos de log para la simulación.
     """
 
-    def __init__(self, storage_path):
+    def __init__(self, storage_path, segment_mode=False, segment_max_bytes=4 * 1024 * 1024, events_per_cycle=None,
+                 batch_size=10000, rng=None, binary_mode=False, writer=None,
+                 fleet_size=None, fleet_skew=3.0):
         """
         Inicializa el generador de datos con la ruta al directorio de almacenamiento.
         Si el directorio de almacenamiento no existe, lo crea.
+        Con segment_mode, los eventos de cada ciclo se escriben en segmentos de solo anexado (una línea JSON por
+        evento) que se rotan al superar segment_max_bytes, en lugar de un archivo por evento.
+        Con events_per_cycle se fija la cantidad de eventos de cada ciclo (por defecto, aleatoria entre 1 y 100);
+        los eventos se generan en lotes de batch_size. rng permite usar un generador aleatorio propio.
+        Con binary_mode, los eventos se escriben como registros binarios fijos de 40 bytes (ver modules/BinaryLog.py),
+        también rotados al superar segment_max_bytes.
+        writer es la capa de escritura de los archivos por evento (DurableWriter); por defecto, escritura atómica
+        sin sincronizar. Con durabilidad 'group', los archivos de cada llamada se publican juntos al terminar.
+        Con fleet_size, cada evento lleva un identificador de dispositivo estable (device_id) de una flota de
+        fleet_size unidades por misión y tipo de dispositivo; con fleet_skew > 1 unas pocas unidades concentran
+        la mayoría de los eventos. Los logs binarios no guardan el identificador.
         """
         self.storage_path = storage_path
+        self.segment_mode = segment_mode
+        self.binary_mode = binary_mode
+        self.segment_max_bytes = segment_max_bytes
+        self.events_per_cycle = events_per_cycle
+        self.batch_size = batch_size
+        self.rng = rng if rng is not None else random
+        self.fleet_size = fleet_size
+        self.fleet_skew = fleet_skew
+        self.writer = writer if writer is not None else DurableWriter()
         if not os.path.exists(self.storage_path):
             os.makedirs(self.storage_path)
+        self.writer.clean(self.storage_path)
 
         self.device_types = ["Satélite", "Nave Espacial", "Traje Espacial", "Vehículo espacial"]
         self.mission_codes = ["ORBONE", "CLNM", "TMRS", "GALXONE", "UNKN"]  # test
+        self.status_choices = ['excellent', 'good', 'warning', 'faulty', 'killed', 'unknown']
+        self.device_type_codes = {device_type: code for code, device_type in enumerate(self.device_types)}
 
-    def generate_data_log(self, mission_code, cycle_id):
+    def generate_events(self, count, timestamp=None, hash_cache=None):
         """
-        Genera los datos de log para una misión y un ciclo de simulación.
+        Genera un lote de count eventos en una sola llamada.
+        Todas las columnas se sortean de una vez y el hash se memoriza por (fecha, misión, dispositivo, estado),
+        ya que en un ciclo hay como mucho 5 × 4 × 6 combinaciones distintas.
         """
-        timestamp = datetime.datetime.now().strftime("%d%m%y%H%M%S")
-        status_choices = ['excellent', 'good', 'warning', 'faulty', 'killed', 'unknown']
+        if timestamp is None:
+            timestamp = datetime.datetime.now().strftime("%d%m%y%H%M%S")
+        if hash_cache is None:
+            hash_cache = {}
+
+        missions = self.rng.choices(self.mission_codes, k=count)
+        device_types = self.rng.choices(self.device_types, k=count)
+        statuses = self.rng.choices(self.status_choices, k=count)
+        units = None
+        if self.fleet_size:
+            random_value = self.rng.random
+            units = [int(self.fleet_size * random_value() ** self.fleet_skew) for _ in range(count)]
 
-        num_files = random.randint(1, 100)
+        events = []
+        for i, (mission_code, device_type, device_status) in enumerate(zip(missions, device_types, statuses)):
+            key = (timestamp, mission_code, device_type, device_status)
+            event_hash = hash_cache.get(key)
+            if event_hash is None:
+                event_hash = hash_cache[key] = generate_hash(*key)
 
-        for i in range(num_files):
-            mission_code = random.choice(self.mission_codes)  # Test
-            device_type = random.choice(self.device_types)  # Selecciona aleatoriamente un tipo de dispositivo
-            device_status = random.choice(status_choices)
-            data = {
+            events.append({
                 'date': timestamp,
                 'mission': mission_code,
-                'device_type': device_type,  # Asigna el tipo de dispositivo aleatorio
+                'device_type': device_type,
                 'device_status': device_status,
-                'hash': generate_hash(timestamp, mission_code, device_type, device_status)
-            }
-            filename = f'APL{mission_code}-{cycle_id:04d}{i:03d}.log'
-            self.save_data(filename, data)
+                'hash': event_hash
+            })
+            if units is not None:
+                events[-1]['device_id'] = f'{mission_code}-{self.device_type_codes[device_type]}{units[i]:07d}'
+
+        return events
+
+    def generate_data_log(self, mission_code, cycle_id, num_events=None):
+        """
+        Genera los datos de log para una misión y un ciclo de simulación.
+        La cantidad de eventos es num_events si se indica; si no, events_per_cycle o un valor aleatorio entre 1 y 100.
+        Devuelve los nombres de los archivos escritos.
+        """
+        timestamp = datetime.datetime.now().strftime("%d%m%y%H%M%S")
+
+        if num_events is None:
+            num_events = self.events_per_cycle
+        if num_events is None:
+            num_events = self.rng.randint(1, 100)
+
+        segment_writer = None
+        if self.binary_mode:
+            segment_writer = BinaryLogWriter(self.storage_path, cycle_id, self.mission_codes, self.device_types,
+                                             self.status_choices, self.segment_max_bytes)
+        elif self.segment_mode:
+            segment_writer = SegmentWriter(self.storage_path, cycle_id, self.segment_max_bytes)
+
+        filenames = []
+        hash_cache = {}
+        for start in range(0, num_events, self.batch_size):
+            events = self.generate_events(min(self.batch_size, num_events - start), timestamp, hash_cache)
+            for i, data in enumerate(events, start):
+                if segment_writer is not None:
+                    segment_writer.append(data)
+                    continue
+
+                # El separador evita que ciclo e índice se confundan cuando un ciclo tiene 1000 eventos o más
+                filename = f'APL{data["mission"]}-{cycle_id:04d}-{i:05d}.log'
+                self.save_data(filename, data)
+                filenames.append(filename)
+
+        if segment_writer is not None:
+            filenames.extend(segment_writer.close())
+        self.writer.commit()
+
+        return filenames
 
     def save_data(self, filename, data):
         """
         Guarda los datos generados en un archivo JSON.
         """
         filepath = os.path.join(self.storage_path, filename)
-        with open(filepath, 'w') as file:
-            json.dump(data, file)
+        self.writer.write(filepath, json.dumps(data))
@@ -0,0 +1,196 @@
+# modules/DeltaReports.py
+import datetime
+import json
+import os
+import re
+
+from modules.AnalysisEngine import AnalysisEngine
+from modules.DurableWriter import DurableWriter
+from modules.EventCounts import new_state_counts
+
+KEYFRAME_PREFIX = 'APLSTATS-REPORTE-'
+DELTA_PREFIX = 'APLSTATS-DELTA-'
+REPORT_PATTERN = re.compile(r'^APLSTATS-(REPORTE|DELTA)-(\d{12})-(\d+)\.log$')
+
+
+def is_delta(filename):
+    """
+    Indica si un archivo de reporte es un delta.
+    """
+    return os.path.basename(filename).startswith(DELTA_PREFIX)
+
+
+def diff_counts(previous, current):
+    """
+    Devuelve los cambios de un recuento misión × tipo de dispositivo × estado respecto al anterior: las celdas
+    que cambian (con la misma forma anidada que el recuento), los pares (misión, tipo de dispositivo) que
+    desaparecen y, solo si difiere del que se obtiene al aplicar los cambios, el orden de los pares.
+    """
+    changes = {}
+    removed = []
+    for mission, devices in current.items():
+        previous_devices = previous.get(mission, {})
+        for device_type, state_counts in devices.items():
+            previous_counts = previous_devices.get(device_type)
+            changed = {state: count for state, count in state_counts.items()
+                       if previous_counts is None or previous_counts.get(state, 0) != count}
+            if changed or previous_counts is None:
+                changes.setdefault(mission, {})[device_type] = changed
+    for mission, devices in previous.items():
+        removed.extend([mission, device_type] for device_type in devices
+                       if device_type not in current.get(mission, {}))
+
+    delta = {'changes': changes, 'removed': removed}
+    order = [[mission, device_type] for mission, devices in current.items() for device_type in devices]
+    if order != [[mission, device_type] for mission, devices in apply_delta(previous, delta).items()
+                 for device_type in devices]:
+        delta['order'] = order
+    return delta
+
+
+def apply_delta(previous, delta):
+    """
+    Aplica un delta de diff_counts a un recuento y devuelve el recuento resultante (sin modificar el anterior).
+    """
+    removed = {tuple(pair) for pair in delta['removed']}
+    current = {}
+    for mission, devices in previous.items():
+        for device_type, state_counts in devices.items():
+            if (mission, device_type) not in removed:
+                current.setdefault(mission, {})[device_type] = dict(state_counts)
+
+    for mission, changed_devices in delta['changes'].items():
+        devices = current.setdefault(mission, {})
+        for device_type, changed in changed_devices.items():
+            if device_type not in devices:
+                devices[device_type] = new_state_counts()
+            devices[device_type].update(changed)
+
+    if 'order' in delta:
+        ordered = {}
+        for mission, device_type in delta['order']:
+            ordered.setdefault(mission, {})[device_type] = current[mission][device_type]
+        current = ordered
+    return current
+
+
+class DeltaReportWriter:
+    """
+    Esta clase representa el escritor de informes por deltas de la simulación de Apollo 11.
+    Cada keyframe_interval ciclos guarda un informe completo (keyframe) con el formato de siempre; los ciclos
+    intermedios guardan solo las celdas del recuento que cambian respecto al informe anterior y las secciones no
+    derivables que cambian. Las secciones que se derivan del recuento no se guardan en los deltas.
+    """
+
+    def __init__(self, reports_path, derived_sections, keyframe_interval=10, writer=None):
+        """
+        Inicializa el escritor con el directorio de reportes, los nombres de las secciones derivables del recuento
+        y la cantidad de ciclos entre keyframes.
+        """
+        self.reports_path = reports_path
+        self.derived_sections = list(derived_sections)
+        self.keyframe_interval = keyframe_interval
+        self.writer = writer if writer is not None else DurableWriter()
+        self.previous = None
+        self.previous_filename = None
+        self.since_keyframe = 0
+
+    def save(self, cycle_id, analysis_data, moment=None):
+        """
+        Guarda el informe de un ciclo como keyframe o como delta y devuelve el nombre del archivo.
+        """
+        date = (moment or datetime.datetime.now()).strftime("%d%m%y%H%M%S")
+        cycle_label = f'{cycle_id:04d}' if cycle_id is not None else '0000'
+
+        if self.previous is None or self.since_keyframe + 1 >= self.keyframe_interval:
+            filename = f'{KEYFRAME_PREFIX}{date}-{cycle_label}.log'
+            content = json.dumps(analysis_data)
+            self.since_keyframe = 0
+        else:
+            filename = f'{DELTA_PREFIX}{date}-{cycle_label}.log'
+            delta = diff_counts(self.previous['events_analysis'], analysis_data['events_analysis'])
+            delta.update({
+                'base': self.previous_filename,
+                'cycle_id': cycle_id,
+                'derived': [name for name in self.derived_sections if name in analysis_data],
+                'sections': {name: data for name, data in analysis_data.items()
+                             if name != 'events_analysis' and name not in self.derived_sections
+                             and self.previous.get(name) != data},
+                'keys': list(analysis_data)
+            })
+            content = json.dumps(delta, separators=(',', ':'))
+            self.since_keyframe += 1
+
+        self.writer.write(os.path.join(self.reports_path, filename), content)
+        self.previous = analysis_data
+        self.previous_filename = filename
+        return filename
+
+
+class DeltaReportReader:
+    """
+    Esta clase representa el lector de informes por deltas de la simulación de Apollo 11.
+    Reconstruye el informe completo de cualquier ciclo partiendo de su keyframe y aplicando los deltas siguientes
+    (como mucho keyframe_interval - 1 archivos pequeños). Las secciones derivables se recalculan con el motor de
+    análisis indicado, que debe tener registradas las mismas secciones que el del generador de informes.
+    """
+
+    def __init__(self, reports_path, analysis_engine=None):
+        """
+        Inicializa el lector con el directorio de reportes y el motor de análisis que deriva las secciones.
+        """
+        self.reports_path = reports_path
+        self.analysis_engine = analysis_engine if analysis_engine is not None else AnalysisEngine(reports_path)
+
+    def list_reports(self):
+        """
+        Devuelve los informes por ciclo (keyframes y deltas) como (fecha, ciclo, nombre), en orden cronológico.
+        """
+        reports = []
+        for filename in os.listdir(self.reports_path):
+            match = REPORT_PATTERN.match(filename)
+            if match:
+                moment = datetime.datetime.strptime(match.group(2), "%d%m%y%H%M%S")
+                reports.append((moment, int(match.group(3)), filename))
+        return sorted(reports)
+
+    def find(self, cycle_id):
+        """
+        Devuelve el nombre del informe más reciente de un ciclo, o None si no existe.
+        """
+        matches = [filename for _, report_cycle, filename in self.list_reports() if report_cycle == cycle_id]
+        return matches[-1] if matches else None
+
+    def load(self, filename):
+        """
+        Lee un archivo de informe (keyframe o delta) tal como está guardado.
+        """
+        with open(os.path.join(self.reports_path, filename), 'r') as file:
+            return json.load(file)
+
+    def read(self, filename):
+        """
+        Reconstruye el informe completo guardado en un archivo, sea keyframe o delta.
+        """
+        chain = []
+        while is_delta(filename):
+            delta = self.load(filename)
+            chain.append(delta)
+            filename = delta['base']
+        analysis_data = self.load(filename)
+
+        for delta in reversed(chain):
+            values = dict(analysis_data)
+            values.update(delta['sections'])
+            values['events_analysis'] = apply_delta(analysis_data['events_analysis'], delta)
+            derived = self.analysis_engine.derive(values['events_analysis'])
+            values.update({name: data for name, data in derived.items() if name in delta['derived']})
+            analysis_data = {name: values[name] for name in delta['keys']}
+        return analysis_data
+
+    def read_cycle(self, cycle_id):
+        """
+        Reconstruye el informe completo más reciente de un ciclo. Devuelve None si no existe.
+        """
+        filename = self.find(cycle_id)
+        return self.read(filename) if filename is not None else None
@@ -0,0 +1,237 @@
+# modules/DisconnectionDetector.py
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+
+class SlidingWindow:
+    """
+    Ventana deslizante de eventos y estados "unknown" dividida en periodos de bucket_seconds segundos.
+    Mantiene los totales de la ventana en curso, por lo que cada actualización cuesta O(1) amortizado.
+    """
+
+    def __init__(self, window_seconds, bucket_seconds):
+        """
+        Inicializa la ventana vacía con su duración y la duración de cada periodo.
+        """
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = max(1, int(round(window_seconds / bucket_seconds)))
+        self.buckets = collections.deque()
+        self.total = 0
+        self.unknown = 0
+
+    def advance(self, moment):
+        """
+        Descarta los periodos que quedaron fuera de la ventana en el instante indicado.
+        """
+        oldest = int(moment // self.bucket_seconds) - self.bucket_count
+        while self.buckets and self.buckets[0][0] <= oldest:
+            _, total, unknown = self.buckets.popleft()
+            self.total -= total
+            self.unknown -= unknown
+
+    def add(self, moment, total, unknown):
+        """
+        Suma eventos a la ventana en el instante indicado.
+        """
+        self.advance(moment)
+        index = int(moment // self.bucket_seconds)
+        if self.buckets and self.buckets[-1][0] == index:
+            self.buckets[-1][1] += total
+            self.buckets[-1][2] += unknown
+        else:
+            self.buckets.append([index, total, unknown])
+        self.total += total
+        self.unknown += unknown
+
+
+class DisconnectionRule:
+    """
+    Regla de desconexión sobre una ventana deslizante: un dispositivo se considera desconectado si en los últimos
+    window segundos acumuló más de min_unknown estados "unknown", o si su proporción de "unknown" supera
+    min_ratio (con al menos min_events eventos para que la proporción sea significativa).
+    """
+
+    def __init__(self, name, window, min_unknown=None, min_ratio=None, min_events=1):
+        """
+        Inicializa la regla con su nombre, la duración de la ventana en segundos y sus umbrales.
+        """
+        self.name = name
+        self.window = window
+        self.min_unknown = min_unknown
+        self.min_ratio = min_ratio
+        self.min_events = min_events
+
+    def matches(self, window):
+        """
+        Indica si la ventana cumple la condición de desconexión.
+        """
+        if self.min_unknown is not None and window.unknown > self.min_unknown:
+            return True
+        if self.min_ratio is not None and window.total >= self.min_events:
+            return window.unknown / window.total > self.min_ratio
+        return False
+
+
+# Equivale al criterio del informe (más de un "unknown"), pero sobre los últimos 60 segundos
+DEFAULT_RULES = (DisconnectionRule('unknown_count', 60, min_unknown=1),)
+
+
+class DisconnectionDetector:
+    """
+    Esta clase representa el detector de desconexiones en flujo de la simulación de Apollo 11.
+    Recibe los eventos a medida que se ingieren y mantiene, por misión y tipo de dispositivo, ventanas deslizantes
+    con las que evalúa las reglas de desconexión. Cada vez que un dispositivo entra o sale de una regla emite una
+    transición de desconexión o reconexión, sin esperar al siguiente informe.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES, bucket_seconds=1, alerts_path=None, clock=time.time):
+        """
+        Inicializa el detector con sus reglas y la resolución de las ventanas en segundos.
+        Si se indica alerts_path, cada transición se añade a ese archivo como una línea JSON.
+        """
+        self.rules = rules
+        self.bucket_seconds = bucket_seconds
+        self.alerts_path = alerts_path
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.listeners = []
+        # (misión, tipo de dispositivo) -> {duración de ventana: SlidingWindow}
+        self.windows = {}
+        # (misión, tipo de dispositivo, regla) de los dispositivos desconectados
+        self.disconnected = set()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        alerts_dir = os.path.dirname(self.alerts_path) if self.alerts_path else None
+        if alerts_dir and not os.path.exists(alerts_dir):
+            os.makedirs(alerts_dir)
+
+    def add_listener(self, callback):
+        """
+        Registra una función que se llama con cada transición (un diccionario).
+        """
+        self.listeners.append(callback)
+
+    def observe(self, event, moment=None):
+        """
+        Procesa un único evento de log.
+        """
+        unknown = 1 if event.get('device_status') == 'unknown' else 0
+        self.update(event.get('mission'), event.get('device_type'), 1, unknown, moment)
+
+    def observe_counts(self, source, events_analysis_data, moment=None):
+        """
+        Procesa el recuento de un archivo ingerido. Tiene la firma de los oyentes de IngestionWatcher.
+        """
+        for mission, devices in events_analysis_data.items():
+            for device_type, state_counts in devices.items():
+                self.update(mission, device_type, sum(state_counts.values()), state_counts.get('unknown', 0),
+                            moment)
+
+    def update(self, mission, device_type, total, unknown, moment=None):
+        """
+        Suma eventos a las ventanas de un dispositivo y evalúa sus reglas.
+        """
+        moment = self.clock() if moment is None else moment
+        key = (mission, device_type)
+        transitions = []
+        with self.lock:
+            windows = self.windows.get(key)
+            if windows is None:
+                windows = self.windows[key] = {rule.window: SlidingWindow(rule.window, self.bucket_seconds)
+                                               for rule in self.rules}
+            for window in windows.values():
+                window.add(moment, total, unknown)
+            self.evaluate(key, windows, moment, transitions)
+
+        self.emit(transitions)
+
+    def tick(self, moment=None):
+        """
+        Desliza todas las ventanas hasta el instante indicado, de modo que un dispositivo que deja de enviar
+        "unknown" se reconecta aunque no lleguen eventos nuevos.
+        """
+        moment = self.clock() if moment is None else moment
+        transitions = []
+        with self.lock:
+            for key, windows in self.windows.items():
+                for window in windows.values():
+                    window.advance(moment)
+                self.evaluate(key, windows, moment, transitions)
+
+        self.emit(transitions)
+
+    def evaluate(self, key, windows, moment, transitions):
+        """
+        Evalúa las reglas de un dispositivo y anota las transiciones. Se llama con el bloqueo tomado.
+        """
+        for rule in self.rules:
+            window = windows[rule.window]
+            state = key + (rule.name,)
+            matched = rule.matches(window)
+            if matched == (state in self.disconnected):
+                continue
+
+            if matched:
+                self.disconnected.add(state)
+            else:
+                self.disconnected.discard(state)
+            transitions.append({
+                'type': 'disconnect' if matched else 'reconnect',
+                'mission': key[0],
+                'device_type': key[1],
+                'rule': rule.name,
+                'unknown': window.unknown,
+                'total': window.total,
+                'time': moment
+            })
+
+    def emit(self, transitions):
+        """
+        Registra las transiciones y las entrega a los oyentes.
+        """
+        for transition in transitions:
+            logging.warning(f"{'Desconexión' if transition['type'] == 'disconnect' else 'Reconexión'} de "
+                            f"{transition['device_type']} en {transition['mission']} (regla {transition['rule']}: "
+                            f"{transition['unknown']} unknown de {transition['total']} eventos)")
+            if self.alerts_path:
+                try:
+                    with open(self.alerts_path, 'a') as file:
+                        file.write(json.dumps(transition) + "\n")
+                except OSError as e:
+                    logging.error(f"No se pudo registrar la alerta en {self.alerts_path}: {e}")
+            for callback in self.listeners:
+                callback(transition)
+
+    def active(self):
+        """
+        Devuelve los dispositivos desconectados como tuplas (misión, tipo de dispositivo, regla).
+        """
+        with self.lock:
+            return sorted(self.disconnected)
+
+    def start(self, interval=1.0):
+        """
+        Desliza las ventanas cada interval segundos en un hilo en segundo plano.
+        """
+        self.thread = threading.Thread(target=self.run, args=(interval,), name='apolo11-disconnections', daemon=True)
+        self.thread.start()
+
+    def run(self, interval):
+        """
+        Desliza las ventanas periódicamente hasta que se detiene el detector.
+        """
+        while not self.stop_event.wait(interval):
+            self.tick()
+
+    def stop(self):
+        """
+        Detiene el deslizamiento periódico de las ventanas.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
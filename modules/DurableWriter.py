@@ -0,0 +1,198 @@
+# modules/DurableWriter.py
+import ctypes
+import ctypes.util
+import logging
+import os
+import shutil
+import threading
+
+TEMP_SUFFIX = '.tmp'
+DURABILITY_LEVELS = ('none', 'atomic', 'group', 'strict')
+
+
+def fsync_directory(path):
+    """
+    Sincroniza con el disco un directorio, para que los renombrados hechos en él sobrevivan a una caída.
+    En los sistemas que no permiten abrir directorios no hace nada.
+    """
+    try:
+        descriptor = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def load_syncfs():
+    """
+    Carga la función syncfs de la biblioteca C, que sincroniza de una vez todo un sistema de archivos.
+    Devuelve None si el sistema no la ofrece.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.syncfs.argtypes = [ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def sync_filesystem(libc, path):
+    """
+    Sincroniza con syncfs el sistema de archivos que contiene un directorio. Devuelve False si no fue posible.
+    """
+    if libc is None:
+        return False
+    try:
+        descriptor = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        return libc.syncfs(descriptor) == 0
+    finally:
+        os.close(descriptor)
+
+
+class DurableWriter:
+    """
+    Esta clase representa la capa de escritura a prueba de caídas de la simulación de Apollo 11.
+    Según el nivel de durabilidad, cada archivo se escribe:
+    - 'none': en su sitio, como hasta ahora.
+    - 'atomic': en un archivo temporal que se renombra sobre el definitivo, de modo que nunca se lee un archivo a
+      medio escribir, aunque tras una caída del sistema puede perderse lo escrito recientemente.
+    - 'group': como 'atomic', pero los archivos quedan preparados hasta commit(), que los sincroniza con el disco
+      con una sola llamada syncfs por sistema de archivos, los publica y sincroniza sus directorios una vez cada
+      uno (confirmación en grupo: el coste de sincronizar un ciclo no crece con la cantidad de archivos). Donde no
+      hay syncfs, se sincroniza cada archivo por separado.
+    - 'strict': como 'atomic', sincronizando cada archivo y su directorio antes de volver.
+    """
+
+    def __init__(self, durability='atomic'):
+        """
+        Inicializa la capa de escritura con su nivel de durabilidad.
+        """
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Nivel de durabilidad desconocido: {durability}")
+        self.durability = durability
+        self.lock = threading.Lock()
+        self.libc = load_syncfs() if durability == 'group' else None
+        # Ruta definitiva -> ruta temporal de los archivos preparados en modo 'group'
+        self.staged = {}
+
+    def write(self, path, content):
+        """
+        Escribe el contenido (texto o bytes) de un archivo completo.
+        """
+        mode = 'wb' if isinstance(content, bytes) else 'w'
+        if self.durability == 'none':
+            with open(path, mode) as file:
+                file.write(content)
+            return
+
+        tmp_path = path + TEMP_SUFFIX
+        with open(tmp_path, mode) as file:
+            file.write(content)
+            if self.durability == 'strict':
+                file.flush()
+                os.fsync(file.fileno())
+        self.publish(path, tmp_path)
+
+    def append(self, path, content):
+        """
+        Añade texto al final de un archivo. Fuera del modo 'none', el archivo se copia a uno temporal, se le añade
+        el texto y se publica como en write, de modo que una caída no deja un bloque a medias. Está pensado para
+        archivos de tamaño acotado, como el tablero de control rotativo.
+        """
+        if self.durability == 'none':
+            with open(path, 'a') as file:
+                file.write(content)
+            return
+
+        tmp_path = path + TEMP_SUFFIX
+        with self.lock:
+            already_staged = path in self.staged
+        if not already_staged:
+            if os.path.exists(path):
+                shutil.copyfile(path, tmp_path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with open(tmp_path, 'a') as file:
+            file.write(content)
+            if self.durability == 'strict':
+                file.flush()
+                os.fsync(file.fileno())
+        self.publish(path, tmp_path)
+
+    def publish(self, path, tmp_path):
+        """
+        Publica un archivo temporal con su nombre definitivo, o lo deja preparado hasta commit() en modo 'group'.
+        """
+        if self.durability == 'group':
+            with self.lock:
+                self.staged[path] = tmp_path
+            return
+
+        os.replace(tmp_path, path)
+        if self.durability == 'strict':
+            fsync_directory(os.path.dirname(path))
+
+    def read(self, path):
+        """
+        Devuelve el texto de un archivo tal como quedará publicado: si está preparado, el de su archivo temporal.
+        """
+        with self.lock:
+            tmp_path = self.staged.get(path)
+        with open(tmp_path or path, 'r') as file:
+            return file.read()
+
+    def pending(self, path):
+        """
+        Indica si un archivo está preparado y aún no se ha publicado.
+        """
+        with self.lock:
+            return path in self.staged
+
+    def commit(self):
+        """
+        Confirma en grupo los archivos preparados: sincroniza con el disco los sistemas de archivos que los
+        contienen (una llamada syncfs por cada uno, o un fsync por archivo si no está disponible), los publica y
+        sincroniza sus directorios una vez por directorio. Devuelve la cantidad de archivos publicados.
+        """
+        with self.lock:
+            staged, self.staged = self.staged, {}
+        if not staged:
+            return 0
+
+        # Dispositivo -> archivos temporales que contiene
+        filesystems = {}
+        for tmp_path in staged.values():
+            filesystems.setdefault(os.stat(tmp_path).st_dev, []).append(tmp_path)
+        for tmp_paths in filesystems.values():
+            if sync_filesystem(self.libc, os.path.dirname(tmp_paths[0])):
+                continue
+            for tmp_path in tmp_paths:
+                with open(tmp_path, 'rb+') as file:
+                    os.fsync(file.fileno())
+
+        for path, tmp_path in staged.items():
+            os.replace(tmp_path, path)
+        for directory in {os.path.dirname(path) for path in staged}:
+            fsync_directory(directory)
+        return len(staged)
+
+    def clean(self, directory):
+        """
+        Elimina los archivos temporales que una caída dejó a medio escribir en un directorio.
+        """
+        if not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            if name.endswith(TEMP_SUFFIX):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError as e:
+                    logging.error(f"No se pudo eliminar el archivo temporal {name}: {e}")
@@ -0,0 +1,213 @@
+# modules/EventBatch.py
+import json
+from array import array
+from collections import Counter
+
+from modules.BinaryLog import count_binary, is_binary
+from modules.EventCounts import STATUS_CHOICES, new_state_counts
+from modules.SegmentLog import count_segment, is_segment, iter_segment_events
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def count_log_files_columnar(sources, observe=None):
+    """
+    Construye el recuento de eventos de una lista de archivos de log usando un lote columnar.
+    Es una función de módulo para que los procesos de trabajo puedan ejecutarla.
+    """
+    return EventBatch().load_sources(sources, observe).to_events_analysis()
+
+
+class EventBatch:
+    """
+    Esta clase representa un lote columnar de eventos de la simulación de Apollo 11.
+    Misiones, tipos de dispositivo y estados son vocabularios pequeños, así que cada evento se guarda como tres
+    códigos de un byte en columnas compactas (array de NumPy si está disponible, módulo array si no).
+    Las columnas se vuelcan en un cubo de recuentos con operaciones tipo bincount cada vez que alcanzan su
+    capacidad, de modo que la memoria se mantiene acotada aunque se analicen millones de eventos.
+    """
+
+    def __init__(self, capacity=1000000):
+        """
+        Inicializa el lote vacío con la capacidad máxima de filas antes de volcarlas al cubo de recuentos.
+        """
+        self.capacity = capacity
+        self.missions = []
+        self.device_types = []
+        self.statuses = list(STATUS_CHOICES)
+        self.mission_index = {}
+        self.device_type_index = {}
+        self.status_index = {status: code for code, status in enumerate(self.statuses)}
+        self.mission_column = array('B')
+        self.device_type_column = array('B')
+        self.status_column = array('B')
+        self.cells = {}
+
+    @classmethod
+    def from_events_analysis(cls, events_analysis_data):
+        """
+        Crea un lote a partir de un recuento misión × tipo de dispositivo × estado ya construido.
+        """
+        return cls().add_counts(events_analysis_data)
+
+    def encode(self, vocabulary, index, value):
+        """
+        Devuelve el código de una categoría, asignando uno nuevo en orden de aparición si no existe.
+        """
+        code = index.get(value)
+        if code is None:
+            code = len(vocabulary)
+            if code > 255:
+                raise ValueError(f"Demasiadas categorías distintas para codificar en un byte: {value}")
+            vocabulary.append(value)
+            index[value] = code
+        return code
+
+    def append(self, mission, device_type, status):
+        """
+        Añade un evento al lote.
+        """
+        self.mission_column.append(self.encode(self.missions, self.mission_index, mission))
+        self.device_type_column.append(self.encode(self.device_types, self.device_type_index, device_type))
+        self.status_column.append(self.encode(self.statuses, self.status_index, status))
+
+        if len(self.mission_column) >= self.capacity:
+            self.flush()
+
+    def extend(self, events):
+        """
+        Añade al lote una secuencia de eventos con el formato de los archivos de log.
+        """
+        for data in events:
+            self.append(data['mission'], data['device_type'], data['device_status'])
+        return self
+
+    def add_counts(self, events_analysis_data):
+        """
+        Suma al cubo un recuento ya agregado (por ejemplo, el índice del pie de un segmento).
+        """
+        for mission, devices in events_analysis_data.items():
+            mission_code = self.encode(self.missions, self.mission_index, mission)
+            for device_type, state_counts in devices.items():
+                device_type_code = self.encode(self.device_types, self.device_type_index, device_type)
+                for status, count in state_counts.items():
+                    key = (mission_code, device_type_code, self.encode(self.statuses, self.status_index, status))
+                    self.cells[key] = self.cells.get(key, 0) + count
+        return self
+
+    def load_sources(self, sources, observe=None):
+        """
+        Carga en el lote los eventos de una lista de archivos de log (por evento, segmentos o logs binarios).
+        Si se indica observe, se llama con cada evento leído, como en count_log_files.
+        """
+        for log_file in sources:
+            if is_segment(log_file) and observe is None:
+                self.add_counts(count_segment(log_file))
+                continue
+            if is_segment(log_file):
+                for data in iter_segment_events(log_file):
+                    self.append(data['mission'], data['device_type'], data['device_status'])
+                    observe(data)
+                continue
+            if is_binary(log_file):
+                self.add_counts(count_binary(log_file))
+                continue
+
+            with open(log_file, 'r') as file:
+                data = json.load(file)
+            self.append(data['mission'], data['device_type'], data['device_status'])
+            if observe is not None:
+                observe(data)
+        return self
+
+    def flush(self):
+        """
+        Vuelca las columnas pendientes en el cubo de recuentos y las vacía.
+        """
+        if not self.mission_column:
+            return
+
+        if numpy is not None:
+            device_type_size = len(self.device_types)
+            status_size = len(self.statuses)
+            keys = ((numpy.frombuffer(self.mission_column, dtype=numpy.uint8).astype(numpy.int64) * device_type_size
+                     + numpy.frombuffer(self.device_type_column, dtype=numpy.uint8)) * status_size
+                    + numpy.frombuffer(self.status_column, dtype=numpy.uint8))
+            counts = numpy.bincount(keys)
+            for flat in numpy.flatnonzero(counts):
+                mission_code, rest = divmod(int(flat), device_type_size * status_size)
+                key = (mission_code,) + divmod(rest, status_size)
+                self.cells[key] = self.cells.get(key, 0) + int(counts[flat])
+        else:
+            for key, count in Counter(zip(self.mission_column, self.device_type_column, self.status_column)).items():
+                self.cells[key] = self.cells.get(key, 0) + count
+
+        del self.mission_column[:]
+        del self.device_type_column[:]
+        del self.status_column[:]
+
+    def to_events_analysis(self):
+        """
+        Devuelve el recuento misión × tipo de dispositivo × estado con el formato de los informes.
+        """
+        self.flush()
+        events_analysis_data = {}
+        for mission_code, device_type_code, status_code in sorted(self.cells):
+            devices = events_analysis_data.setdefault(self.missions[mission_code], {})
+            state_counts = devices.get(self.device_types[device_type_code])
+            if state_counts is None:
+                state_counts = devices[self.device_types[device_type_code]] = new_state_counts()
+            state_counts[self.statuses[status_code]] = self.cells[(mission_code, device_type_code, status_code)]
+        return events_analysis_data
+
+    def cube(self):
+        """
+        Devuelve el cubo denso de recuentos (misión, tipo de dispositivo, estado) como array de NumPy.
+        """
+        self.flush()
+        cube = numpy.zeros((len(self.missions), len(self.device_types), len(self.statuses)), dtype=numpy.int64)
+        for key, count in self.cells.items():
+            cube[key] = count
+        return cube
+
+    def derive_sections(self, disconnection_threshold=1):
+        """
+        Calcula las cuatro secciones del informe con operaciones vectorizadas sobre el cubo de recuentos.
+        Devuelve None si NumPy no está disponible, en cuyo caso se derivan a partir del recuento anidado.
+        """
+        if numpy is None:
+            return None
+
+        cube = self.cube()
+        present = cube.sum(axis=2) > 0
+        unknown = cube[:, :, self.status_index['unknown']]
+        inoperable = (cube[:, :, self.status_index['killed']] + unknown).sum(axis=0)
+        mission_totals = cube.sum(axis=(1, 2))
+        percentages = cube / numpy.where(mission_totals > 0, mission_totals, 1)[:, None, None] * 100
+
+        disconnection_management_data = {}
+        for mission_code, device_type_code in zip(*numpy.nonzero(present & (unknown > disconnection_threshold))):
+            disconnection_management_data.setdefault(self.missions[mission_code], []).append({
+                'device_type': self.device_types[device_type_code],
+                'unknown_count': int(unknown[mission_code, device_type_code])
+            })
+
+        consolidation_data = {self.device_types[device_type_code]: int(inoperable[device_type_code])
+                              for device_type_code in numpy.flatnonzero(present.any(axis=0))}
+
+        percentage_calculation_data = {}
+        for mission_code, device_type_code in zip(*numpy.nonzero(present)):
+            mission_data = percentage_calculation_data.setdefault(self.missions[mission_code], {})
+            mission_data[self.device_types[device_type_code]] = {
+                status: float(percentages[mission_code, device_type_code, status_code])
+                for status_code, status in enumerate(self.statuses)}
+
+        return {
+            'events_analysis': self.to_events_analysis(),
+            'disconnection_management': disconnection_management_data,
+            'consolidation': consolidation_data,
+            'percentage_calculation': percentage_calculation_data
+        }
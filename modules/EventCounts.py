@@ -0,0 +1,41 @@
+# modules/EventCounts.py
+
+STATUS_CHOICES = ['excellent', 'good', 'warning', 'faulty', 'killed', 'unknown']
+
+
+def new_state_counts():
+    """
+    Devuelve un recuento vacío con todos los estados posibles de un dispositivo.
+    """
+    return dict.fromkeys(STATUS_CHOICES, 0)
+
+
+def count_event(events_analysis_data, data, amount=1):
+    """
+    Suma un evento al recuento misión × tipo de dispositivo × estado.
+    """
+    devices = events_analysis_data.get(data['mission'])
+    if devices is None:
+        devices = events_analysis_data[data['mission']] = {}
+
+    state_counts = devices.get(data['device_type'])
+    if state_counts is None:
+        state_counts = devices[data['device_type']] = new_state_counts()
+
+    state_counts[data['device_status']] += amount
+
+
+def merge_counts(target, source, sign=1):
+    """
+    Suma (o resta, con sign=-1) un recuento de eventos sobre otro, conservando el orden de aparición.
+    """
+    for mission, devices in source.items():
+        target_devices = target.setdefault(mission, {})
+        for device_type, state_counts in devices.items():
+            target_counts = target_devices.get(device_type)
+            if target_counts is None:
+                target_counts = target_devices[device_type] = new_state_counts()
+            for state, count in state_counts.items():
+                target_counts[state] = target_counts.get(state, 0) + sign * count
+
+    return target
@@ -1,8 +1,52 @@
 # modules/FileManager.py
 
+import datetime
+import json
 import logging
 import os
 import shutil
+import zipfile
+
+from modules.Metrics import DISABLED_METRICS
+from modules.SegmentLog import is_segment, read_footer
+
+BUNDLE_PREFIX = 'APLBACKUP-'
+MANIFEST_NAME = 'manifest.json'
+
+
+def is_bundle(path):
+    """
+    Indica si una ruta corresponde a un paquete comprimido de respaldo de un ciclo.
+    """
+    name = os.path.basename(path)
+    return name.startswith(BUNDLE_PREFIX) and name.endswith('.zip')
+
+
+def read_manifest(bundle_path):
+    """
+    Devuelve el manifiesto de un paquete de respaldo: ciclo, fecha y lista de archivos con su tamaño y CRC.
+    """
+    with zipfile.ZipFile(bundle_path) as bundle:
+        return json.loads(bundle.read(MANIFEST_NAME))
+
+
+def read_from_bundle(bundle_path, filename):
+    """
+    Lee un único archivo de un paquete de respaldo sin descomprimir el resto (acceso aleatorio por el directorio
+    central del ZIP).
+    """
+    with zipfile.ZipFile(bundle_path) as bundle:
+        return bundle.read(filename)
+
+
+def iter_bundle_members(bundle_path):
+    """
+    Recorre los archivos respaldados en un paquete, devolviendo su nombre y su contenido.
+    """
+    with zipfile.ZipFile(bundle_path) as bundle:
+        for info in bundle.infolist():
+            if info.filename != MANIFEST_NAME:
+                yield info.filename, bundle.read(info)
 
 
 class FileManager:
@@ -11,27 +55,110 @@ class FileManager:
     Se encarga de mover los archivos procesados a la copia de seguridad.
     """
 
-    def __init__(self, base_path):
+    def __init__(self, base_path, archive_mode='move', backup_index=None, metrics=None):
         """
         Inicializa el administrador de archivos con la ruta al directorio base.
         Crea los directorios de dispositivos y copias de seguridad si no existen.
+        Con archive_mode='bundle', los archivos de cada ciclo se empaquetan en un único ZIP comprimido con
+        manifiesto en lugar de moverse uno a uno. Si se proporciona un índice de respaldos, los eventos de cada
+        archivo respaldado se registran en él (en segundo plano si el índice está iniciado). Si se proporciona un
+        registro de métricas, se mide cada respaldo.
         """
         self.base_path = base_path
         self.devices_path = os.path.join(base_path, 'devices')
         self.backup_path = os.path.join(base_path, 'backups')
+        self.archive_mode = archive_mode
+        self.backup_index = backup_index
+        self.metrics = metrics if metrics is not None else DISABLED_METRICS
 
         # Crea los directorios de dispositivos y copias de seguridad si no existen
         for path in [self.devices_path, self.backup_path]:
             if not os.path.exists(path):
                 os.makedirs(path)
 
+    def archive_cycle(self, cycle_id, filenames):
+        """
+        Respalda los archivos procesados de un ciclo según el modo de archivado configurado.
+        """
+        with self.metrics.timer('backup_seconds'):
+            self.archive_files(cycle_id, filenames)
+        self.metrics.increment('backup_files_total', len(filenames))
+
+    def archive_files(self, cycle_id, filenames):
+        """
+        Mueve o empaqueta los archivos de un ciclo e indexa sus eventos si hay un índice de respaldos.
+        """
+        if self.archive_mode == 'bundle':
+            self.bundle_to_backup(cycle_id, filenames)
+            return
+
+        moved = [os.path.join(self.backup_path, filename) for filename in filenames if self.move_to_backup(filename)]
+        if moved and self.backup_index is not None:
+            # Se indexan ya respaldados; con el índice iniciado, la lectura se hace fuera del ciclo
+            self.backup_index.submit(moved)
+
     def move_to_backup(self, filename):
         """
         Mueve un archivo procesado al directorio buckups.
+        Los segmentos de eventos solo se mueven si están sellados, para no respaldar un segmento a medio escribir.
+        Devuelve True si el archivo se movió.
         """
         src_path = os.path.join(self.devices_path, filename)
         dst_path = os.path.join(self.backup_path, filename)
         try:
+            if is_segment(filename) and read_footer(src_path) is None:
+                logging.error(f"El segmento {filename} no está sellado y no se moverá al directorio backups")
+                return False
             shutil.move(src_path, dst_path)
         except Exception as e:
-            logging.error(f"No se pudo mover el archivo {filename} al directorio backups: {e}")
\ No newline at end of file
+            logging.error(f"No se pudo mover el archivo {filename} al directorio backups: {e}")
+            return False
+        return True
+
+    def bundle_to_backup(self, cycle_id, filenames):
+        """
+        Empaqueta los archivos procesados de un ciclo en un único ZIP comprimido en el directorio buckups, con un
+        manifiesto de su contenido, y elimina los originales. El paquete se escribe con un nombre temporal y se
+        renombra al terminar, de modo que nunca queda un paquete incompleto. Devuelve la ruta del paquete.
+        """
+        timestamp = datetime.datetime.now().strftime("%d%m%y%H%M%S")
+        cycle_label = f'{cycle_id:04d}' if cycle_id is not None else 'XXXX'
+        bundle_path = os.path.join(self.backup_path, f'{BUNDLE_PREFIX}{cycle_label}-{timestamp}.zip')
+        sequence = 0
+        while os.path.exists(bundle_path):
+            sequence += 1
+            bundle_path = os.path.join(self.backup_path, f'{BUNDLE_PREFIX}{cycle_label}-{timestamp}-{sequence}.zip')
+
+        bundled = []
+        part_path = f'{bundle_path}.part'
+        try:
+            with zipfile.ZipFile(part_path, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+                for filename in filenames:
+                    src_path = os.path.join(self.devices_path, filename)
+                    if is_segment(filename) and read_footer(src_path) is None:
+                        logging.error(f"El segmento {filename} no está sellado y no se empaquetará")
+                        continue
+                    try:
+                        bundle.write(src_path, filename)
+                    except OSError as e:
+                        logging.error(f"No se pudo empaquetar el archivo {filename}: {e}")
+                        continue
+                    info = bundle.getinfo(filename)
+                    bundled.append({'name': filename, 'size': info.file_size, 'crc': info.CRC})
+
+                manifest = {'cycle': cycle_id, 'date': timestamp, 'files': bundled}
+                bundle.writestr(MANIFEST_NAME, json.dumps(manifest))
+            os.replace(part_path, bundle_path)
+        except Exception as e:
+            logging.error(f"No se pudo crear el paquete de respaldo del ciclo {cycle_id}: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return None
+
+        for entry in bundled:
+            os.remove(os.path.join(self.devices_path, entry['name']))
+
+        if self.backup_index is not None:
+            self.backup_index.submit([bundle_path])
+
+        return bundle_path
@@ -0,0 +1,169 @@
+# modules/HashVerifier.py
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.AnalysisEngine import iter_log_events, split_chunks
+from modules.DataGenerator import generate_hash
+from modules.EventCounts import count_event, merge_counts
+from modules.SegmentLog import is_segment, read_footer
+
+
+class HashVerifier:
+    """
+    Esta clase representa la verificación de integridad de la simulación de Apollo 11.
+    Recalcula el hash de cada evento (fecha, misión, tipo de dispositivo y estado) y lo compara con el registrado.
+    Como en un segundo solo hay unas pocas decenas de combinaciones distintas, los hashes esperados se memorizan y
+    casi ningún evento llega a calcular un SHA-256. Los archivos se verifican por lotes en un conjunto de hilos y,
+    en la misma pasada, se cuentan, de modo que verificar no obliga a leer dos veces los archivos. Los archivos con
+    algún evento inválido o ilegible se mueven al directorio de cuarentena en lugar de contarse.
+    """
+
+    def __init__(self, quarantine_path, workers=4, parallel_threshold=64, cache_size=65536, metrics=None):
+        """
+        Inicializa el verificador con el directorio de cuarentena (se crea si no existe).
+        Los lotes de al menos parallel_threshold archivos se reparten entre workers hilos. cache_size limita la
+        cantidad de hashes memorizados. Si se proporciona un registro de métricas, se publican en él los contadores.
+        """
+        self.quarantine_path = quarantine_path
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.cache_size = cache_size
+        self.metrics = metrics
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.counters = {'files_verified': 0, 'events_verified': 0, 'hash_mismatches': 0, 'unreadable_files': 0,
+                         'footer_mismatches': 0, 'files_quarantined': 0, 'cache_hits': 0}
+
+        if not os.path.exists(self.quarantine_path):
+            os.makedirs(self.quarantine_path)
+
+    def expected_hash(self, data):
+        """
+        Devuelve el hash que corresponde a un evento, memorizado por (fecha, misión, tipo de dispositivo, estado).
+        """
+        key = (data['date'], data['mission'], data['device_type'], data['device_status'])
+        event_hash = self.cache.get(key)
+        if event_hash is None:
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            event_hash = self.cache[key] = generate_hash(*key)
+            return event_hash, False
+        return event_hash, True
+
+    def verify_files(self, sources, observe=None):
+        """
+        Verifica y cuenta una lista de archivos de log. Devuelve el recuento de los archivos válidos, los archivos
+        válidos, los rechazados y los contadores del lote. Si se indica observe, se llama con cada evento de los
+        archivos válidos que lleva identificador de dispositivo, sin volver a leerlos.
+        """
+        events_analysis_data = {}
+        valid = []
+        rejected = []
+        counters = dict.fromkeys(self.counters, 0)
+
+        for source in sources:
+            file_counts = {}
+            observed = []
+            mismatches = 0
+            events = 0
+            try:
+                footer = read_footer(source) if is_segment(source) else None
+                for data in iter_log_events(source):
+                    events += 1
+                    event_hash, cached = self.expected_hash(data)
+                    counters['cache_hits'] += cached
+                    counters['events_verified'] += 1
+                    if data.get('hash') != event_hash:
+                        mismatches += 1
+                        continue
+                    count_event(file_counts, data)
+                    if observe is not None and 'device_id' in data:
+                        observed.append(data)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logging.error(f"No se pudo verificar el archivo {os.path.basename(source)}: {e}")
+                counters['unreadable_files'] += 1
+                rejected.append(source)
+                continue
+
+            counters['files_verified'] += 1
+            # Las líneas ilegibles de un segmento se omiten al leerlo, así que se detectan con el índice del pie
+            if footer is not None and sum(sum(state_counts.values()) for devices in footer['counts'].values()
+                                          for state_counts in devices.values()) != events:
+                logging.error(f"El segmento {os.path.basename(source)} no coincide con el recuento de su pie")
+                counters['footer_mismatches'] += 1
+                rejected.append(source)
+                continue
+            if mismatches:
+                logging.error(f"El archivo {os.path.basename(source)} tiene {mismatches} eventos con hash inválido")
+                counters['hash_mismatches'] += mismatches
+                rejected.append(source)
+                continue
+
+            merge_counts(events_analysis_data, file_counts)
+            valid.append(source)
+            for data in observed:
+                observe(data)
+
+        return events_analysis_data, valid, rejected, counters
+
+    def verify(self, sources, observe=None):
+        """
+        Verifica y cuenta los archivos indicados, en paralelo si el lote es suficientemente grande.
+        Devuelve el recuento de los archivos válidos, los archivos válidos y los rechazados, en el orden de entrada.
+        observe recibe los eventos de los archivos válidos, como en verify_files.
+        """
+        sources = list(sources)
+        if self.workers <= 1 or len(sources) < self.parallel_threshold:
+            results = [self.verify_files(sources, observe)]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(lambda chunk: self.verify_files(chunk, observe),
+                                        split_chunks(sources, self.workers * 4)))
+
+        events_analysis_data = {}
+        valid = []
+        rejected = []
+        totals = dict.fromkeys(self.counters, 0)
+        for partial, partial_valid, partial_rejected, counters in results:
+            merge_counts(events_analysis_data, partial)
+            valid.extend(partial_valid)
+            rejected.extend(partial_rejected)
+            for name, value in counters.items():
+                totals[name] += value
+
+        self.add_counters(totals)
+        return events_analysis_data, valid, rejected
+
+    def quarantine(self, sources):
+        """
+        Mueve los archivos rechazados al directorio de cuarentena.
+        """
+        moved = 0
+        for source in sources:
+            try:
+                shutil.move(source, os.path.join(self.quarantine_path, os.path.basename(source)))
+                moved += 1
+            except OSError as e:
+                logging.error(f"No se pudo mover a cuarentena el archivo {os.path.basename(source)}: {e}")
+        self.add_counters({'files_quarantined': moved})
+
+    def add_counters(self, counters):
+        """
+        Suma los contadores de un lote a los totales del verificador y al registro de métricas.
+        """
+        with self.lock:
+            for name, value in counters.items():
+                self.counters[name] += value
+        if self.metrics is not None:
+            for name, value in counters.items():
+                self.metrics.increment(f'verifier_{name}_total', value)
+
+    def snapshot(self):
+        """
+        Devuelve una copia de los contadores del verificador.
+        """
+        with self.lock:
+            return dict(self.counters)
@@ -0,0 +1,115 @@
+# modules/IncrementalAggregator.py
+import json
+import logging
+import os
+
+from modules.DurableWriter import DurableWriter
+from modules.EventCounts import merge_counts
+
+
+def source_signature(source):
+    """
+    Identifica un archivo de log por su nombre y su fecha de modificación, de modo que un archivo nuevo que
+    reutilice el nombre de otro ya procesado (por ejemplo, tras reiniciar los ciclos) no se confunda con él.
+    """
+    try:
+        return f"{os.path.basename(source)}:{os.stat(source).st_mtime_ns}"
+    except OSError:
+        return os.path.basename(source)
+
+
+def total_events(events_analysis_data):
+    """
+    Devuelve el número total de eventos de un recuento misión × tipo de dispositivo × estado.
+    """
+    return sum(sum(sum(state_counts.values()) for state_counts in devices.values())
+               for devices in events_analysis_data.values())
+
+
+class IncrementalAggregator:
+    """
+    Esta clase representa el agregador incremental de la simulación de Apollo 11.
+    Acumula en contadores persistentes los eventos de cada ciclo, de modo que el informe acumulado cuesta
+    O(eventos nuevos) y no O(historial). Su estado se guarda de forma atómica en un punto de control y se
+    recupera al reiniciar la simulación.
+    """
+
+    def __init__(self, checkpoint_path):
+        """
+        Inicializa el agregador con la ruta al archivo de punto de control y recupera su estado si existe.
+        """
+        self.checkpoint_path = checkpoint_path
+        self.totals = {}
+        self.folded_cycles = 0
+        self.folded_events = 0
+        self.last_cycle_id = None
+        self.last_sources = []
+
+        checkpoint_dir = os.path.dirname(self.checkpoint_path)
+        if checkpoint_dir and not os.path.exists(checkpoint_dir):
+            os.makedirs(checkpoint_dir)
+
+        self.load()
+
+    def fold(self, events_analysis_data, sources, cycle_id=None, recount=None):
+        """
+        Incorpora a los contadores acumulados el recuento de un ciclo.
+        Si algunos archivos del ciclo ya se habían acumulado antes de una caída (porque no llegaron a moverse a
+        backups), se descuenta su aporte usando la función recount, que recibe sus rutas y devuelve su recuento.
+        """
+        signatures = [source_signature(source) for source in sources]
+        already_folded = set(self.last_sources)
+        repeated = [source for source, signature in zip(sources, signatures) if signature in already_folded]
+
+        merge_counts(self.totals, events_analysis_data)
+        self.folded_events += total_events(events_analysis_data)
+        if repeated:
+            if recount is None:
+                logging.warning(f"{len(repeated)} archivos ya acumulados se contarán de nuevo")
+            else:
+                repeated_data = recount(repeated)
+                merge_counts(self.totals, repeated_data, sign=-1)
+                self.folded_events -= total_events(repeated_data)
+
+        self.folded_cycles += 1
+        self.last_cycle_id = cycle_id
+        self.last_sources = signatures
+
+    def state(self):
+        """
+        Devuelve el estado serializable del agregador.
+        """
+        return {
+            'totals': self.totals,
+            'folded_cycles': self.folded_cycles,
+            'folded_events': self.folded_events,
+            'last_cycle_id': self.last_cycle_id,
+            'last_sources': self.last_sources
+        }
+
+    def checkpoint(self):
+        """
+        Guarda el estado en el punto de control de forma atómica: escribe un archivo temporal, lo sincroniza
+        con el disco y lo renombra sobre el anterior (durabilidad 'strict' de DurableWriter).
+        """
+        DurableWriter('strict').write(self.checkpoint_path, json.dumps(self.state()))
+
+    def load(self):
+        """
+        Recupera el estado desde el punto de control, si existe.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return
+
+        try:
+            with open(self.checkpoint_path, 'r') as file:
+                state = json.load(file)
+        except (OSError, ValueError) as e:
+            logging.error(f"No se pudo leer el punto de control {self.checkpoint_path}: {e}")
+            return
+
+        self.totals = state.get('totals', {})
+        self.folded_cycles = state.get('folded_cycles', 0)
+        self.folded_events = state.get('folded_events', 0)
+        self.last_cycle_id = state.get('last_cycle_id')
+        self.last_sources = state.get('last_sources', [])
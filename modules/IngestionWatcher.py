@@ -0,0 +1,339 @@
+# modules/IngestionWatcher.py
+import copy
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+
+from modules.AnalysisEngine import count_log_files
+from modules.EventCounts import merge_counts
+
+# Constantes de inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def is_log_name(name):
+    """
+    Indica si un nombre de archivo corresponde a un archivo de log terminado (no oculto ni a medio escribir).
+    """
+    return name.endswith('.log') and not name.startswith('.')
+
+
+def load_inotify():
+    """
+    Carga las funciones de inotify de la biblioteca C. Devuelve None si el sistema no las ofrece.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class IngestionWatcher:
+    """
+    Esta clase representa el observador de ingesta de la simulación de Apollo 11.
+    En lugar de volver a recorrer el directorio de dispositivos en cada ciclo, recibe los archivos de log a medida
+    que se cierran (inotify en Linux, con un sondeo periódico como alternativa), los cuenta al llegar y mantiene
+    un recuento parcial en tiempo casi real que el generador de reportes recoge al final de cada ciclo.
+    """
+
+    def __init__(self, devices_path, use_inotify=True, poll_interval=1.0, verifier=None, observe=None):
+        """
+        Inicializa el observador con la ruta al directorio de dispositivos.
+        Si inotify no está disponible (o use_inotify es False), el directorio se sondea cada poll_interval
+        segundos y un archivo se ingiere cuando su tamaño y su fecha no cambian entre dos sondeos.
+        Con un verificador de integridad (HashVerifier), cada archivo se verifica y se cuenta en la misma lectura;
+        los inválidos se mueven a cuarentena y no llegan al recuento parcial ni a los oyentes.
+        observe es una función que recibe cada evento en la misma lectura que lo cuenta (por ejemplo,
+        DeviceSketches.observe).
+        """
+        self.devices_path = devices_path
+        self.use_inotify = use_inotify
+        self.poll_interval = poll_interval
+        self.verifier = verifier
+        self.observe = observe
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.inotify_fd = None
+        self.listeners = []
+
+        # Recuento parcial de los archivos pendientes y recuento de cada uno, en orden de llegada
+        self.partial = {}
+        self.pending = {}
+        # Firmas (fecha de modificación) de los archivos ingeridos que siguen en el directorio de dispositivos
+        self.known = {}
+        self.drained = []
+        # Archivos movidos a cuarentena al ingerirlos y aún no recogidos
+        self.quarantined = set()
+        # Archivos que algún hilo está contando: ruta -> evento que se activa al terminar
+        self.ingesting = {}
+        # Observaciones del sondeo: ruta -> (tamaño, fecha)
+        self.observed = {}
+
+        if not os.path.exists(self.devices_path):
+            os.makedirs(self.devices_path)
+
+    @property
+    def mode(self):
+        """
+        Devuelve el mecanismo de observación en uso: 'inotify' o 'polling'.
+        """
+        return 'inotify' if self.inotify_fd is not None else 'polling'
+
+    def add_listener(self, callback):
+        """
+        Registra una función que se llama con la ruta y el recuento de cada archivo ingerido.
+        """
+        self.listeners.append(callback)
+
+    def start(self):
+        """
+        Empieza a observar el directorio de dispositivos en un hilo en segundo plano.
+        Los archivos que ya estaban en el directorio se ingieren al empezar.
+        """
+        if self.use_inotify:
+            self.inotify_fd = self.open_inotify()
+
+        self.thread = threading.Thread(target=self.run, name='apolo11-ingest', daemon=True)
+        self.thread.start()
+
+    def open_inotify(self):
+        """
+        Crea la instancia de inotify y vigila los cierres de escritura y los renombrados hacia el directorio.
+        Devuelve el descriptor, o None si no se pudo crear.
+        """
+        libc = load_inotify()
+        if libc is None:
+            return None
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logging.warning(f"inotify no disponible ({os.strerror(ctypes.get_errno())}); se usará sondeo")
+            return None
+
+        if libc.inotify_add_watch(fd, os.fsencode(self.devices_path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            logging.warning(f"No se pudo vigilar {self.devices_path} ({os.strerror(ctypes.get_errno())}); "
+                            f"se usará sondeo")
+            os.close(fd)
+            return None
+
+        return fd
+
+    def run(self):
+        """
+        Bucle del hilo observador hasta que se detiene.
+        """
+        if self.inotify_fd is None:
+            while not self.stop_event.is_set():
+                self.poll()
+                self.stop_event.wait(self.poll_interval)
+            return
+
+        # El recorrido inicial se hace después de añadir la vigilancia, para no perder archivos entre ambos pasos
+        self.rescan()
+        while not self.stop_event.is_set():
+            readable, _, _ = select.select([self.inotify_fd], [], [], 0.5)
+            if readable:
+                self.read_events()
+
+    def read_events(self):
+        """
+        Lee y procesa los eventos de inotify disponibles.
+        """
+        try:
+            buffer = os.read(self.inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(buffer):
+            _, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + name_length].rstrip(b'\0').decode()
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                logging.warning("Se desbordó la cola de inotify; se recorre el directorio de dispositivos")
+                self.rescan()
+            elif is_log_name(name):
+                self.ingest(os.path.join(self.devices_path, name))
+
+    def rescan(self):
+        """
+        Ingiere los archivos de log del directorio que aún no se han ingerido.
+        """
+        with os.scandir(self.devices_path) as entries:
+            paths = [entry.path for entry in entries if is_log_name(entry.name) and entry.is_file()]
+        for path in paths:
+            self.ingest(path)
+
+    def poll(self):
+        """
+        Sondea el directorio de dispositivos e ingiere los archivos cuyo tamaño y fecha no cambiaron desde el
+        sondeo anterior, es decir, que ya no se están escribiendo.
+        """
+        observed = {}
+        with os.scandir(self.devices_path) as entries:
+            for entry in entries:
+                if not is_log_name(entry.name) or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                observed[entry.path] = (stat.st_size, stat.st_mtime_ns)
+
+        for path, observation in observed.items():
+            if self.known.get(path) != observation[1] and self.observed.get(path) == observation:
+                self.ingest(path)
+
+        with self.lock:
+            for path in [path for path in self.known if path not in observed]:
+                del self.known[path]
+        self.observed = observed
+
+    def ingest(self, path):
+        """
+        Cuenta un archivo de log recién cerrado y lo suma al recuento parcial, salvo que ya se haya ingerido.
+        Con verificador, el archivo se verifica al contarlo y, si es inválido, se mueve a cuarentena.
+        Si otro hilo ya lo está contando, espera a que termine en lugar de verificarlo y observarlo dos veces.
+        """
+        with self.lock:
+            in_progress = self.ingesting.get(path)
+            if in_progress is None:
+                self.ingesting[path] = threading.Event()
+        if in_progress is not None:
+            in_progress.wait()
+            return
+
+        try:
+            self.count_and_register(path)
+        finally:
+            with self.lock:
+                self.ingesting.pop(path).set()
+
+    def count_and_register(self, path):
+        """
+        Cuenta (y verifica) un archivo reclamado por ingest() y lo registra como pendiente o en cuarentena.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if self.known.get(path) == mtime:
+                return
+            if self.verifier is None:
+                events_analysis_data = count_log_files([path], self.observe)
+            else:
+                events_analysis_data, _, rejected = self.verifier.verify([path], self.observe)
+        except (OSError, ValueError) as e:
+            logging.error(f"No se pudo ingerir el archivo {path}: {e}")
+            return
+
+        if self.verifier is not None and rejected:
+            with self.lock:
+                if self.known.get(path) == mtime:
+                    return
+                self.known[path] = mtime
+                self.quarantined.add(path)
+            self.verifier.quarantine(rejected)
+            return
+
+        with self.lock:
+            # Un take() pudo recoger el archivo mientras se contaba; en ese caso ya lo contó el llamador
+            if self.known.get(path) == mtime:
+                return
+            self.known[path] = mtime
+            self.pending[path] = events_analysis_data
+            merge_counts(self.partial, events_analysis_data)
+
+        for callback in self.listeners:
+            callback(path, events_analysis_data)
+
+    def snapshot(self):
+        """
+        Devuelve una copia del recuento parcial de los archivos ingeridos y aún no recogidos.
+        """
+        with self.lock:
+            return copy.deepcopy(self.partial)
+
+    def drain(self):
+        """
+        Recoge todos los archivos ingeridos pendientes. Devuelve su recuento y sus rutas, y reinicia el parcial.
+        """
+        with self.lock:
+            pending, self.pending, self.partial = self.pending, {}, {}
+            self.quarantined.clear()
+            self.forget_archived(list(pending))
+
+        # El recuento se rehace a partir de cada archivo para no arrastrar ceros de archivos recogidos con take
+        events_analysis_data = {}
+        for counts in pending.values():
+            merge_counts(events_analysis_data, counts)
+        return events_analysis_data, list(pending)
+
+    def take(self, sources):
+        """
+        Recoge solo los archivos indicados. Los que el observador aún no había recibido se ingieren en el momento,
+        para que también lleguen a los oyentes. Devuelve el recuento, la lista de los que no se pudieron ingerir,
+        que el llamador debe contar por su cuenta, y la de los que se movieron a cuarentena.
+        """
+        sources = list(sources)
+        with self.lock:
+            unseen = [source for source in sources if source not in self.pending and source not in self.quarantined]
+        for source in unseen:
+            self.ingest(source)
+
+        events_analysis_data = {}
+        taken = []
+        missing = []
+        rejected = []
+        with self.lock:
+            for source in sources:
+                if source in self.quarantined:
+                    self.quarantined.discard(source)
+                    rejected.append(source)
+                    continue
+                counts = self.pending.pop(source, None)
+                if counts is None:
+                    # Se marca como ingerido para no contarlo otra vez cuando llegue su evento
+                    try:
+                        self.known[source] = os.stat(source).st_mtime_ns
+                    except OSError:
+                        pass
+                    missing.append(source)
+                    taken.append(source)
+                    continue
+                merge_counts(events_analysis_data, counts)
+                merge_counts(self.partial, counts, sign=-1)
+                taken.append(source)
+            self.forget_archived(taken)
+        return events_analysis_data, missing, rejected
+
+    def forget_archived(self, sources):
+        """
+        Olvida las firmas de los archivos recogidos en la llamada anterior que ya salieron del directorio de
+        dispositivos, para que la memoria del observador no crezca con el historial.
+        """
+        for path in self.drained:
+            if path in self.known and not os.path.exists(path):
+                del self.known[path]
+        self.drained = [path for path in self.drained if path in self.known] + sources
+
+    def stop(self):
+        """
+        Detiene el observador y libera el descriptor de inotify.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
@@ -0,0 +1,235 @@
+# modules/Metrics.py
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+
+from modules.DurableWriter import DurableWriter
+
+# Límites de los histogramas de duración, en segundos
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def metric_name(name, prefix='apolo11_'):
+    """
+    Normaliza un nombre de métrica al formato de Prometheus.
+    """
+    return prefix + re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+class NullTimer:
+    """
+    Cronómetro vacío que se usa cuando las métricas están desactivadas, para que su coste sea despreciable.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class Timer:
+    """
+    Cronómetro que registra la duración de un bloque en un histograma al salir de él.
+    """
+
+    def __init__(self, metrics, name):
+        """
+        Inicializa el cronómetro con el registro de métricas y el nombre del histograma.
+        """
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Histogram:
+    """
+    Histograma acumulativo con límites fijos, al estilo de Prometheus.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Inicializa el histograma vacío con los límites indicados.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """
+        Registra una observación en el histograma.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        """
+        Devuelve el estado del histograma con los recuentos acumulados por límite.
+        """
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {'count': self.count, 'sum': self.sum, 'buckets': cumulative}
+
+
+class Metrics:
+    """
+    Esta clase representa el registro de métricas de la simulación de Apollo 11.
+    Ofrece cronómetros, contadores e histogramas para las etapas del ciclo y una instantánea de su estado.
+    Cuando está desactivado, los cronómetros son un objeto vacío compartido y los contadores retornan de inmediato.
+    """
+
+    def __init__(self, enabled=True):
+        """
+        Inicializa el registro de métricas, activado o desactivado.
+        """
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def timer(self, name):
+        """
+        Devuelve un cronómetro para medir la duración de un bloque with en el histograma name.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name)
+
+    def increment(self, name, amount=1):
+        """
+        Incrementa un contador.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        """
+        Fija el valor actual de un indicador.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, name, value):
+        """
+        Registra una observación en un histograma.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def snapshot(self):
+        """
+        Devuelve una copia del estado actual de todas las métricas.
+        """
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+            }
+
+    def to_prometheus(self):
+        """
+        Devuelve las métricas en el formato de texto de Prometheus.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f"# TYPE {metric_name(name)} counter")
+            lines.append(f"{metric_name(name)} {value}")
+        for name, value in sorted(snapshot['gauges'].items()):
+            lines.append(f"# TYPE {metric_name(name)} gauge")
+            lines.append(f"{metric_name(name)} {value}")
+        for name, histogram in sorted(snapshot['histograms'].items()):
+            full_name = metric_name(name)
+            lines.append(f"# TYPE {full_name} histogram")
+            for bound, count in histogram['buckets']:
+                label = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{full_name}_bucket{{le="{label}"}} {count}')
+            lines.append(f"{full_name}_sum {histogram['sum']}")
+            lines.append(f"{full_name}_count {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+# Registro desactivado que usan por defecto las clases de la simulación
+DISABLED_METRICS = Metrics(enabled=False)
+
+
+class PrometheusExporter:
+    """
+    Esta clase escribe periódicamente las métricas en un archivo con el formato de texto de Prometheus, para que
+    las recoja, por ejemplo, el textfile collector de node_exporter. El archivo se reemplaza de forma atómica.
+    """
+
+    def __init__(self, metrics, path, interval=15):
+        """
+        Inicializa el exportador con el registro de métricas, la ruta del archivo y el intervalo de escritura.
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        metrics_dir = os.path.dirname(self.path)
+        if metrics_dir and not os.path.exists(metrics_dir):
+            os.makedirs(metrics_dir)
+
+    def write(self):
+        """
+        Escribe las métricas actuales en el archivo de salida.
+        """
+        try:
+            DurableWriter('atomic').write(self.path, self.metrics.to_prometheus())
+        except OSError as e:
+            logging.error(f"No se pudieron exportar las métricas a {self.path}: {e}")
+
+    def start(self):
+        """
+        Inicia la escritura periódica en un hilo en segundo plano.
+        """
+        self.thread = threading.Thread(target=self.run, name='apolo11-metrics', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Escribe las métricas cada intervalo hasta que se detiene el exportador.
+        """
+        while not self.stop_event.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        """
+        Detiene el exportador y escribe una última vez las métricas.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.write()
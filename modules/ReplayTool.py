@@ -0,0 +1,189 @@
+# modules/ReplayTool.py
+import datetime
+import json
+import logging
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.AnalysisEngine import split_chunks
+from modules.BinaryLog import count_binary_buffer, is_binary, iter_binary_records, parse_header
+from modules.EventCounts import count_event, merge_counts
+from modules.FileManager import MANIFEST_NAME, is_bundle
+from modules.ReportGenerator import ReportGenerator
+from modules.SegmentLog import FOOTER_KEY, is_segment
+
+CYCLE_PATTERN = re.compile(r'-(\d{4,})-\d+\.log$')
+# Nombres sin separador entre ciclo y secuencia (segmentos, logs binarios y archivos por evento anteriores)
+LEGACY_CYCLE_PATTERN = re.compile(r'-(\d{7,})\.log$')
+
+
+def parse_cycle_id(filename):
+    """
+    Obtiene el ciclo de un archivo de log a partir de su nombre (<prefijo>-<ciclo:04d>-<índice:05d>.log, o
+    <prefijo>-<ciclo:04d><secuencia:03d>.log sin separador). Devuelve None si el nombre no sigue el estándar.
+    """
+    match = CYCLE_PATTERN.search(filename)
+    if match:
+        return int(match.group(1))
+    match = LEGACY_CYCLE_PATTERN.search(filename)
+    return int(match.group(1)[:-3]) if match else None
+
+
+def sort_key(group_key):
+    """
+    Clave de orden de un grupo (fecha ddmmyyHHMMSS, ciclo): primero por fecha real y luego por ciclo.
+    """
+    date, cycle_id = group_key
+    try:
+        moment = datetime.datetime.strptime(date, "%d%m%y%H%M%S")
+    except (TypeError, ValueError):
+        moment = datetime.datetime.min
+    return moment, cycle_id if cycle_id is not None else -1
+
+
+def content_groups(filename, content, cycle_id=None, groups=None):
+    """
+    Suma el recuento del contenido de un archivo de log a sus grupos (fecha, ciclo).
+    Los segmentos sellados y los logs binarios se cuentan sin decodificar cada evento: todos los eventos de un
+    archivo se generan en la misma llamada y comparten fecha, que se toma del primero.
+    """
+    if groups is None:
+        groups = {}
+    if cycle_id is None:
+        cycle_id = parse_cycle_id(filename)
+
+    if is_binary(filename):
+        header, _ = parse_header(content)
+        first = next(iter_binary_records(content), None)
+        if first is not None:
+            key = (first['date'], header.get('cycle', cycle_id))
+            merge_counts(groups.setdefault(key, {}), count_binary_buffer(content))
+        return groups
+
+    if not is_segment(filename):
+        data = json.loads(content)
+        count_event(groups.setdefault((data.get('date'), cycle_id), {}), data)
+        return groups
+
+    lines = content.splitlines()
+    footer = json.loads(lines[-1]).get(FOOTER_KEY) if lines else None
+    if footer is not None and len(lines) > 1:
+        key = (json.loads(lines[0]).get('date'), footer.get('cycle', cycle_id))
+        merge_counts(groups.setdefault(key, {}), footer['counts'])
+        return groups
+
+    for line in lines:
+        try:
+            data = json.loads(line)
+        except ValueError:
+            continue
+        if FOOTER_KEY not in data:
+            count_event(groups.setdefault((data.get('date'), cycle_id), {}), data)
+    return groups
+
+
+def replay_files(paths):
+    """
+    Devuelve los recuentos por (fecha, ciclo) de una lista de archivos de log o paquetes de respaldo.
+    Es una función de módulo para que los procesos de trabajo puedan ejecutarla.
+    """
+    groups = {}
+    for path in paths:
+        filename = os.path.basename(path)
+        try:
+            if is_bundle(filename):
+                with zipfile.ZipFile(path) as bundle:
+                    manifest = json.loads(bundle.read(MANIFEST_NAME))
+                    for info in bundle.infolist():
+                        if info.filename != MANIFEST_NAME:
+                            content_groups(info.filename, bundle.read(info), manifest.get('cycle'), groups)
+                continue
+
+            with open(path, 'rb') as file:
+                content_groups(filename, file.read(), None, groups)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logging.error(f"No se pudo reproducir el archivo {filename}: {e}")
+    return groups
+
+
+class ReplayTool:
+    """
+    Esta clase representa la herramienta de reproducción de la simulación de Apollo 11.
+    Lee el directorio backups (archivos por evento, segmentos, logs binarios y paquetes ZIP), reagrupa los eventos
+    en sus ciclos originales por fecha y número de ciclo y regenera, en orden cronológico, los informes, el
+    informe acumulado y el tablero de control en un directorio de salida, sin tocar los directorios en uso.
+    """
+
+    def __init__(self, backup_path, output_path, workers=None, rollups=None):
+        """
+        Inicializa la herramienta con el directorio de respaldos de origen y el directorio de salida.
+        Los archivos se leen en paralelo con workers procesos (por defecto, uno por núcleo). Si se proporciona un
+        almacén de agregados temporales, cada ciclo se suma a él con su fecha original.
+        """
+        self.backup_path = os.path.abspath(backup_path)
+        self.output_path = os.path.abspath(output_path)
+        if self.output_path == self.backup_path or self.backup_path.startswith(self.output_path + os.sep):
+            raise ValueError("El directorio de salida no puede contener el directorio de respaldos")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.rollups = rollups
+        self.report_generator = ReportGenerator(os.path.join(self.output_path, 'devices'),
+                                                os.path.join(self.output_path, 'backups'),
+                                                os.path.join(self.output_path, 'reports'))
+
+    def list_sources(self):
+        """
+        Devuelve las rutas de los archivos de log y paquetes del directorio de respaldos, por nombre.
+        """
+        with os.scandir(self.backup_path) as entries:
+            return sorted(entry.path for entry in entries if entry.is_file() and not entry.name.startswith('.')
+                          and (entry.name.endswith('.log') or is_bundle(entry.name)))
+
+    def collect(self, sources=None):
+        """
+        Cuenta los eventos de los respaldos agrupados por (fecha, ciclo), en paralelo si hay más de un trabajador.
+        Los archivos se reparten en bloques para que el coste de enviar las tareas no domine con millones de
+        archivos pequeños.
+        """
+        if sources is None:
+            sources = self.list_sources()
+
+        if self.workers <= 1 or len(sources) < 2:
+            return replay_files(sources)
+
+        groups = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for partial in executor.map(replay_files, split_chunks(sources, self.workers * 4)):
+                for key, events_analysis_data in partial.items():
+                    merge_counts(groups.setdefault(key, {}), events_analysis_data)
+        return groups
+
+    def replay(self, sources=None):
+        """
+        Regenera los informes de todos los ciclos respaldados en orden cronológico y devuelve la cantidad de ciclos.
+        Cada informe se nombra con la fecha original de sus eventos y su ciclo.
+        """
+        groups = self.collect(sources)
+        report_generator = self.report_generator
+        totals = {}
+
+        # El tablero se añade ciclo a ciclo, así que se empieza de cero (con sus partes rotadas) en cada reproducción
+        report_generator.dashboard.reset()
+
+        for date, cycle_id in sorted(groups, key=sort_key):
+            events_analysis_data = groups[(date, cycle_id)]
+            analysis_data = report_generator.analysis_engine.derive(events_analysis_data)
+            cycle_label = f'{cycle_id:04d}' if cycle_id is not None else 'XXXX'
+            report_generator.save_report(f'APLSTATS-REPORTE-{date}-{cycle_label}.log', analysis_data)
+            report_generator.generate_dashboard(analysis_data, cycle_id)
+            report_generator.writer.commit()
+            merge_counts(totals, events_analysis_data)
+            if self.rollups is not None:
+                moment = sort_key((date, cycle_id))[0]
+                self.rollups.add(events_analysis_data, cycle_id, moment if moment != datetime.datetime.min else None)
+
+        report_generator.save_report('APLSTATS-ACUMULADO.log', report_generator.analysis_engine.derive(totals))
+        report_generator.writer.commit()
+        return len(groups)
@@ -0,0 +1,161 @@
+# modules/ReportArchive.py
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from modules.DeltaReports import DELTA_PREFIX, DeltaReportReader
+from modules.EventCounts import STATUS_CHOICES, count_event
+
+
+class ReportArchive:
+    """
+    Esta clase representa el archivo compacto de informes de la simulación de Apollo 11.
+    Guarda en SQLite solo el recuento misión × tipo de dispositivo × estado de cada informe (las demás secciones se
+    derivan de él), una fila por celda no nula, y ofrece consultas de tendencia entre informes, de modo que el
+    tablero no tiene que volver a leer todos los archivos de reporte en cada llamada.
+    """
+
+    def __init__(self, db_path):
+        """
+        Inicializa el archivo con la ruta a la base de datos y crea sus tablas si no existen.
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS reports (
+                    id INTEGER PRIMARY KEY,
+                    cycle_id INTEGER,
+                    created TEXT,
+                    filename TEXT
+                );
+                CREATE TABLE IF NOT EXISTS report_counts (
+                    report_id INTEGER,
+                    mission TEXT,
+                    device_type TEXT,
+                    status TEXT,
+                    count INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS report_counts_by_mission ON report_counts (mission, report_id);
+                CREATE INDEX IF NOT EXISTS report_counts_by_report ON report_counts (report_id);
+            """)
+
+    def add(self, events_analysis_data, cycle_id=None, filename=None, created=None):
+        """
+        Añade un informe al archivo a partir de su recuento de eventos y devuelve su identificador.
+        """
+        created = (created or datetime.datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock, self.connection:
+            report_id = self.connection.execute("INSERT INTO reports (cycle_id, created, filename) VALUES (?, ?, ?)",
+                                                (cycle_id, created, filename)).lastrowid
+            self.connection.executemany("INSERT INTO report_counts VALUES (?, ?, ?, ?, ?)", [
+                (report_id, mission, device_type, status, count)
+                for mission, devices in events_analysis_data.items()
+                for device_type, state_counts in devices.items()
+                for status, count in state_counts.items() if count])
+        return report_id
+
+    def import_reports(self, reports_path):
+        """
+        Archiva los informes APLSTATS-REPORTE-*.log y APLSTATS-DELTA-*.log (reconstruidos) de un directorio que aún
+        no estén archivados (por ejemplo, los generados antes de activar el archivo). Devuelve la cantidad de
+        informes añadidos.
+        """
+        with self.lock:
+            archived = {row[0] for row in self.connection.execute("SELECT filename FROM reports")}
+
+        added = 0
+        delta_reader = DeltaReportReader(reports_path)
+        for filename in sorted(os.listdir(reports_path)):
+            if not filename.startswith(('APLSTATS-REPORTE-', DELTA_PREFIX)) or not filename.endswith('.log') \
+                    or filename in archived:
+                continue
+            filepath = os.path.join(reports_path, filename)
+            try:
+                if filename.startswith(DELTA_PREFIX):
+                    events_analysis_data = delta_reader.read(filename)['events_analysis']
+                else:
+                    with open(filepath, 'r') as file:
+                        events_analysis_data = json.load(file)['events_analysis']
+            except (OSError, ValueError, KeyError) as e:
+                logging.error(f"No se pudo archivar el informe {filename}: {e}")
+                continue
+            created = datetime.datetime.fromtimestamp(os.path.getmtime(filepath))
+            self.add(events_analysis_data, None, filename, created)
+            added += 1
+        return added
+
+    def report_ids(self, last_n=None):
+        """
+        Devuelve los identificadores de los últimos last_n informes (todos si es None), del más antiguo al más
+        reciente.
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT id FROM reports ORDER BY id DESC LIMIT ?",
+                                           (last_n if last_n is not None else -1,)).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def report(self, report_id):
+        """
+        Devuelve el recuento de eventos de un informe archivado.
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT mission, device_type, status, count FROM report_counts "
+                                           "WHERE report_id = ? ORDER BY rowid", (report_id,)).fetchall()
+        events_analysis_data = {}
+        for mission, device_type, status, count in rows:
+            count_event(events_analysis_data, {'mission': mission, 'device_type': device_type,
+                                               'device_status': status}, count)
+        return events_analysis_data
+
+    def missions(self):
+        """
+        Devuelve las misiones presentes en el archivo.
+        """
+        with self.lock:
+            return [row[0] for row in self.connection.execute(
+                "SELECT DISTINCT mission FROM report_counts ORDER BY mission")]
+
+    def status_percentages(self, mission, last_n=10, device_type=None):
+        """
+        Tendencia de una misión en los últimos last_n informes: para cada informe, su ciclo, su fecha y el
+        porcentaje de eventos de cada estado respecto al total de la misión (opcionalmente, de un tipo de
+        dispositivo).
+        """
+        report_ids = self.report_ids(last_n)
+        if not report_ids:
+            return []
+
+        device_clause = " AND device_type = ?" if device_type is not None else ""
+        params = [mission, report_ids[0]] + ([device_type] if device_type is not None else [])
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT r.id, r.cycle_id, r.created, c.status, SUM(c.count) FROM reports r "
+                "JOIN report_counts c ON c.report_id = r.id "
+                f"WHERE c.mission = ? AND r.id >= ?{device_clause} GROUP BY r.id, c.status ORDER BY r.id",
+                params).fetchall()
+
+        trend = {}
+        for report_id, cycle_id, created, status, count in rows:
+            entry = trend.setdefault(report_id, {'report_id': report_id, 'cycle_id': cycle_id, 'created': created,
+                                                 'total': 0, 'counts': dict.fromkeys(STATUS_CHOICES, 0)})
+            entry['counts'][status] = count
+            entry['total'] += count
+
+        for entry in trend.values():
+            entry['percentages'] = {status: count / entry['total'] * 100 for status, count in entry['counts'].items()}
+        return list(trend.values())
+
+    def close(self):
+        """
+        Cierra la conexión con la base de datos.
+        """
+        self.connection.close()
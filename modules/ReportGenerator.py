@@ -1,142 +1,16 @@
 # modules/ReportGenerator.py
 import datetime
-import glob
+import functools
 import json
 import os
 import shutil
 
-
-def write_header(dashboard_file, cycle_id):
-    """
-    Escribe el encabezado del panel de control.
-    """
-    dashboard_file.write(f"\n# Análisis para Ciclo {cycle_id}\n")
-
-
-def write_table_header(dashboard_file, headers):
-    """
-    Escribe el encabezado de una tabla en el panel de control.
-    """
-    dashboard_file.write(
-        "<tr>" + "".join([f"<th style='border: 2px solid black;'>{header}</th>" for header in headers]) + "</tr>\n")
-
-
-def write_table_row(dashboard_file, row_data):
-    """
-    Escribe una fila de una tabla en el panel de control.
-    """
-    dashboard_file.write(
-        "<tr>" + "".join([f"<td style='border: 2px solid black;'>{data}</td>" for data in row_data]) + "</tr>\n")
-
-
-def write_events_analysis(dashboard_file, events_analysis_data):
-    """
-    Escribe la sección de análisis de eventos del panel de control.
-    """
-    dashboard_file.write("\n## Análisis de Eventos\n")
-    dashboard_file.write(
-        "<table style='border-collapse: collapse; border: 2px solid black; text-align: center;'>\n")
-    write_table_header(dashboard_file, ["Misión", "Tipo de Dispositivo", "Estado", "Cantidad"])
-    for mission, devices in events_analysis_data.items():
-        for device_type, state_counts in devices.items():
-            for state, count in state_counts.items():
-                write_table_row(dashboard_file, [mission, device_type, state, str(count)])
-    dashboard_file.write("</table>\n")
-
-
-def write_disconnection_management(dashboard_file, disconnection_management_data):
-    """
-    Escribe la sección de gestión de desconexiones del panel de control.
-    """
-    dashboard_file.write("\n## Gestión de Desconexiones\n")
-    dashboard_file.write(
-        "<table style='border-collapse: collapse; border: 2px solid black; text-align: center;'>\n")
-    write_table_header(dashboard_file, ["Misión", "Tipo de Dispositivo", "Cantidad de Desconexiones"])
-    for mission, disconnected_devices in disconnection_management_data.items():
-        for device in disconnected_devices:
-            write_table_row(dashboard_file, [mission, device['device_type'], str(device['unknown_count'])])
-    dashboard_file.write("</table>\n")
-
-
-def write_consolidation(dashboard_file, consolidation_data):
-    """
-    Escribe la sección de consolidación de misiones del panel de control.
-    """
-    dashboard_file.write("\n## Consolidación de Misiones\n")
-    dashboard_file.write(
-        "<table style='border-collapse: collapse; border: 2px solid black; text-align: center;'>\n")
-    write_table_header(dashboard_file, ["Tipo de Dispositivo", "Cantidad de Dispositivos"])
-    for device_type, count in consolidation_data.items():
-        write_table_row(dashboard_file, [device_type, str(count)])
-    dashboard_file.write("</table>\n")
-
-
-def write_percentages(dashboard_file, percentage_calculation_data):
-    """
-    Escribe la sección de porcentajes del panel de control.
-    """
-    dashboard_file.write("\n## Porcentajes\n")
-    dashboard_file.write(
-        "<table style='border-collapse: collapse; border: 2px solid black; text-align: center;'>\n")
-    write_table_header(dashboard_file, ["Misión", "Tipo de Dispositivo", "Estado", "Porcentaje"])
-    for mission, devices in percentage_calculation_data.items():
-        for device_type, percentage_data in devices.items():
-            for state, percentage in percentage_data.items():
-                write_table_row(dashboard_file, [mission, device_type, state, f"{percentage:.2f}%"])
-    dashboard_file.write("</table>\n")
-
-
-def generate_html_table(headers, rows):
-    """
-    Genera una tabla HTML a partir de los encabezados y filas proporcionados.
-    """
-    html = "<table style='border-collapse: collapse; border: 2px solid black; text-align: center;'>\n"
-    html += "<tr>" + "".join(
-        [f"<th style='border: 2px solid black;'>{header}</th>" for header in headers]) + "</tr>\n"
-    html += "".join([f"<tr>" + "".join(
-        [f"<td style='border: 2px solid black;'>{row[i]}</td>" for i in range(len(row))]) + "</tr>\n" for
-                     row in rows])
-    html += "</table>\n"
-    return html
-
-
-def generate_events_section(data):
-    """
-    Genera la sección de análisis de eventos del panel de control.
-    """
-    headers = ["Misión", "Tipo de Dispositivo", "Estado", "Cantidad"]
-    rows = [[mission, device_type, state, count] for mission, devices in data.items() for
-            device_type, state_counts in devices.items() for state, count in state_counts.items()]
-    return generate_html_table(headers, rows)
-
-
-def generate_disconnection_section(data):
-    """
-    Genera la sección de gestión de desconexiones del panel de control.
-    """
-    headers = ["Misión", "Tipo de Dispositivo", "Cantidad de Desconexiones"]
-    rows = [[mission, device_type, count] for mission, devices in data.items() for device in devices for
-            device_type, count in device.items()]
-    return generate_html_table(headers, rows)
-
-
-def generate_consolidation_section(data):
-    """
-    Genera la sección de consolidación de misiones del panel de control.
-    """
-    headers = ["Tipo de Dispositivo", "Cantidad de Dispositivos"]
-    rows = [[device_type, count] for device_type, count in data.items()]
-    return generate_html_table(headers, rows)
-
-
-def generate_percentages_section(data):
-    """
-    Genera la sección de porcentajes del panel de control.
-    """
-    headers = ["Misión", "Tipo de Dispositivo", "Estado", "Porcentaje"]
-    rows = [[mission, device_type, state, percentage] for mission, devices in data.items() for
-            device_type, percentages in devices.items() for state, percentage in percentages.items()]
-    return generate_html_table(headers, rows)
+from modules.AnalysisEngine import AnalysisEngine, derive_consolidation, derive_disconnections, derive_percentages
+from modules.DashboardRenderer import DashboardRenderer
+from modules.DeltaReports import DeltaReportWriter
+from modules.DurableWriter import DurableWriter
+from modules.EventCounts import merge_counts
+from modules.Metrics import DISABLED_METRICS
 
 
 class ReportGenerator:
@@ -145,174 +19,260 @@ class ReportGenerator:
     Se encarga de analizar los eventos, gestionar las desconexiones, consolidar las misiones y calcular los porcentajes.
     """
 
-    def __init__(self, devices_path, backup_path, reports_path):
+    def __init__(self, devices_path, backup_path, reports_path, aggregator=None, workers=1, metrics=None,
+                 watcher=None, rollups=None, disconnection_threshold=1, archive=None, dashboard=None, verifier=None,
+                 writer=None, sketches=None, report_mode='full', keyframe_interval=10, columnar=False):
         """
         Inicializa el generador de informes con las rutas a los directorios de dispositivos, copias de seguridad y
         reportes. Crea los directorios de dispositivos, copias de seguridad y reportes si no existen.
+        Si se proporciona un agregador incremental, cada ciclo se acumula en él y se genera el informe acumulado.
+        Con workers > 1, los lotes grandes de archivos de log se leen en paralelo. Con columnar, los eventos se
+        cuentan en un lote columnar (EventBatch) y las secciones por defecto se calculan de forma vectorizada.
+        Si se proporciona un registro de métricas, se mide la duración de cada paso del informe.
+        Con un observador de ingesta (IngestionWatcher), los archivos se cuentan a medida que llegan y cada ciclo
+        recoge su recuento parcial en lugar de recorrer el directorio de dispositivos.
+        Con un almacén de agregados temporales (RollupStore), cada ciclo se suma a sus agregados por minuto, hora y
+        día.
+        disconnection_threshold es la cantidad de estados "unknown" por encima de la cual la sección de gestión de
+        desconexiones marca un dispositivo.
+        Con un archivo de informes (ReportArchive), el recuento de cada informe se guarda también en él.
+        dashboard es el generador del tablero de control (DashboardRenderer); por defecto, un tablero Markdown que
+        rota cada 100 ciclos o 1 MiB.
+        Con un verificador de integridad (HashVerifier), se comprueba el hash de cada evento al contarlo y los
+        archivos inválidos se mueven a cuarentena en lugar de contarse. Con observador de ingesta, la verificación
+        la hace el propio observador al ingerir (IngestionWatcher(verifier=...)), y aquí solo se verifican los
+        archivos que no pudo ingerir.
+        writer es la capa de escritura de los informes y del tablero (DurableWriter); por defecto, escritura atómica
+        sin sincronizar. Con durabilidad 'group', los archivos de cada ciclo se confirman juntos al publicarlo.
+        Con un seguimiento por dispositivo (DeviceSketches), los eventos con device_id alimentan sus sketches en la
+        misma pasada que los cuenta y el informe incluye los dispositivos con más fallos y los dispositivos
+        distintos por misión. Con observador de ingesta, el seguimiento se indica también al observador
+        (IngestionWatcher(observe=sketches.observe)).
+        Con report_mode='delta', cada keyframe_interval ciclos se guarda un informe completo y los ciclos intermedios
+        se guardan como deltas respecto al anterior (ver modules/DeltaReports.py); el informe acumulado sigue
+        siendo completo.
         """
         self.devices_path = devices_path
         self.backup_path = backup_path
         self.reports_path = reports_path
+        self.aggregator = aggregator
+        self.metrics = metrics if metrics is not None else DISABLED_METRICS
+        self.watcher = watcher
+        self.rollups = rollups
+        self.archive = archive
+        if watcher is not None and verifier is None:
+            verifier = watcher.verifier
+        elif watcher is not None and watcher.verifier is not verifier:
+            raise ValueError("Con observador de ingesta, el verificador debe indicarse también al observador")
+        if watcher is not None and sketches is not None and watcher.observe != sketches.observe:
+            raise ValueError("Con observador de ingesta, el seguimiento por dispositivo debe indicarse también al "
+                             "observador")
+        self.verifier = verifier
+        self.writer = writer if writer is not None else DurableWriter()
+        self.sketches = sketches
+        if report_mode not in ('full', 'delta'):
+            raise ValueError(f"Modo de informe desconocido: {report_mode}")
+        self.report_mode = report_mode
+        self.listeners = []
 
         for path in [self.devices_path, self.backup_path, self.reports_path]:
             if not os.path.exists(path):
                 os.makedirs(path)
+        self.writer.clean(self.reports_path)
+
+        self.observe = sketches.observe if sketches is not None else None
+        self.analysis_engine = AnalysisEngine(self.devices_path, workers, columnar=columnar, observe=self.observe)
+        self.dashboard = dashboard if dashboard is not None else DashboardRenderer(self.reports_path,
+                                                                                  writer=self.writer)
+        self.disconnection_threshold = disconnection_threshold
+        if disconnection_threshold != 1:
+            self.analysis_engine.register_section('disconnection_management', functools.partial(
+                derive_disconnections, disconnection_threshold=disconnection_threshold))
+
+        self.delta_writer = None
+        if report_mode == 'delta':
+            self.delta_writer = DeltaReportWriter(self.reports_path, [name for name in self.analysis_engine.sections
+                                                                      if name != 'events_analysis'],
+                                                  keyframe_interval, self.writer)
+
+    def add_listener(self, callback):
+        """
+        Registra una función que se llama con el ciclo y los datos del análisis cada vez que se publica un informe.
+        """
+        self.listeners.append(callback)
 
     @property
     def dashboard_filepath(self):
         """
-        Devuelve la ruta al archivo del panel de control.
+        Devuelve la ruta al archivo activo del panel de control.
         """
-        return os.path.join(self.reports_path, 'Dashboard.md')  # Tablero de Control de visualizacióón de datos
+        return self.dashboard.active_path()  # Tablero de Control de visualizacióón de datos
 
-    def generate_reports(self, cycle_id):
+    def generate_reports(self, cycle_id, sources=None, move_files=True):
         """
         Genera los informes para un ciclo de simulación.
+        Si se indican las rutas de los archivos del ciclo, solo se analizan esas; si no, todo el directorio de
+        dispositivos. Con move_files=False los archivos procesados no se mueven a backups (lo hace otra etapa).
+        Devuelve los datos del análisis.
         """
-        # Genera el nombre del archivo de informe estándar
-        report_filename = f'APLSTATS-REPORTE-{datetime.datetime.now().strftime("%d%m%y%H%M%S")}.log'
-
         # Analiza los eventos, gestiona las desconexiones, consolida las misiones y calcula los porcentajes
-        analysis_data = self.analyze_and_manage()
+        with self.metrics.timer('report_analysis_seconds'):
+            analysis_data = self.analyze_and_manage(sources)
+        self.metrics.increment('report_files_analyzed_total', len(self.analysis_engine.last_sources))
 
-        # Guarda el informe
-        self.save_report(report_filename, analysis_data)
+        # Añade las secciones de los sketches por dispositivo, ya alimentados al contar los eventos del ciclo
+        if self.sketches is not None:
+            with self.metrics.timer('report_sketches_seconds'):
+                analysis_data.update(self.sketches.sections())
+
+        self.publish_reports(cycle_id, analysis_data, move_files=move_files)
+        return analysis_data
+
+    def publish_reports(self, cycle_id, analysis_data, sources=None, move_files=False):
+        """
+        Publica el análisis de un ciclo: guarda el informe, lo acumula, lo archiva y lo añade al tablero de control.
+        sources son los archivos que se descuentan si ya se habían acumulado antes de una caída; por defecto, los
+        del último análisis.
+        """
+        # Guarda el informe con el nombre de archivo estándar, o como keyframe o delta en el modo por deltas
+        with self.metrics.timer('report_write_seconds'):
+            if self.delta_writer is not None:
+                report_filename = self.delta_writer.save(cycle_id, analysis_data)
+            else:
+                report_filename = f'APLSTATS-REPORTE-{datetime.datetime.now().strftime("%d%m%y%H%M%S")}.log'
+                self.save_report(report_filename, analysis_data)
+
+        # Acumula el ciclo antes de mover sus archivos, para poder detectarlos si se repiten tras una caída
+        if self.aggregator is not None:
+            with self.metrics.timer('report_cumulative_seconds'):
+                self.update_cumulative_report(analysis_data['events_analysis'], cycle_id, sources)
+
+        # Suma el ciclo a los agregados por minuto, hora y día
+        if self.rollups is not None:
+            with self.metrics.timer('report_rollup_seconds'):
+                self.rollups.add(analysis_data['events_analysis'], cycle_id)
+
+        # Añade el informe al archivo de informes
+        if self.archive is not None:
+            with self.metrics.timer('report_archive_seconds'):
+                self.archive.add(analysis_data['events_analysis'], cycle_id, report_filename)
 
         # Mueve los archivos procesados a la copia de seguridad (backup)
-        self.move_processed_files_to_backup()
+        if move_files:
+            with self.metrics.timer('report_backup_seconds'):
+                self.move_processed_files_to_backup()
 
         # # Genera el panel de control (dashboard)
-        self.generate_dashboard(analysis_data, cycle_id)
+        with self.metrics.timer('dashboard_append_seconds'):
+            self.generate_dashboard(analysis_data, cycle_id)
+        # Confirma en grupo los archivos del ciclo (informe, acumulado y tablero)
+        with self.metrics.timer('report_commit_seconds'):
+            self.writer.commit()
+        self.metrics.increment('reports_generated_total')
 
-    def analyze_and_manage(self):
+        for callback in self.listeners:
+            callback(cycle_id, analysis_data)
+
+    def analyze_and_manage(self, sources=None):
         """
         Analiza los eventos, gestiona las desconexiones, consolida las misiones y calcula los porcentajes.
+        Los archivos de log se leen una sola vez y todas las secciones se derivan del mismo recuento.
+        Con un observador de ingesta, el recuento de los archivos ya ingeridos (y verificados) se toma de él.
+        Con un verificador de integridad, los archivos que hay que leer los cuenta el propio verificador y solo
+        los válidos quedan como archivos del último análisis.
+        """
+        if self.watcher is None:
+            if self.verifier is None:
+                return self.analysis_engine.analyze(sources)
+            if sources is None:
+                sources = self.analysis_engine.list_sources()
+            events_analysis_data, rejected = self.verify_and_count(sources)
+        elif sources is None:
+            events_analysis_data, sources = self.watcher.drain()
+            rejected = []
+        else:
+            events_analysis_data, missing, rejected = self.watcher.take(sources)
+            if missing and self.verifier is not None:
+                missing_counts, missing_rejected = self.verify_and_count(missing)
+                merge_counts(events_analysis_data, missing_counts)
+                rejected.extend(missing_rejected)
+            elif missing:
+                merge_counts(events_analysis_data, self.analysis_engine.count_sources(missing))
+
+        rejected = set(rejected)
+        self.analysis_engine.last_sources = [source for source in sources if source not in rejected]
+        return self.analysis_engine.derive(events_analysis_data)
+
+    def verify_and_count(self, sources):
         """
-        analysis_data = {
-            'events_analysis': self.analyze_events(),
-            'disconnection_management': self.manage_disconnections(),
-            'consolidation': self.consolidate_missions(),
-            'percentage_calculation': self.calculate_percentages()}
+        Verifica el hash de los eventos de los archivos indicados al contarlos y mueve los inválidos a cuarentena.
+        Devuelve el recuento de los válidos y la lista de los rechazados.
+        """
+        with self.metrics.timer('report_verify_seconds'):
+            events_analysis_data, _, rejected = self.verifier.verify(sources, self.observe)
+        self.verifier.quarantine(rejected)
+        return events_analysis_data, rejected
 
-        return analysis_data
+    def update_cumulative_report(self, events_analysis_data, cycle_id, sources=None):
+        """
+        Acumula el recuento del ciclo en el agregador incremental, guarda su punto de control y reescribe el
+        informe acumulado a partir de los contadores en memoria.
+        """
+        if sources is None:
+            sources = self.analysis_engine.last_sources
+        self.aggregator.fold(events_analysis_data, sources, cycle_id, self.analysis_engine.count_sources)
+        self.aggregator.checkpoint()
+        self.save_report('APLSTATS-ACUMULADO.log', self.analysis_engine.derive(self.aggregator.totals))
 
     def analyze_events(self):
         """
         Analiza los eventos de los archivos de log.
         """
-        events_analysis_data = {}
+        return self.analysis_engine.scan()
 
-        # Obtiene todos los archivos de log generados
-        log_files = glob.glob(os.path.join(self.devices_path, '*.log'))
-
-        # Analiza cada archivo de log
-        for log_file in log_files:
-            with open(log_file, 'r') as file:
-                data = json.load(file)
-                mission = data['mission']
-                device_type = data['device_type']
-                device_status = data['device_status']
-
-                # Inicializa el recuento de eventos para la misión si no está presente
-                if mission not in events_analysis_data:
-                    events_analysis_data[mission] = {}
-
-                # Inicializa el recuento de eventos para el dispositivo si no está presente
-                if device_type not in events_analysis_data[mission]:
-                    events_analysis_data[mission][device_type] = {'excellent': 0, 'good': 0, 'warning': 0, 'faulty': 0,
-                                                                  'killed': 0, 'unknown': 0}
-
-                # Incrementa el recuento para el estado específico.
-                events_analysis_data[mission][device_type][device_status] += 1
-
-        return events_analysis_data
-
-    def manage_disconnections(self):
+    def manage_disconnections(self, events_analysis_data=None):
         """
         Gestiona las desconexiones de los dispositivos.
+        Si no se proporciona el recuento de eventos, se obtiene analizando los archivos de log.
         """
-        disconnection_management_data = {}
-
-        # Llama a la función analyze_events para obtener los datos de análisis de eventos
-        events_analysis_data = self.analyze_events()
-
-        # Identifica los dispositivos con un número mayor de estados "desconocido"
-        for mission, devices in events_analysis_data.items():
-            for device_type, state_counts in devices.items():
-                unknown_count = state_counts.get('unknown', 0)
-
-                # Define un umbral para considerar a un dispositivo desconectado
-                disconnection_threshold = 1
+        if events_analysis_data is None:
+            events_analysis_data = self.analyze_events()
 
-                if unknown_count > disconnection_threshold:
-                    # Registra el dispositivo como teniendo un número mayor de estados "desconocido"
-                    if mission not in disconnection_management_data:
-                        disconnection_management_data[mission] = []
+        return derive_disconnections(events_analysis_data, self.disconnection_threshold)
 
-                    disconnection_management_data[mission].append({
-                        'device_type': device_type,
-                        'unknown_count': unknown_count
-                    })
-
-        return disconnection_management_data
-
-    def consolidate_missions(self):
+    def consolidate_missions(self, events_analysis_data=None):
         """
         Consolida las misiones.
+        Si no se proporciona el recuento de eventos, se obtiene analizando los archivos de log.
         """
-        consolidation_data = {}
-
-        # Llama a la función analyze_events para obtener los datos de análisis de eventos
-        events_analysis_data = self.analyze_events()
-
-        # Cuenta el número de dispositivos no operativos en todas las misiones.
-        for mission, devices in events_analysis_data.items():
-            for device_type, state_counts in devices.items():
-                inoperable_count = state_counts.get('killed', 0) + state_counts.get('unknown', 0)
-
-                # Registra el recuento inoperativo para cada tipo de dispositivo en todas las misiones.
-                if device_type not in consolidation_data:
-                    consolidation_data[device_type] = 0
+        if events_analysis_data is None:
+            events_analysis_data = self.analyze_events()
 
-                consolidation_data[device_type] += inoperable_count
+        return derive_consolidation(events_analysis_data)
 
-        return consolidation_data
-
-    def calculate_percentages(self):
+    def calculate_percentages(self, events_analysis_data=None):
         """
         Calcula los porcentajes de los datos generados para cada dispositivo y misión.
+        Si no se proporciona el recuento de eventos, se obtiene analizando los archivos de log.
         """
-        percentage_calculation_data = {}
-
-        # Llama a la función analyze_events para obtener los datos de análisis de eventos
-        events_analysis_data = self.analyze_events()
-
-        # Calcula los porcentajes de los datos generados para cada dispositivo y misión
-        for mission, devices in events_analysis_data.items():
-            total_events = sum(sum(device_states.values()) for device_states in devices.values())
-            mission_percentage_data = {}
-            for device_type, state_counts in devices.items():
-                device_percentage_data = {state: (count / total_events) * 100 for state, count in state_counts.items()}
-                mission_percentage_data[device_type] = device_percentage_data
-
-            percentage_calculation_data[mission] = mission_percentage_data
+        if events_analysis_data is None:
+            events_analysis_data = self.analyze_events()
 
-        return percentage_calculation_data
+        return derive_percentages(events_analysis_data)
 
     def save_report(self, filename, report_data):
         """
         Guarda el informe generado en un archivo.
         """
         filepath = os.path.join(self.reports_path, filename)
-        with open(filepath, 'w') as file:
-            json.dump(report_data, file)
+        self.writer.write(filepath, json.dumps(report_data))
 
     def move_processed_files_to_backup(self):
         """
-        Mueve los archivos procesados a la copia de seguridad.
+        Mueve a la copia de seguridad los archivos analizados en el último informe. Los archivos que llegaron
+        después del análisis se quedan en el directorio de dispositivos para el siguiente ciclo.
         """
-        files_to_move = glob.glob(os.path.join(self.devices_path, '*.log'))
-        for file_path in files_to_move:
+        for file_path in self.analysis_engine.last_sources:
             filename = os.path.basename(file_path)
             dst_path = os.path.join(self.backup_path, filename)
             shutil.move(file_path, dst_path)
@@ -321,12 +281,4 @@ class ReportGenerator:
         """
         Genera el panel de control para el análisis de la simulación.
         """
-        dashboard_filename = 'Dashboard.md'
-        dashboard_filepath = os.path.join(self.reports_path, dashboard_filename)
-
-        with open(dashboard_filepath, 'a') as dashboard_file:
-            write_header(dashboard_file, cycle_id)
-            write_events_analysis(dashboard_file, analysis_data['events_analysis'])
-            write_disconnection_management(dashboard_file, analysis_data['disconnection_management'])
-            write_consolidation(dashboard_file, analysis_data['consolidation'])
-            write_percentages(dashboard_file, analysis_data['percentage_calculation'])
+        self.dashboard.render_cycle(analysis_data, cycle_id)
@@ -0,0 +1,209 @@
+# modules/RollupStore.py
+import datetime
+import os
+import sqlite3
+import threading
+
+from modules.EventCounts import count_event
+
+# Niveles de agregación de más grueso a más fino, con su tamaño en segundos. El nivel 'cycle' guarda cada ciclo.
+ROLLUP_LEVELS = (('day', 86400), ('hour', 3600), ('minute', 60))
+CYCLE_LEVEL = 'cycle'
+LEVEL_ORDER = (CYCLE_LEVEL,) + tuple(reversed([name for name, _ in ROLLUP_LEVELS]))
+
+# Antigüedad máxima de cada nivel; None significa que se conserva indefinidamente
+DEFAULT_RETENTION = {
+    'cycle': datetime.timedelta(hours=6),
+    'minute': datetime.timedelta(days=2),
+    'hour': datetime.timedelta(days=90),
+    'day': None
+}
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def floor_time(moment, seconds):
+    """
+    Redondea una fecha hacia abajo al múltiplo de seconds segundos.
+    """
+    return moment - datetime.timedelta(seconds=int((moment - EPOCH).total_seconds()) % seconds,
+                                       microseconds=moment.microsecond)
+
+
+def ceil_time(moment, seconds):
+    """
+    Redondea una fecha hacia arriba al múltiplo de seconds segundos.
+    """
+    floored = floor_time(moment, seconds)
+    return floored if floored == moment else floored + datetime.timedelta(seconds=seconds)
+
+
+def level_size(level):
+    """
+    Devuelve el tamaño en segundos de un nivel de agregación (None para el nivel de ciclo).
+    """
+    return dict(ROLLUP_LEVELS).get(level)
+
+
+def coarser_level(level):
+    """
+    Devuelve el nivel inmediatamente más grueso, o None si ya es el más grueso.
+    """
+    position = LEVEL_ORDER.index(level)
+    return LEVEL_ORDER[position + 1] if position + 1 < len(LEVEL_ORDER) else None
+
+
+def decompose_range(since, until, level_index=0):
+    """
+    Descompone el intervalo [since, until) en tramos alineados: los días completos se leen del nivel 'day', las
+    horas completas de los extremos del nivel 'hour', y así hasta el nivel de ciclo para los restos.
+    Devuelve una lista ordenada de tuplas (nivel, inicio, fin).
+    """
+    if since >= until:
+        return []
+    if level_index == len(ROLLUP_LEVELS):
+        return [(CYCLE_LEVEL, since, until)]
+
+    level, seconds = ROLLUP_LEVELS[level_index]
+    start, end = ceil_time(since, seconds), floor_time(until, seconds)
+    if start >= end:
+        return decompose_range(since, until, level_index + 1)
+
+    return (decompose_range(since, start, level_index + 1) + [(level, start, end)] +
+            decompose_range(end, until, level_index + 1))
+
+
+class RollupStore:
+    """
+    Esta clase representa el almacén de agregados temporales de la simulación de Apollo 11.
+    Cada ciclo se suma a la vez a su minuto, su hora y su día (submuestreo al escribir), de modo que una consulta
+    sobre un horizonte largo lee unas pocas filas del nivel más grueso que la responde en lugar de cargar todos
+    los archivos de reporte. Cada nivel tiene su propia retención y los más finos caducan antes.
+    """
+
+    def __init__(self, db_path, retention=None):
+        """
+        Inicializa el almacén con la ruta a la base de datos SQLite y la retención de cada nivel.
+        """
+        self.db_path = db_path
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS rollups (
+                    level TEXT,
+                    bucket TEXT,
+                    cycle_id INTEGER,
+                    mission TEXT,
+                    device_type TEXT,
+                    status TEXT,
+                    count INTEGER,
+                    PRIMARY KEY (level, bucket, cycle_id, mission, device_type, status)
+                );
+            """)
+
+    def add(self, events_analysis_data, cycle_id=None, moment=None):
+        """
+        Suma el recuento de un ciclo a su fila de ciclo y a los agregados de minuto, hora y día que lo contienen,
+        y elimina las filas que superaron la retención de su nivel.
+        """
+        if moment is None:
+            moment = datetime.datetime.now()
+        moment = moment.replace(microsecond=0)
+
+        buckets = [(CYCLE_LEVEL, moment, cycle_id or 0)]
+        buckets.extend((level, floor_time(moment, seconds), 0) for level, seconds in ROLLUP_LEVELS)
+
+        rows = [(level, bucket.strftime(DATE_FORMAT), bucket_cycle, mission, device_type, status, count)
+                for level, bucket, bucket_cycle in buckets
+                for mission, devices in events_analysis_data.items()
+                for device_type, state_counts in devices.items()
+                for status, count in state_counts.items() if count]
+
+        with self.lock, self.connection:
+            self.connection.executemany("""
+                INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (level, bucket, cycle_id, mission, device_type, status)
+                DO UPDATE SET count = count + excluded.count
+            """, rows)
+            self.apply_retention(moment)
+
+    def apply_retention(self, now):
+        """
+        Elimina las filas de cada nivel más antiguas que su retención. Se llama con el bloqueo tomado.
+        """
+        for level, retention in self.retention.items():
+            if retention is not None:
+                self.connection.execute("DELETE FROM rollups WHERE level = ? AND bucket < ?",
+                                        (level, (now - retention).strftime(DATE_FORMAT)))
+
+    def retained(self, level, start, now):
+        """
+        Indica si el nivel aún conserva los datos a partir de la fecha indicada.
+        """
+        retention = self.retention.get(level)
+        return retention is None or start >= now - retention
+
+    def plan(self, since, until, now=None):
+        """
+        Devuelve los tramos (nivel, inicio, fin) con los que se responde una consulta sobre [since, until).
+        Si el nivel de un tramo ya caducó, el tramo se redondea hacia fuera al siguiente nivel más grueso, por lo
+        que el resultado puede incluir algunos eventos de los bordes del intervalo.
+        """
+        now = now or datetime.datetime.now()
+        pieces = []
+        for level, start, end in decompose_range(since, until):
+            while not self.retained(level, start, now) and coarser_level(level) is not None:
+                level = coarser_level(level)
+                start, end = floor_time(start, level_size(level)), ceil_time(end, level_size(level))
+            if (level, start, end) not in pieces:
+                pieces.append((level, start, end))
+        return pieces
+
+    def query(self, since, until=None, mission=None, device_type=None, status=None):
+        """
+        Devuelve el recuento misión × tipo de dispositivo × estado de los eventos del intervalo [since, until),
+        leyendo los agregados más gruesos que lo cubren.
+        """
+        # Los agregados se guardan con precisión de segundos
+        since, until = floor_time(since, 1), ceil_time(until or datetime.datetime.now(), 1)
+        filters = {'mission': mission, 'device_type': device_type, 'status': status}
+        filter_clauses = "".join(f" AND {column} = ?" for column, value in filters.items() if value is not None)
+        filter_params = [value for value in filters.values() if value is not None]
+
+        events_analysis_data = {}
+        with self.lock:
+            for level, start, end in self.plan(since, until):
+                rows = self.connection.execute(
+                    "SELECT mission, device_type, status, SUM(count) FROM rollups "
+                    f"WHERE level = ? AND bucket >= ? AND bucket < ?{filter_clauses} "
+                    "GROUP BY mission, device_type, status",
+                    [level, start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)] + filter_params).fetchall()
+                for row_mission, row_device_type, row_status, count in rows:
+                    count_event(events_analysis_data, {'mission': row_mission, 'device_type': row_device_type,
+                                                       'device_status': row_status}, count)
+        return events_analysis_data
+
+    def series(self, level, since, until=None):
+        """
+        Devuelve la serie temporal de un nivel: una lista de (inicio del periodo, total de eventos, recuento de
+        inoperables killed + unknown) ordenada por fecha, para dibujar la evolución en el tablero.
+        """
+        until = until or datetime.datetime.now()
+        with self.lock:
+            return self.connection.execute(
+                "SELECT bucket, SUM(count), SUM(CASE WHEN status IN ('killed', 'unknown') THEN count ELSE 0 END) "
+                "FROM rollups WHERE level = ? AND bucket >= ? AND bucket < ? GROUP BY bucket ORDER BY bucket",
+                (level, since.strftime(DATE_FORMAT), until.strftime(DATE_FORMAT))).fetchall()
+
+    def close(self):
+        """
+        Cierra la conexión con la base de datos.
+        """
+        self.connection.close()
@@ -0,0 +1,172 @@
+# modules/Scheduler.py
+import logging
+import random
+import time
+
+
+class FixedRateScheduler:
+    """
+    Esta clase representa el planificador de ciclos de la simulación de Apollo 11.
+    Mantiene un periodo fijo real: cada ciclo empieza en un instante calculado a partir del inicio (inicio + n ×
+    intervalo) y no tras dormir un intervalo completo después del trabajo, por lo que el periodo no deriva.
+    Si un ciclo tarda más que el intervalo, se registra como desbordamiento y se saltan los instantes perdidos.
+    """
+
+    def __init__(self, interval, clock=time.monotonic):
+        """
+        Inicializa el planificador con el intervalo entre ciclos en segundos.
+        """
+        self.interval = interval
+        self.clock = clock
+        self.next_deadline = None
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.max_lateness = 0.0
+
+    def start(self):
+        """
+        Fija el instante del primer ciclo en el momento actual.
+        """
+        self.next_deadline = self.clock()
+
+    def wait(self, stop_event=None):
+        """
+        Espera hasta el instante del siguiente ciclo. Si se proporciona un evento de parada, la espera termina en
+        cuanto se activa. Devuelve el retraso del ciclo actual respecto a su instante previsto.
+        """
+        if self.next_deadline is None:
+            self.start()
+
+        self.next_deadline += self.interval
+        lateness = self.clock() - self.next_deadline
+
+        if lateness > 0:
+            missed = int(lateness // self.interval) if self.interval > 0 else 0
+            self.overruns += 1
+            self.skipped_ticks += missed
+            self.max_lateness = max(self.max_lateness, lateness)
+            self.next_deadline += missed * self.interval
+            logging.warning(f"El ciclo superó el intervalo de {self.interval}s en {lateness:.3f}s "
+                            f"({missed} ciclos omitidos)")
+            return lateness
+
+        if stop_event is not None:
+            stop_event.wait(-lateness)
+        else:
+            time.sleep(-lateness)
+        return lateness
+
+    def stats(self):
+        """
+        Devuelve las estadísticas de desbordamiento del planificador.
+        """
+        return {'interval': self.interval, 'overruns': self.overruns, 'skipped_ticks': self.skipped_ticks,
+                'max_lateness': self.max_lateness}
+
+
+class LoadProfile:
+    """
+    Esta clase representa un perfil de carga de la simulación: la cantidad de eventos de cada ciclo.
+    Con jitter se añade una variación aleatoria proporcional, reproducible a partir de la semilla.
+    """
+
+    def __init__(self, jitter=0.0, seed=None):
+        """
+        Inicializa el perfil con la variación relativa y la semilla del generador aleatorio.
+        """
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+
+    def base_events(self, cycle_id):
+        """
+        Devuelve la cantidad de eventos del ciclo antes de aplicar la variación.
+        """
+        raise NotImplementedError
+
+    def events_for_cycle(self, cycle_id):
+        """
+        Devuelve la cantidad de eventos que se deben generar en el ciclo indicado (al menos uno).
+        """
+        events = self.base_events(cycle_id)
+        if self.jitter:
+            events *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        return max(1, int(round(events)))
+
+
+class ConstantProfile(LoadProfile):
+    """
+    Perfil de carga constante: la misma cantidad de eventos en todos los ciclos.
+    """
+
+    def __init__(self, events, jitter=0.0, seed=None):
+        """
+        Inicializa el perfil con la cantidad fija de eventos por ciclo.
+        """
+        super().__init__(jitter, seed)
+        self.events = events
+
+    def base_events(self, cycle_id):
+        """
+        Devuelve siempre la misma cantidad de eventos.
+        """
+        return self.events
+
+
+class RampProfile(LoadProfile):
+    """
+    Perfil de carga en rampa: crece linealmente de start a end a lo largo de cycles ciclos y luego se mantiene.
+    """
+
+    def __init__(self, start, end, cycles, jitter=0.0, seed=None):
+        """
+        Inicializa el perfil con la cantidad inicial y final de eventos y la duración de la rampa en ciclos.
+        """
+        super().__init__(jitter, seed)
+        self.start = start
+        self.end = end
+        self.cycles = cycles
+
+    def base_events(self, cycle_id):
+        """
+        Interpola linealmente la cantidad de eventos según el ciclo.
+        """
+        progress = min(1.0, (cycle_id - 1) / max(1, self.cycles - 1))
+        return self.start + (self.end - self.start) * progress
+
+
+class BurstProfile(LoadProfile):
+    """
+    Perfil de carga a ráfagas: base eventos por ciclo, salvo length ciclos de cada every, que generan burst eventos.
+    """
+
+    def __init__(self, base, burst, every, length=1, jitter=0.0, seed=None):
+        """
+        Inicializa el perfil con la carga base, la carga de ráfaga, su periodicidad y su duración en ciclos.
+        """
+        super().__init__(jitter, seed)
+        self.base = base
+        self.burst = burst
+        self.every = every
+        self.length = length
+
+    def base_events(self, cycle_id):
+        """
+        Devuelve la carga de ráfaga en los ciclos de ráfaga y la carga base en el resto.
+        """
+        return self.burst if (cycle_id - 1) % self.every < self.length else self.base
+
+
+LOAD_PROFILES = {
+    'constant': ConstantProfile,
+    'ramp': RampProfile,
+    'burst': BurstProfile
+}
+
+
+def make_load_profile(name, **options):
+    """
+    Crea un perfil de carga por su nombre ('constant', 'ramp' o 'burst') con las opciones indicadas.
+    """
+    if name not in LOAD_PROFILES:
+        raise ValueError(f"Perfil de carga desconocido: {name}")
+    return LOAD_PROFILES[name](**options)
@@ -0,0 +1,147 @@
+# modules/SegmentLog.py
+import json
+import os
+
+from modules.EventCounts import count_event
+
+SEGMENT_PREFIX = 'APLSEG-'
+SEGMENT_PART_SUFFIX = '.part'
+FOOTER_KEY = 'segment_footer'
+
+
+def is_segment(path):
+    """
+    Indica si una ruta corresponde a un segmento de eventos (en lugar de un archivo de log por evento).
+    """
+    return os.path.basename(path).startswith(SEGMENT_PREFIX)
+
+
+def segment_filename(cycle_id, sequence):
+    """
+    Devuelve el nombre de un segmento siguiendo el estándar de los archivos de log: APLSEG-<ciclo><secuencia>.log
+    """
+    return f'{SEGMENT_PREFIX}{cycle_id:04d}{sequence:03d}.log'
+
+
+def read_footer(path):
+    """
+    Lee el pie de un segmento, que es su última línea. Devuelve None si el segmento no está sellado.
+    Solo se lee el final del archivo, no los eventos.
+    """
+    with open(path, 'rb') as file:
+        size = file.seek(0, os.SEEK_END)
+        window = 4096
+        while True:
+            start = max(0, size - window)
+            file.seek(start)
+            tail = file.read(size - start)
+            body = tail.rstrip(b'\n')
+            newline = body.rfind(b'\n')
+            if newline >= 0 or start == 0:
+                break
+            window *= 2
+
+    try:
+        footer = json.loads(body[newline + 1:])
+    except ValueError:
+        return None
+
+    return footer.get(FOOTER_KEY) if isinstance(footer, dict) else None
+
+
+def iter_segment_events(path):
+    """
+    Recorre los eventos de un segmento, uno por línea, omitiendo el pie y las líneas incompletas.
+    """
+    with open(path, 'r') as file:
+        for line in file:
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue
+            if FOOTER_KEY not in data:
+                yield data
+
+
+def count_segment(path):
+    """
+    Devuelve el recuento misión × tipo de dispositivo × estado de un segmento.
+    Si el segmento está sellado se usa el índice del pie; si no, se cuentan sus líneas.
+    """
+    footer = read_footer(path)
+    if footer is not None:
+        return footer['counts']
+
+    events_analysis_data = {}
+    for data in iter_segment_events(path):
+        count_event(events_analysis_data, data)
+    return events_analysis_data
+
+
+class SegmentWriter:
+    """
+    Esta clase representa el escritor de segmentos de eventos de la simulación de Apollo 11.
+    Escribe los eventos de un ciclo como líneas JSON en un único archivo de solo anexado, que se rota al
+    superar un tamaño máximo. Al cerrarse, cada segmento se sella con un pie que indexa el recuento de sus
+    eventos y se renombra a su nombre definitivo, de modo que los lectores nunca ven segmentos a medio escribir.
+    """
+
+    def __init__(self, storage_path, cycle_id, max_bytes=4 * 1024 * 1024):
+        """
+        Inicializa el escritor con el directorio de almacenamiento, el ciclo de simulación y el tamaño máximo
+        de cada segmento en bytes.
+        """
+        self.storage_path = storage_path
+        self.cycle_id = cycle_id
+        self.max_bytes = max_bytes
+        self.sequence = 0
+        self.filenames = []
+        self.file = None
+
+    def open_segment(self):
+        """
+        Abre un nuevo segmento temporal para el ciclo.
+        """
+        self.filename = segment_filename(self.cycle_id, self.sequence)
+        self.part_path = os.path.join(self.storage_path, self.filename + SEGMENT_PART_SUFFIX)
+        self.file = open(self.part_path, 'w')
+        self.events = 0
+        self.bytes = 0
+        self.counts = {}
+
+    def append(self, data):
+        """
+        Añade un evento al segmento actual y lo rota si supera el tamaño máximo.
+        """
+        if self.file is None:
+            self.open_segment()
+
+        line = json.dumps(data) + '\n'
+        self.file.write(line)
+        self.events += 1
+        self.bytes += len(line)
+        count_event(self.counts, data)
+
+        if self.bytes >= self.max_bytes:
+            self.seal()
+
+    def seal(self):
+        """
+        Escribe el pie del segmento actual, lo cierra y lo publica con su nombre definitivo.
+        """
+        footer = {'cycle': self.cycle_id, 'events': self.events, 'bytes': self.bytes, 'counts': self.counts}
+        self.file.write(json.dumps({FOOTER_KEY: footer}) + '\n')
+        self.file.close()
+        self.file = None
+
+        os.replace(self.part_path, os.path.join(self.storage_path, self.filename))
+        self.filenames.append(self.filename)
+        self.sequence += 1
+
+    def close(self):
+        """
+        Sella el segmento abierto, si lo hay, y devuelve los nombres de los segmentos escritos.
+        """
+        if self.file is not None:
+            self.seal()
+        return self.filenames
@@ -0,0 +1,200 @@
+# modules/ShardedSimulation.py
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import threading
+import time
+
+from modules.AnalysisEngine import AnalysisEngine
+from modules.DataGenerator import DataGenerator
+from modules.EventCounts import merge_counts
+from modules.FileManager import FileManager
+from modules.Metrics import DISABLED_METRICS
+from modules.Scheduler import FixedRateScheduler
+
+MISSION_CODES = ["ORBONE", "CLNM", "TMRS", "GALXONE", "UNKN"]
+
+
+def partition_missions(mission_codes, shards):
+    """
+    Reparte los códigos de misión entre los fragmentos de forma circular.
+    Nunca devuelve fragmentos vacíos: si hay más fragmentos que misiones, se usan tantos como misiones.
+    """
+    shards = max(1, min(shards, len(mission_codes)))
+    return [mission_codes[shard_id::shards] for shard_id in range(shards)]
+
+
+def shard_path(base_path, shard_id):
+    """
+    Devuelve el directorio propio de un fragmento, con sus subdirectorios devices y backups.
+    """
+    return os.path.join(base_path, 'shards', f'shard-{shard_id}')
+
+
+def run_shard(shard_id, mission_codes, base_path, interval, start_time, stop_event, results, options):
+    """
+    Bucle de un proceso fragmento: genera los eventos de sus misiones en su propio directorio de dispositivos,
+    cuenta los archivos del ciclo, envía el recuento al coordinador y respalda los archivos en su propio backups.
+    Los ciclos se alinean con el resto de fragmentos a partir del mismo instante de inicio.
+    """
+    path = shard_path(base_path, shard_id)
+    seed = options.get('seed')
+    data_generator = DataGenerator(os.path.join(path, 'devices'), segment_mode=options.get('segment_mode', False),
+                                   events_per_cycle=options.get('events_per_cycle'),
+                                   rng=random.Random(seed + shard_id) if seed is not None else None)
+    data_generator.mission_codes = mission_codes
+    file_manager = FileManager(path, options.get('archive_mode', 'move'))
+    analysis_engine = AnalysisEngine(data_generator.storage_path)
+    load_profile = options.get('load_profile')
+    max_cycles = options.get('max_cycles')
+
+    scheduler = FixedRateScheduler(interval)
+    scheduler.next_deadline = start_time
+    cycle_id = 0
+    try:
+        while not stop_event.is_set() and (max_cycles is None or cycle_id < max_cycles):
+            cycle_id += 1
+            num_events = load_profile.events_for_cycle(cycle_id) if load_profile is not None else None
+            try:
+                filenames = data_generator.generate_data_log(mission_codes[0], cycle_id, num_events)
+                sources = [os.path.join(data_generator.storage_path, filename) for filename in filenames]
+                events_analysis_data = analysis_engine.count_sources(sources)
+            except Exception as e:
+                logging.error(f"El fragmento {shard_id} no pudo procesar el ciclo {cycle_id}: {e}")
+                events_analysis_data, filenames = {}, []
+
+            results.put(('cycle', shard_id, cycle_id, events_analysis_data))
+            file_manager.archive_cycle(cycle_id, filenames)
+
+            if max_cycles is None or cycle_id < max_cycles:
+                scheduler.wait(stop_event)
+    finally:
+        results.put(('done', shard_id, cycle_id, scheduler.stats()))
+
+
+class ShardedSimulation:
+    """
+    Esta clase representa la simulación de Apollo 11 fragmentada por código de misión.
+    Cada proceso fragmento es dueño de un subconjunto de misiones y escribe en su propio árbol
+    shards/shard-N/{devices,backups}, de modo que la generación, el recuento y el respaldo escalan con los núcleos.
+    El coordinador solo recibe los recuentos de cada ciclo (unas pocas decenas de contadores por fragmento), los
+    combina y publica el informe global y el tablero de control con el generador de reportes.
+    """
+
+    def __init__(self, base_path, report_generator, shards=None, mission_codes=None, events_per_cycle=None,
+                 load_profile=None, segment_mode=False, archive_mode='move', seed=None, max_cycles=None,
+                 metrics=None):
+        """
+        Inicializa la simulación fragmentada con el directorio base, el generador de reportes global y la cantidad
+        de procesos fragmento (por defecto, uno por núcleo y como mucho uno por misión).
+        events_per_cycle y load_profile fijan la cantidad de eventos de cada fragmento por ciclo; seed hace
+        reproducible cada fragmento y max_cycles limita la cantidad de ciclos.
+        """
+        self.base_path = base_path
+        self.report_generator = report_generator
+        self.mission_codes = mission_codes if mission_codes is not None else MISSION_CODES
+        self.partitions = partition_missions(self.mission_codes, shards or os.cpu_count() or 1)
+        self.options = {
+            'events_per_cycle': events_per_cycle,
+            'load_profile': load_profile,
+            'segment_mode': segment_mode,
+            'archive_mode': archive_mode,
+            'seed': seed,
+            'max_cycles': max_cycles
+        }
+        self.metrics = metrics if metrics is not None else DISABLED_METRICS
+        self.stop_event = multiprocessing.Event()
+        self.processes = []
+        self.shard_stats = {}
+        self.published_cycles = 0
+
+    def start_simulation(self, interval=20):
+        """
+        Inicia un proceso por fragmento y coordina los ciclos hasta que todos terminan.
+        Los ciclos se publican en orden en cuanto todos los fragmentos han enviado su recuento.
+        """
+        results = multiprocessing.Queue()
+        start_time = time.monotonic()
+        self.processes = []
+        for shard_id, mission_codes in enumerate(self.partitions):
+            process = multiprocessing.Process(target=run_shard, name=f'apolo11-shard-{shard_id}', args=(
+                shard_id, mission_codes, self.base_path, interval, start_time, self.stop_event, results,
+                self.options))
+            process.start()
+            self.processes.append(process)
+
+        self.coordinate(results)
+
+        for process in self.processes:
+            process.join()
+
+    def coordinate(self, results):
+        """
+        Combina los recuentos de los fragmentos por ciclo y publica cada ciclo completo.
+        Si un fragmento termina de forma inesperada, se deja de esperarlo y sus ciclos se publican incompletos.
+        """
+        pending = {}
+        next_cycle = 1
+        active = set(range(len(self.processes)))
+        while active:
+            try:
+                message = results.get(timeout=1)
+            except queue.Empty:
+                for shard_id in list(active):
+                    if not self.processes[shard_id].is_alive():
+                        logging.error(f"El fragmento {shard_id} terminó sin avisar (código "
+                                      f"{self.processes[shard_id].exitcode})")
+                        active.discard(shard_id)
+                next_cycle = self.publish_ready(pending, next_cycle, active)
+                continue
+
+            kind, shard_id = message[0], message[1]
+            if kind == 'done':
+                active.discard(shard_id)
+                self.shard_stats[shard_id] = message[3]
+            else:
+                cycle_id, events_analysis_data = message[2], message[3]
+                events, reported = pending.setdefault(cycle_id, ({}, set()))
+                merge_counts(events, events_analysis_data)
+                reported.add(shard_id)
+            next_cycle = self.publish_ready(pending, next_cycle, active)
+
+        for cycle_id in sorted(pending):
+            logging.warning(f"El ciclo {cycle_id} se publica solo con {len(pending[cycle_id][1])} fragmentos")
+            self.publish_cycle(cycle_id, pending[cycle_id][0])
+
+    def publish_ready(self, pending, next_cycle, active):
+        """
+        Publica en orden los ciclos que ya recibieron el recuento de todos los fragmentos activos.
+        Devuelve el siguiente ciclo pendiente de publicar.
+        """
+        while next_cycle in pending and active <= pending[next_cycle][1]:
+            self.publish_cycle(next_cycle, pending.pop(next_cycle)[0])
+            next_cycle += 1
+        self.metrics.set_gauge('sharded_pending_cycles', len(pending))
+        return next_cycle
+
+    def publish_cycle(self, cycle_id, events_analysis_data):
+        """
+        Deriva las secciones del informe global de un ciclo y lo publica con el generador de reportes.
+        """
+        with self.metrics.timer('sharded_publish_seconds'):
+            analysis_data = self.report_generator.analysis_engine.derive(events_analysis_data)
+            self.report_generator.publish_reports(cycle_id, analysis_data, sources=[])
+        self.published_cycles += 1
+        self.metrics.increment('cycles_total')
+
+    def stop_simulation(self):
+        """
+        Detiene la simulación: cada fragmento termina su ciclo actual y el coordinador publica lo recibido.
+        """
+        self.stop_event.set()
+
+    def run(self):
+        """
+        Inicia la simulación fragmentada en un hilo separado.
+        """
+        simulation_thread = threading.Thread(target=self.start_simulation)
+        simulation_thread.start()
@@ -0,0 +1,139 @@
+# modules/SimulationPipeline.py
+import logging
+import os
+import queue
+import threading
+from random import choice
+
+from modules.Metrics import DISABLED_METRICS
+from modules.Scheduler import FixedRateScheduler
+
+# Marca que recorre el pipeline para indicar a cada etapa que no llegarán más ciclos
+END_OF_STREAM = None
+
+
+class SimulationPipeline:
+    """
+    Esta clase representa el pipeline por etapas de la simulación de Apollo 11.
+    Las etapas de generación, análisis y respaldo corren en hilos separados unidos por colas acotadas, de modo
+    que el ciclo N+1 se genera mientras el ciclo N se analiza y se respalda. Si una etapa se retrasa, la cola que
+    la alimenta se llena y la etapa anterior se bloquea (contrapresión). Al detenerse, los ciclos ya generados
+    terminan de analizarse y respaldarse antes de que el pipeline finalice.
+    """
+
+    def __init__(self, data_generator, file_manager, report_generator, queue_size=2, plan_cycle=None, metrics=None,
+                 max_cycles=None):
+        """
+        Inicializa el pipeline con el generador de datos, el administrador de archivos, el generador de reportes
+        y el tamaño máximo de las colas entre etapas. plan_cycle recibe el número de ciclo y devuelve la misión y
+        la cantidad de eventos a generar; por defecto, una misión aleatoria con la cantidad del generador.
+        metrics registra la duración de cada etapa y la ocupación de las colas. max_cycles limita la cantidad de
+        ciclos generados.
+        """
+        self.data_generator = data_generator
+        self.file_manager = file_manager
+        self.report_generator = report_generator
+        self.plan_cycle = plan_cycle or (lambda cycle_id: (choice(self.data_generator.mission_codes), None))
+        self.scheduler = None
+        self.metrics = metrics if metrics is not None else DISABLED_METRICS
+        self.max_cycles = max_cycles
+        self.analysis_queue = queue.Queue(maxsize=queue_size)
+        self.backup_queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self, interval=20):
+        """
+        Inicia las tres etapas del pipeline. La generación produce un ciclo cada interval segundos.
+        """
+        self.scheduler = FixedRateScheduler(interval)
+        self.stop_event.clear()
+        self.threads = [
+            threading.Thread(target=self.generation_stage, name='apolo11-generation'),
+            threading.Thread(target=self.analysis_stage, name='apolo11-analysis'),
+            threading.Thread(target=self.backup_stage, name='apolo11-backup')
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """
+        Detiene la generación de nuevos ciclos y espera a que las etapas procesen los ciclos pendientes.
+        """
+        self.stop_event.set()
+        self.join()
+
+    def join(self):
+        """
+        Espera a que terminen todas las etapas del pipeline.
+        """
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def generation_stage(self):
+        """
+        Etapa de generación: escribe los archivos de cada ciclo a un ritmo fijo y los envía a la etapa de análisis.
+        """
+        self.scheduler.start()
+        cycle_id = 0
+        try:
+            while not self.stop_event.is_set():
+                cycle_id += 1
+                mission_code, num_events = self.plan_cycle(cycle_id)
+                try:
+                    with self.metrics.timer('generation_seconds'):
+                        filenames = self.data_generator.generate_data_log(mission_code, cycle_id, num_events)
+                except Exception as e:
+                    logging.error(f"No se pudieron generar los datos del ciclo {cycle_id}: {e}")
+                else:
+                    self.analysis_queue.put((cycle_id, filenames))
+                    self.metrics.set_gauge('analysis_queue_size', self.analysis_queue.qsize())
+                self.metrics.increment('cycles_total')
+                self.metrics.set_gauge('scheduler_overruns', self.scheduler.overruns)
+                if self.max_cycles is not None and cycle_id >= self.max_cycles:
+                    break
+                self.scheduler.wait(self.stop_event)
+        finally:
+            self.analysis_queue.put(END_OF_STREAM)
+
+    def analysis_stage(self):
+        """
+        Etapa de análisis: genera los informes de cada ciclo a partir de sus propios archivos y envía a la etapa
+        de respaldo los que se analizaron. Un ciclo cuyo informe falla no se respalda.
+        """
+        try:
+            while True:
+                item = self.analysis_queue.get()
+                if item is END_OF_STREAM:
+                    break
+
+                cycle_id, filenames = item
+                sources = [os.path.join(self.data_generator.storage_path, filename) for filename in filenames]
+                try:
+                    with self.metrics.timer('reporting_seconds'):
+                        self.report_generator.generate_reports(cycle_id, sources, move_files=False)
+                except Exception as e:
+                    # Los archivos de un ciclo sin informe se quedan en el directorio de dispositivos
+                    logging.error(f"No se pudieron generar los informes del ciclo {cycle_id}; sus archivos no se "
+                                  f"respaldarán: {e}")
+                    continue
+                # Solo se respaldan los archivos analizados (no los que el verificador movió a cuarentena)
+                processed_files = [os.path.basename(path)
+                                   for path in self.report_generator.analysis_engine.last_sources]
+                self.backup_queue.put((cycle_id, processed_files))
+                self.metrics.set_gauge('backup_queue_size', self.backup_queue.qsize())
+        finally:
+            self.backup_queue.put(END_OF_STREAM)
+
+    def backup_stage(self):
+        """
+        Etapa de respaldo: mueve a backups los archivos de cada ciclo ya analizado.
+        """
+        while True:
+            item = self.backup_queue.get()
+            if item is END_OF_STREAM:
+                break
+
+            cycle_id, filenames = item
+            self.file_manager.archive_cycle(cycle_id, filenames)
@@ -0,0 +1,225 @@
+# modules/Sketches.py
+import hashlib
+import math
+import threading
+
+FAILURE_STATUSES = ('faulty', 'killed', 'unknown')
+MASK_64 = (1 << 64) - 1
+
+
+def hash64(key):
+    """
+    Devuelve un hash de 64 bits estable entre ejecuciones y procesos (a diferencia de hash()).
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+
+
+class CountMinSketch:
+    """
+    Sketch count-min: estima la frecuencia de cualquier clave con depth filas de width contadores. La estimación
+    nunca es menor que la real y la supera en como mucho e/width veces el total con probabilidad 1 - e^-depth.
+    """
+
+    def __init__(self, width=2048, depth=4):
+        """
+        Inicializa el sketch vacío con su anchura y su profundidad.
+        """
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+        self.total = 0
+
+    def indexes(self, key_hash):
+        """
+        Devuelve la columna de la clave en cada fila (doble hash a partir de un único hash de 64 bits).
+        """
+        first, second = key_hash & 0xFFFFFFFF, (key_hash >> 32) | 1
+        return [(first + row * second) % self.width for row in range(self.depth)]
+
+    def add(self, key_hash, count=1):
+        """
+        Suma count apariciones de una clave y devuelve su frecuencia estimada.
+        """
+        self.total += count
+        estimate = None
+        for row, index in zip(self.rows, self.indexes(key_hash)):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+    def estimate(self, key_hash):
+        """
+        Devuelve la frecuencia estimada de una clave.
+        """
+        return min(row[index] for row, index in zip(self.rows, self.indexes(key_hash)))
+
+    def merge(self, other):
+        """
+        Suma otro sketch de las mismas dimensiones a este.
+        """
+        for row, other_row in zip(self.rows, other.rows):
+            for index, count in enumerate(other_row):
+                row[index] += count
+        self.total += other.total
+
+
+class HeavyHitters:
+    """
+    Los k elementos más frecuentes de un flujo en memoria fija: un sketch count-min estima la frecuencia de cada
+    clave y solo se guardan las k candidatas con mayor estimación.
+    """
+
+    def __init__(self, k=10, width=2048, depth=4):
+        """
+        Inicializa el seguimiento de los k elementos más frecuentes.
+        """
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        # Clave -> (estimación, información asociada) de las candidatas
+        self.candidates = {}
+
+    def add(self, key, count=1, info=None):
+        """
+        Suma count apariciones de una clave. info se guarda con la clave si entra entre las candidatas.
+        """
+        estimate = self.sketch.add(hash64(key), count)
+        self.offer(key, estimate, info)
+
+    def offer(self, key, estimate, info=None):
+        """
+        Propone una clave con su estimación como candidata, desplazando a la menor si ya hay k.
+        """
+        if key in self.candidates or len(self.candidates) < self.k:
+            self.candidates[key] = (estimate, info)
+            return
+
+        smallest = min(self.candidates, key=lambda candidate: self.candidates[candidate][0])
+        if estimate > self.candidates[smallest][0]:
+            del self.candidates[smallest]
+            self.candidates[key] = (estimate, info)
+
+    def top(self):
+        """
+        Devuelve las candidatas como (clave, estimación, información), de la más a la menos frecuente.
+        """
+        return sorted(((key, estimate, info) for key, (estimate, info) in self.candidates.items()),
+                      key=lambda item: (-item[1], item[0]))
+
+    def merge(self, other):
+        """
+        Combina otro seguimiento de las mismas dimensiones con este.
+        """
+        self.sketch.merge(other.sketch)
+        infos = {key: info for key, (_, info) in other.candidates.items()}
+        infos.update({key: info for key, (_, info) in self.candidates.items()})
+        self.candidates = {}
+        for key, info in infos.items():
+            self.offer(key, self.sketch.estimate(hash64(key)), info)
+
+
+class HyperLogLog:
+    """
+    Estimador HyperLogLog de la cantidad de elementos distintos de un flujo con 2^precision registros de un byte.
+    Con precision=12 (4 KiB) el error típico es de un 1,6 %.
+    """
+
+    def __init__(self, precision=12):
+        """
+        Inicializa el estimador vacío con su precisión.
+        """
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add_hash(self, key_hash):
+        """
+        Añade un elemento a partir de su hash de 64 bits.
+        """
+        index = key_hash >> (64 - self.precision)
+        remainder = (key_hash << self.precision) & MASK_64
+        rank = 65 - remainder.bit_length() if remainder else 65 - self.precision
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, key):
+        """
+        Añade un elemento.
+        """
+        self.add_hash(hash64(key))
+
+    def count(self):
+        """
+        Devuelve la cantidad estimada de elementos distintos.
+        """
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Corrección para cardinalidades pequeñas (conteo lineal)
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def merge(self, other):
+        """
+        Combina otro estimador de la misma precisión con este.
+        """
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+
+class DeviceSketches:
+    """
+    Esta clase representa el seguimiento por dispositivo de la simulación de Apollo 11.
+    Con identificadores de dispositivo (device_id) de flotas de cientos de miles de unidades, un diccionario exacto
+    por dispositivo crecería sin límite; en su lugar, por cada misión se mantienen en memoria fija los dispositivos
+    con más fallos (HeavyHitters) y la cantidad de dispositivos distintos (HyperLogLog), acumulados desde el inicio.
+    observe se pasa como observador de eventos al recorrido que cuenta los archivos, así que los sketches no
+    vuelven a leerlos.
+    """
+
+    def __init__(self, k=10, width=2048, depth=4, precision=12, failure_statuses=FAILURE_STATUSES):
+        """
+        Inicializa el seguimiento con el tamaño del ranking de fallos, las dimensiones de los sketches y los estados
+        que cuentan como fallo.
+        """
+        self.k = k
+        self.width = width
+        self.depth = depth
+        self.precision = precision
+        self.failure_statuses = frozenset(failure_statuses)
+        self.lock = threading.Lock()
+        self.failures = {}
+        self.distinct = {}
+
+    def observe(self, event):
+        """
+        Procesa un evento. Los eventos sin identificador de dispositivo se ignoran.
+        """
+        device_id = event.get('device_id')
+        if device_id is None:
+            return
+
+        mission = event['mission']
+        with self.lock:
+            distinct = self.distinct.get(mission)
+            if distinct is None:
+                distinct = self.distinct[mission] = HyperLogLog(self.precision)
+            distinct.add(device_id)
+
+            if event['device_status'] in self.failure_statuses:
+                failures = self.failures.get(mission)
+                if failures is None:
+                    failures = self.failures[mission] = HeavyHitters(self.k, self.width, self.depth)
+                failures.add(device_id, 1, event['device_type'])
+
+    def sections(self):
+        """
+        Devuelve las secciones del informe: los dispositivos con más fallos y los dispositivos distintos por misión.
+        """
+        with self.lock:
+            return {
+                'device_hotspots': {mission: [{'device_id': device_id, 'device_type': device_type,
+                                               'failures': estimate}
+                                              for device_id, estimate, device_type in failures.top()]
+                                    for mission, failures in self.failures.items()},
+                'distinct_devices': {mission: distinct.count() for mission, distinct in self.distinct.items()}
+            }